@@ -9,6 +9,7 @@ IS_PRODUCTION: bool = ENVIRONMENT == "production"
 # MIME types for file responses
 MIME_TYPES: dict[str, str] = {
     "json": "application/json",
+    "ndjson": "application/x-ndjson",
     "csv": "text/csv",
     "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     "xls": "application/vnd.ms-excel",
@@ -28,6 +29,40 @@ ALLOWED_CONVERSIONS: dict[str, list[str]] = {
 # Max file size in bytes (configurable via environment)
 MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE_MB", "10")) * 1024 * 1024
 
+# Uploads larger than this are memory-mapped from their spooled temporary
+# file instead of being read into memory
+UPLOAD_MEMORY_THRESHOLD: int = (
+    int(os.getenv("UPLOAD_MEMORY_THRESHOLD_KB", "1024")) * 1024
+)
+
+# Upload sessions (files kept server-side so pagination doesn't re-upload)
+# Seconds an uploaded file stays available after its last use
+UPLOAD_TTL_SECONDS: int = int(os.getenv("UPLOAD_TTL_SECONDS", "900"))
+# Maximum total size of uploads kept in memory
+UPLOAD_STORE_MAX_BYTES: int = int(os.getenv("UPLOAD_STORE_MAX_MB", "200")) * 1024 * 1024
+
+# Memory budget for parsed tables cached between requests (e.g. preview pages)
+PARSE_CACHE_MAX_BYTES: int = int(os.getenv("PARSE_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+# Memory budget for converted output cached for repeated downloads
+OUTPUT_CACHE_MAX_BYTES: int = int(os.getenv("OUTPUT_CACHE_MAX_MB", "128")) * 1024 * 1024
+# Largest streamed output kept while sending it, to cache it once sent
+OUTPUT_CACHE_MAX_ENTRY_BYTES: int = (
+    int(os.getenv("OUTPUT_CACHE_MAX_ENTRY_MB", "4")) * 1024 * 1024
+)
+
+# Version of the converters' output, part of every conversion's ETag. Bump it
+# whenever a change alters converted output, so clients revalidate their
+# cached downloads instead of keeping the old output.
+OUTPUT_VERSION: str = "1"
+
+# Rows serialized per chunk when streaming converted output
+STREAM_CHUNK_ROWS: int = int(os.getenv("STREAM_CHUNK_ROWS", "10000"))
+
+# CSV parser: "pyarrow" reads text columns with Arrow's multithreaded reader
+# when pyarrow is installed, "c" always uses pandas' C parser
+CSV_ENGINE: str = os.getenv("CSV_ENGINE", "pyarrow")
+
 # Preview settings
 PREVIEW_ROWS: int = 500
 
@@ -36,6 +71,10 @@ PREVIEW_ROWS: int = 500
 MAX_EXPANDED_ROWS: int = 10000
 # Threshold for considering JSON "complex" (prompts user for export mode choice)
 COMPLEX_JSON_THRESHOLD: int = 100
+# Worker processes used to flatten large root arrays (1 disables parallelism)
+JSON_WORKERS: int = int(os.getenv("JSON_WORKERS", "0")) or os.cpu_count() or 1
+# Root arrays smaller than this are flattened in the request's own process
+PARALLEL_JSON_MIN_BYTES: int = int(os.getenv("PARALLEL_JSON_MIN_MB", "4")) * 1024 * 1024
 
 
 def get_cors_origins() -> list[str]:
@@ -1,18 +1,24 @@
 """Base converter class."""
 
 from abc import ABC, abstractmethod
-from typing import Any
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from backend.utils.cache import PARSE_CACHE, content_hash
+from backend.utils.uploads import FileContent
+
+T = TypeVar("T")
 
 
 class BaseConverter(ABC):
     """Abstract base class for file converters."""
 
     @abstractmethod
-    def convert(self, content: bytes) -> bytes:
+    def convert(self, content: FileContent) -> bytes:
         """Convert file content to the target format.
 
         Args:
-            content: The source file content as bytes.
+            content: The source file content (bytes or a memory-mapped upload).
 
         Returns:
             The converted file content as bytes.
@@ -24,12 +30,12 @@ class BaseConverter(ABC):
 
     @abstractmethod
     def preview(
-        self, content: bytes, page: int = 1, page_size: int = 10
+        self, content: FileContent, page: int = 1, page_size: int = 10
     ) -> dict[str, Any]:
         """Generate a preview of the file content with pagination.
 
         Args:
-            content: The file content as bytes.
+            content: The file content (bytes or a memory-mapped upload).
             page: Page number (1-indexed). Defaults to 1.
             page_size: Number of rows per page. Defaults to 10.
 
@@ -45,3 +51,45 @@ class BaseConverter(ABC):
             }
         """
         pass
+
+    def _cached_parse(
+        self,
+        content: FileContent,
+        input_type: str,
+        build: Callable[[], T],
+        kind: str = "table",
+        dtype: type | None = None,
+        export_mode: str | None = None,
+        digest: str | None = None,
+    ) -> T:
+        """Get a parsed table from the process-wide parse cache.
+
+        Parsed tables are keyed by the SHA-256 of the content plus the options
+        that affect parsing, so previewing another page of the same file is a
+        slice of a cached DataFrame instead of a full reparse. Other results
+        derived from the content (e.g. its CSV dialect) are cached under
+        their own kind. Cached values are shared and must not be modified by
+        callers.
+
+        Args:
+            content: The source file content as bytes.
+            input_type: The input format (e.g. "csv", "excel", "json").
+            build: Function that parses the content on a cache miss.
+            kind: What build returns: "table" for a DataFrame or dict of
+                DataFrames, or the name of another result.
+            dtype: Data type forced for all columns, if any.
+            export_mode: JSON export mode, if any.
+            digest: SHA-256 hex digest of the content, if already computed
+                for another lookup.
+
+        Returns:
+            The cached or newly parsed value.
+        """
+        key = (
+            digest or content_hash(content),
+            input_type,
+            kind,
+            dtype.__name__ if dtype is not None else None,
+            export_mode,
+        )
+        return PARSE_CACHE.get_or_build(key, build)
@@ -0,0 +1,210 @@
+"""CSV parsing with pandas' C parser or multithreaded Arrow.
+
+Arrow's CSV reader tokenizes blocks of the file on every core, where the
+C parser uses one. It is used when pyarrow is installed, CSV_ENGINE allows
+it, and every column is read as text: its type inference differs from
+pandas' (ISO dates become dates, "0x10" an integer, "+5" a float), which
+would change converted output, so parses that infer types stay on the C
+parser.
+
+Anything Arrow can't read like the C parser does (rows with missing or
+extra fields, unterminated quotes, an empty file, invalid bytes for the
+encoding) makes it give up, and the file is parsed again with the C
+parser. That parse returns the same DataFrame as before or raises the
+same errors, so the converters' messages don't change.
+"""
+
+import re
+
+import pandas as pd
+
+from backend.config import CSV_ENGINE
+from backend.utils.csv_dialect import CsvDialect
+from backend.utils.uploads import FileContent, open_buffer
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
+
+# Encodings in which lines of blanks can be found in the raw bytes
+ASCII_ENCODINGS = frozenset({"utf-8", "utf-8-sig", "latin-1"})
+
+# Cells read as missing values, as pandas' C parser does by default
+NA_VALUES = (
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+)
+
+
+def read_csv(
+    content: FileContent,
+    dialect: CsvDialect,
+    dtype: type | None,
+    encoding: str,
+    engine: str | None = None,
+) -> pd.DataFrame:
+    """Parse CSV content into a DataFrame.
+
+    Args:
+        content: CSV content as bytes.
+        dialect: Delimiter and quote character of the content.
+        dtype: Data type to force for all columns, or None to infer.
+        encoding: Text encoding of the content.
+        engine: "pyarrow" to use Arrow where it gives the same result as the
+            C parser, "c" for the C parser only. Defaults to CSV_ENGINE.
+
+    Returns:
+        A pandas DataFrame.
+
+    Raises:
+        pd.errors.EmptyDataError: If the content has no columns.
+        pd.errors.ParserError: If the content isn't valid CSV.
+        UnicodeDecodeError: If the content isn't valid in the encoding.
+    """
+    engine = CSV_ENGINE if engine is None else engine
+    if engine == "pyarrow" and pa_csv is not None and dtype is str:
+        try:
+            df = _read_text_columns(content, dialect, encoding)
+        except (pa.ArrowException, pd.errors.ParserError, UnicodeError):
+            df = None
+        if df is not None:
+            return df
+
+    # The line terminator isn't passed: the C parser recognizes all three,
+    # and forcing one would leave the "\r" of "\r\n" in the last field
+    return pd.read_csv(
+        open_buffer(content),
+        sep=dialect.delimiter,
+        quotechar=dialect.quotechar,
+        dtype=dtype,
+        encoding=encoding,
+    )
+
+
+def read_header(content: FileContent, dialect: CsvDialect, encoding: str) -> list[str]:
+    """Read the column names of CSV content as the C parser names them.
+
+    Empty names become "Unnamed: <position>" and repeated ones get a ".1",
+    ".2", ... suffix.
+
+    Args:
+        content: CSV content as bytes.
+        dialect: Delimiter and quote character of the content.
+        encoding: Text encoding of the content.
+
+    Returns:
+        The column names.
+
+    Raises:
+        pd.errors.EmptyDataError: If the content has no columns.
+        pd.errors.ParserError: If the header isn't valid CSV.
+        UnicodeDecodeError: If the header isn't valid in the encoding.
+    """
+    return pd.read_csv(
+        open_buffer(content),
+        sep=dialect.delimiter,
+        quotechar=dialect.quotechar,
+        dtype=str,
+        encoding=encoding,
+        nrows=0,
+    ).columns.tolist()
+
+
+def has_irregular_lines(content: FileContent, delimiter: str) -> bool:
+    """Check for lines of only blanks and lines ending in a lone "\r".
+
+    The C parser skips lines of only blanks, which Arrow reads as records,
+    and how it splits lines ending in a lone "\r" can't be told from the
+    line breaks alone (it sometimes reads the header again as a row), so
+    content with either is left to a full parse with the C parser.
+    Each pattern starts with a line break character, which the regex engine
+    scans for at memchr speed, so the check is cheap next to the parse.
+
+    Args:
+        content: CSV content in an ASCII-compatible encoding.
+        delimiter: Field delimiter, which isn't a blank even if it's a tab.
+
+    Returns:
+        True if the content may have such lines (they may also be inside
+        quoted fields, which only costs a parse with the C parser).
+    """
+    blanks = re.escape(" \t".replace(delimiter, "")).encode()
+    return bool(
+        re.match(rb"(?:\xef\xbb\xbf)?[%s]+(?:[\r\n]|$)" % blanks, content)
+        or re.search(rb"\n[%s]+(?:[\r\n]|$)" % blanks, content)
+        or re.search(rb"\r(?!\n)", content)
+    )
+
+
+def _read_text_columns(
+    content: FileContent, dialect: CsvDialect, encoding: str
+) -> pd.DataFrame | None:
+    """Parse CSV content with Arrow, reading every column as text.
+
+    Args:
+        content: CSV content as bytes.
+        dialect: Delimiter and quote character of the content.
+        encoding: Text encoding of the content.
+
+    Returns:
+        A DataFrame equal to the C parser's with dtype=str, or None if the
+        encoding isn't ASCII-compatible or the content may have lines the
+        two parsers split differently.
+
+    Raises:
+        pa.ArrowException: If Arrow can't read the content like the C
+            parser does.
+    """
+    if encoding not in ASCII_ENCODINGS or has_irregular_lines(
+        content, dialect.delimiter
+    ):
+        return None
+
+    # The C parser names the columns, so empty and repeated names are
+    # handled as before; Arrow reads the header as a row of text
+    header = read_header(content, dialect, encoding)
+    table = pa_csv.read_csv(
+        open_buffer(content),
+        read_options=pa_csv.ReadOptions(
+            encoding=encoding, autogenerate_column_names=True
+        ),
+        parse_options=pa_csv.ParseOptions(
+            delimiter=dialect.delimiter,
+            quote_char=dialect.quotechar,
+            newlines_in_values=True,
+        ),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={f"f{i}": pa.string() for i in range(len(header))},
+            null_values=NA_VALUES,
+            strings_can_be_null=True,
+        ),
+    )
+    if table.num_columns != len(header):
+        return None
+
+    df = table.slice(1).to_pandas()
+    # Before pandas 3, nulls come back as None, which astype(str) turns into
+    # "None"; the C parser leaves missing text cells as NaN
+    df = df.astype(str).where(df.notna())
+    df.columns = header
+    return df
@@ -0,0 +1,299 @@
+"""Sparse byte-offset index of the rows of a CSV file.
+
+The index records where every ROW_INDEX_STRIDE-th data row starts, so a
+page of rows is parsed from the nearest indexed row instead of from the
+start of the file. It is built by a vectorized scan of the raw bytes,
+which only finds rows the way pandas' C parser does when quotes are used
+as the CSV format intends: a field is quoted from its first character
+and its closing quote is followed by a delimiter or line break. Then a
+line break is inside quotes exactly when an odd number of quotes
+precede it. Content where any quote is elsewhere, or anything the C
+parser would reject or read differently (rows wider than the header,
+an unterminated quote, blank-only lines, lone "\r" line breaks), gets no
+index and is parsed in full as before.
+"""
+
+import codecs
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from backend.converters.csv_engine import (
+    ASCII_ENCODINGS,
+    has_irregular_lines,
+    read_header,
+)
+from backend.utils.csv_dialect import CsvDialect
+from backend.utils.uploads import FileContent, open_buffer
+
+# Data rows between two indexed offsets
+ROW_INDEX_STRIDE = 1000
+# Bytes scanned at a time, bounding the scan's temporary arrays
+_SCAN_BLOCK_BYTES = 16 * 1024 * 1024
+
+_LF = ord("\n")
+_CR = ord("\r")
+
+
+@dataclass(frozen=True)
+class CsvRowIndex:
+    """Where the data rows of a CSV file start.
+
+    Attributes:
+        columns: Column names, as the C parser names them.
+        offsets: Byte offsets of data rows 0, ROW_INDEX_STRIDE,
+            2 * ROW_INDEX_STRIDE, ...
+        total_rows: Number of data rows.
+    """
+
+    columns: tuple[str, ...]
+    offsets: tuple[int, ...]
+    total_rows: int
+
+
+def build_row_index(
+    content: FileContent, dialect: CsvDialect, encoding: str
+) -> CsvRowIndex | None:
+    """Index the data rows of CSV content.
+
+    Args:
+        content: CSV content as bytes.
+        dialect: Delimiter and quote character of the content.
+        encoding: Text encoding of the content.
+
+    Returns:
+        The row index, or None if the rows can't be found from the bytes
+        alone or the content has no data rows.
+    """
+    if encoding not in ASCII_ENCODINGS or has_irregular_lines(
+        content, dialect.delimiter
+    ):
+        return None
+
+    scan = _RowScan(content, dialect, encoding)
+    if not scan.run() or scan.rows < 2:
+        return None
+
+    try:
+        columns = read_header(content, dialect, encoding)
+    except (ValueError, UnicodeError):
+        return None
+    # Wider rows make the C parser fail or use the first column as index
+    if len(columns) != scan.header_fields or scan.max_fields > len(columns):
+        return None
+
+    return CsvRowIndex(tuple(columns), tuple(scan.offsets), scan.rows - 1)
+
+
+def read_rows(
+    content: FileContent,
+    index: CsvRowIndex,
+    dialect: CsvDialect,
+    encoding: str,
+    start: int,
+    stop: int,
+) -> pd.DataFrame:
+    """Parse a range of data rows, as text, from the nearest indexed row.
+
+    Args:
+        content: CSV content as bytes.
+        index: The content's row index.
+        dialect: Delimiter and quote character of the content.
+        encoding: Text encoding of the content.
+        start: First data row (0-indexed).
+        stop: Data row after the last one.
+
+    Returns:
+        The rows, equal to the same rows of a full parse with dtype=str.
+    """
+    block = start // ROW_INDEX_STRIDE
+    skip = start - block * ROW_INDEX_STRIDE
+    with open_buffer(content) as buffer:
+        buffer.seek(index.offsets[block])
+        df = pd.read_csv(
+            buffer,
+            sep=dialect.delimiter,
+            quotechar=dialect.quotechar,
+            header=None,
+            names=list(index.columns),
+            dtype=str,
+            encoding=encoding,
+            nrows=skip + max(0, stop - start),
+        )
+    return df.iloc[skip:].reset_index(drop=True)
+
+
+class _RowScan:
+    """Quote-aware scan for the records of CSV content, block by block.
+
+    Records are numbered 0 for the header and from 1 for data rows; empty
+    lines aren't records, as the C parser skips them.
+    """
+
+    def __init__(
+        self, content: FileContent, dialect: CsvDialect, encoding: str
+    ) -> None:
+        self.content = content
+        # Pages are parsed in the encoding decided from the start of the
+        # file, so the whole file must be valid in it
+        self.decoder = codecs.getincrementaldecoder(encoding)()
+        self.quote = ord(dialect.quotechar)
+        self.delimiter = ord(dialect.delimiter)
+        self.rows = 0
+        self.offsets: list[int] = []
+        self.header_fields = 0
+        self.max_fields = 0
+        # State carried from one block to the next
+        self._quotes = 0
+        # A byte order mark doesn't count in the length of the first line
+        self._record_start = (
+            len(codecs.BOM_UTF8) if content[:3] == codecs.BOM_UTF8 else 0
+        )
+        self._record_delimiters = 0
+
+    def run(self) -> bool:
+        """Scan the content.
+
+        Returns:
+            True if the content is valid in its encoding, every quote is at
+            a field boundary and the last quoted field is closed, False
+            otherwise (the scan then stops).
+        """
+        size = len(self.content)
+        with memoryview(self.content) as view:
+            for start in range(0, size, _SCAN_BLOCK_BYTES):
+                stop = min(start + _SCAN_BLOCK_BYTES, size)
+                try:
+                    self.decoder.decode(view[start:stop], final=stop == size)
+                except UnicodeDecodeError:
+                    return False
+                block = np.frombuffer(view[start:stop], dtype=np.uint8)
+                if not self._scan_block(block, start):
+                    return False
+        if self._quotes % 2:
+            return False
+
+        # A last line without a line break
+        last = self.content[self._record_start :]
+        if last and last != b"\r":
+            self._add_records(
+                np.array([self._record_start]),
+                np.array([self._record_delimiters]),
+                np.array([False]),
+            )
+        return True
+
+    def _scan_block(self, block: np.ndarray, base: int) -> bool:
+        """Scan one block of the content.
+
+        Args:
+            block: The bytes of the block.
+            base: Offset of the block in the content.
+
+        Returns:
+            False if a quote isn't at a field boundary.
+        """
+        is_quote = block == self.quote
+        quotes = np.flatnonzero(is_quote)
+        if len(quotes) and not self._quotes_at_boundaries(block, base, quotes):
+            return False
+
+        if len(quotes):
+            # A byte is inside quotes if an odd number of quotes precede it
+            outside = np.bitwise_xor.accumulate(is_quote)
+            if self._quotes % 2 == 0:
+                np.logical_not(outside, out=outside)
+            breaks = np.flatnonzero((block == _LF) & outside)
+            delimiters = np.flatnonzero((block == self.delimiter) & outside)
+            self._quotes += len(quotes)
+        elif self._quotes % 2 == 0:
+            # Without quotes the whole block is outside them
+            breaks = np.flatnonzero(block == _LF)
+            delimiters = np.flatnonzero(block == self.delimiter)
+        else:
+            # ... or inside the quoted field left open by the last block
+            breaks = delimiters = np.empty(0, dtype=np.intp)
+
+        # Delimiters outside quotes in each record ending in this block
+        before = np.searchsorted(delimiters, breaks)
+        counts = np.diff(before, prepend=0)
+        if len(counts):
+            counts[0] += self._record_delimiters
+        starts = np.concatenate(([self._record_start], base + breaks[:-1] + 1))
+        starts = starts[: len(breaks)]
+        # Empty lines, or a "\r" alone: the empty line of a "\r\n" break
+        previous = block[np.maximum(breaks - 1, 0)]
+        if len(breaks) and breaks[0] == 0:
+            previous[0] = self.content[base - 1] if base else _LF
+        length = base + breaks - starts
+        blank = (length == 0) | ((length == 1) & (previous == _CR))
+        self._add_records(starts, counts, blank)
+
+        if len(breaks):
+            self._record_start = base + int(breaks[-1]) + 1
+            self._record_delimiters = len(delimiters) - int(before[-1])
+        else:
+            self._record_delimiters += len(delimiters)
+        return True
+
+    def _quotes_at_boundaries(
+        self, block: np.ndarray, base: int, quotes: np.ndarray
+    ) -> bool:
+        """Check that every quote of a block opens or closes a field.
+
+        An opening quote (even count of quotes before it) must start a
+        field or follow another quote, making an escaped pair. A closing
+        quote must end a field or precede another quote.
+
+        Args:
+            block: The bytes of the block.
+            base: Offset of the block in the content.
+            quotes: Positions of the quotes in the block.
+
+        Returns:
+            True if all quotes are at field boundaries.
+        """
+        content = self.content
+        before = np.empty(len(quotes), dtype=np.int16)
+        before[1:] = block[quotes[1:] - 1]
+        before[0] = content[base + quotes[0] - 1] if base + quotes[0] else _LF
+        after = np.empty(len(quotes), dtype=np.int16)
+        after[:-1] = block[quotes[:-1] + 1]
+        end = base + int(quotes[-1]) + 1
+        after[-1] = content[end] if end < len(content) else _LF
+
+        opening = (self._quotes + np.arange(len(quotes))) % 2 == 0
+        # Comparisons are cheaper than np.isin for a handful of values
+        starts = (before == self.delimiter) | (before == _LF) | (before == self.quote)
+        if content[:3] == codecs.BOM_UTF8:
+            # The first field follows the byte order mark
+            starts |= base + quotes == len(codecs.BOM_UTF8)
+        ends = (after == self.delimiter) | (after == _LF) | (after == _CR)
+        ends |= after == self.quote
+        return bool(np.all(np.where(opening, starts, ends)))
+
+    def _add_records(
+        self, starts: np.ndarray, delimiters: np.ndarray, blank: np.ndarray
+    ) -> None:
+        """Count the records among lines and index their offsets.
+
+        Args:
+            starts: Offsets of the lines.
+            delimiters: Delimiters outside quotes in each line.
+            blank: Whether each line is empty, and so not a record.
+        """
+        starts = starts[~blank]
+        fields = delimiters[~blank] + 1
+        if not len(starts):
+            return
+
+        numbers = self.rows + np.arange(len(starts))
+        if self.rows == 0:
+            self.header_fields = int(fields[0])
+        data = numbers > 0
+        if np.any(data):
+            self.max_fields = max(self.max_fields, int(fields[data].max()))
+        indexed = data & ((numbers - 1) % ROW_INDEX_STRIDE == 0)
+        self.offsets.extend(int(offset) for offset in starts[indexed])
+        self.rows += len(starts)
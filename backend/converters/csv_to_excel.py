@@ -1,10 +1,8 @@
 """CSV to Excel converter."""
 
-import io
-
-import pandas as pd
-
+from backend.converters.archives import write_xlsx
 from backend.converters.csv_to_json import CsvToJsonConverter
+from backend.utils.uploads import FileContent
 
 
 class CsvToExcelConverter(CsvToJsonConverter):
@@ -13,7 +11,7 @@ class CsvToExcelConverter(CsvToJsonConverter):
     Inherits CSV parsing logic from CsvToJsonConverter.
     """
 
-    def convert(self, content: bytes) -> bytes:
+    def convert(self, content: FileContent) -> bytes:
         """Convert CSV to Excel (.xlsx).
 
         Args:
@@ -25,8 +23,5 @@ class CsvToExcelConverter(CsvToJsonConverter):
         Raises:
             ValueError: If CSV is invalid or cannot be converted.
         """
-        df = self._csv_to_dataframe(content)
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            df.to_excel(writer, sheet_name="Data", index=False)
-        return output.getvalue()
+        df = self._load_dataframe(content)
+        return write_xlsx([("Data", df)])
@@ -1,41 +1,63 @@
 """CSV to JSON converter."""
 
-import io
-import json
+from collections.abc import Iterator
 from typing import Any
 
 import pandas as pd
 
 from backend.converters.base import BaseConverter
+from backend.converters.csv_engine import read_csv
+from backend.converters.csv_index import CsvRowIndex, build_row_index, read_rows
+from backend.converters.streaming import JsonStyle, json_chunks
+from backend.utils.cache import content_hash
+from backend.utils.csv_dialect import CsvDialect, sniff_dialect
+from backend.utils.file_detection import SNIFF_BYTES, decode_sample
+from backend.utils.uploads import FileContent
 
 
 class CsvToJsonConverter(BaseConverter):
     """Converts CSV data to JSON format."""
 
-    def convert(self, content: bytes) -> bytes:
+    def convert(
+        self, content: FileContent, json_style: JsonStyle = JsonStyle.PRETTY
+    ) -> bytes:
         """Convert CSV to JSON.
 
         Args:
             content: CSV content as bytes.
+            json_style: Layout of the JSON output.
 
         Returns:
-            JSON content as bytes (array of objects).
+            JSON content as bytes (array of objects by default).
 
         Raises:
             ValueError: If CSV is invalid or cannot be converted.
         """
-        df = self._csv_to_dataframe(content)
-        # Convert to list of dicts, handling NaN values
-        records = df.to_dict(orient="records")
-        # Replace NaN with None (NaN != NaN is True)
-        for record in records:
-            for key, value in record.items():
-                if pd.isna(value):
-                    record[key] = None
-        return json.dumps(records, indent=2, ensure_ascii=False).encode("utf-8")
+        return b"".join(self.iter_json(content, json_style))
+
+    def iter_json(
+        self, content: FileContent, json_style: JsonStyle = JsonStyle.PRETTY
+    ) -> Iterator[bytes]:
+        """Convert CSV to JSON produced in row batches.
+
+        The CSV is parsed before this returns, so errors are raised up front;
+        only serialization is deferred to the iterator.
+
+        Args:
+            content: CSV content as bytes.
+            json_style: Layout of the JSON output.
+
+        Returns:
+            Iterator over chunks of the JSON content.
+
+        Raises:
+            ValueError: If CSV is invalid or cannot be converted.
+        """
+        df = self._load_dataframe(content)
+        return json_chunks(df, json_style)
 
     def preview(
-        self, content: bytes, page: int = 1, page_size: int = 10
+        self, content: FileContent, page: int = 1, page_size: int = 10
     ) -> dict[str, Any]:
         """Generate preview of CSV data with pagination.
 
@@ -47,9 +69,20 @@ class CsvToJsonConverter(BaseConverter):
         Returns:
             Preview dictionary with columns, rows, total_rows, and pagination info.
         """
-        # Read as strings to preserve original formatting (e.g., "007" stays "007")
-        df = self._csv_to_dataframe(content, dtype=str)
-        total_rows = len(df)
+        # Pages of indexed files are parsed on their own, so the first page
+        # costs a scan of the bytes and a parse of its rows; others are
+        # sliced from the whole file, read as strings to preserve original
+        # formatting (e.g., "007" stays "007")
+        digest = content_hash(content)
+        encoding, dialect = self._sniff(content, digest)
+        index = self._row_index(content, encoding, dialect, digest)
+        if index is not None:
+            columns = list(index.columns)
+            total_rows = index.total_rows
+        else:
+            df = self._load_dataframe(content, dtype=str, digest=digest)
+            columns = df.columns.tolist()
+            total_rows = len(df)
         total_pages = max(1, (total_rows + page_size - 1) // page_size)
 
         # Ensure page is within bounds
@@ -57,14 +90,17 @@ class CsvToJsonConverter(BaseConverter):
 
         # Calculate slice indices
         start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
+        end_idx = min(start_idx + page_size, total_rows)
 
         # Get the page slice and replace NaN with None
-        page_df = df.iloc[start_idx:end_idx]
+        if index is not None:
+            page_df = read_rows(content, index, dialect, encoding, start_idx, end_idx)
+        else:
+            page_df = df.iloc[start_idx:end_idx]
         page_df = page_df.where(pd.notna(page_df), None)
 
         return {
-            "columns": df.columns.tolist(),
+            "columns": columns,
             "rows": page_df.values.tolist(),
             "total_rows": total_rows,
             "current_page": page,
@@ -72,10 +108,88 @@ class CsvToJsonConverter(BaseConverter):
             "page_size": page_size,
         }
 
+    def _load_dataframe(
+        self,
+        content: FileContent,
+        dtype: type | None = None,
+        digest: str | None = None,
+    ) -> pd.DataFrame:
+        """Get the parsed DataFrame for CSV content, using the parse cache.
+
+        Args:
+            content: CSV content as bytes.
+            dtype: Data type to force for all columns (e.g., str for preview).
+            digest: SHA-256 hex digest of the content, if already computed.
+
+        Returns:
+            A pandas DataFrame shared with the cache (do not modify).
+
+        Raises:
+            ValueError: If CSV cannot be parsed.
+        """
+        return self._cached_parse(
+            content,
+            "csv",
+            lambda: self._csv_to_dataframe(content, dtype=dtype),
+            dtype=dtype,
+            digest=digest,
+        )
+
+    def _row_index(
+        self,
+        content: FileContent,
+        encoding: str,
+        dialect: CsvDialect,
+        digest: str | None = None,
+    ) -> CsvRowIndex | None:
+        """Get the row index of CSV content, using the parse cache.
+
+        Args:
+            content: CSV content as bytes.
+            encoding: Text encoding of the content, from _sniff.
+            dialect: Dialect of the content, from _sniff.
+            digest: SHA-256 hex digest of the content, if already computed.
+
+        Returns:
+            The row index, or None if the content can't be indexed and
+            previews slice the whole parsed file.
+        """
+        return self._cached_parse(
+            content,
+            "csv",
+            lambda: build_row_index(content, dialect, encoding),
+            kind="row_index",
+            digest=digest,
+        )
+
+    def _sniff(
+        self, content: FileContent, digest: str | None = None
+    ) -> tuple[str, CsvDialect]:
+        """Get the encoding and dialect of CSV content, using the parse cache.
+
+        Both are decided once from the start of the file and shared by every
+        parse of the same content.
+
+        Args:
+            content: CSV content as bytes.
+            digest: SHA-256 hex digest of the content, if already computed.
+
+        Returns:
+            (encoding, dialect). The dialect defaults to comma-separated if
+            no delimiter splits the header.
+        """
+        return self._cached_parse(
+            content,
+            "csv",
+            lambda: _sniff_content(content),
+            kind="dialect",
+            digest=digest,
+        )
+
     def _csv_to_dataframe(
-        self, content: bytes, dtype: type | None = None
+        self, content: FileContent, dtype: type | None = None
     ) -> pd.DataFrame:
-        """Parse CSV content to DataFrame with auto-detected delimiter.
+        """Parse CSV content to DataFrame with auto-detected dialect.
 
         Args:
             content: CSV content as bytes.
@@ -87,30 +201,23 @@ class CsvToJsonConverter(BaseConverter):
         Raises:
             ValueError: If CSV cannot be parsed.
         """
-        # Try different encodings
-        text = None
-        for encoding in ["utf-8", "latin-1", "cp1252"]:
+        encoding, dialect = self._sniff(content)
+
+        try:
             try:
-                text = content.decode(encoding)
-                break
+                df = read_csv(content, dialect, dtype, encoding)
             except UnicodeDecodeError:
-                continue
-
-        if text is None:
+                if encoding != "utf-8":
+                    raise
+                # A non-UTF-8 byte after the sample
+                df = read_csv(content, dialect, dtype, "latin-1")
+        except UnicodeDecodeError as e:
             raise ValueError(
                 "Unable to read file: unsupported character encoding. "
                 "Please save the file as UTF-8 and try again."
-            )
-
-        # Auto-detect delimiter
-        delimiter = self._detect_delimiter(text)
-
-        try:
-            df = pd.read_csv(io.StringIO(text), sep=delimiter, dtype=dtype)
+            ) from e
         except pd.errors.EmptyDataError:
-            raise ValueError(
-                "CSV file is empty. The file contains no data to convert."
-            )
+            raise ValueError("CSV file is empty. The file contains no data to convert.")
         except pd.errors.ParserError as e:
             error_msg = str(e)
             # Extract row number if present in error
@@ -132,25 +239,16 @@ class CsvToJsonConverter(BaseConverter):
 
         return df
 
-    def _detect_delimiter(self, text: str) -> str:
-        """Auto-detect the CSV delimiter.
 
-        Args:
-            text: The CSV text content.
+def _sniff_content(content: FileContent) -> tuple[str, CsvDialect]:
+    """Decide the encoding and dialect of CSV content from its start.
 
-        Returns:
-            The detected delimiter character.
-        """
-        # Get first line
-        first_line = text.split("\n")[0] if "\n" in text else text
-
-        # Count potential delimiters
-        delimiters = {
-            ",": first_line.count(","),
-            ";": first_line.count(";"),
-            "\t": first_line.count("\t"),
-        }
+    Args:
+        content: CSV content as bytes.
 
-        # Return delimiter with highest count, default to comma
-        best_delimiter = max(delimiters, key=delimiters.get)
-        return best_delimiter if delimiters[best_delimiter] > 0 else ","
+    Returns:
+        (encoding, dialect), defaulting to comma-separated.
+    """
+    sample, encoding = decode_sample(content)
+    dialect = sniff_dialect(sample, len(content) > SNIFF_BYTES)
+    return encoding, dialect or CsvDialect()
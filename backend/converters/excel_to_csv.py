@@ -1,9 +1,10 @@
 """Excel to CSV converter."""
 
-import io
-
+from collections.abc import Iterator
 
 from backend.converters.excel_to_json import ExcelToJsonConverter
+from backend.converters.streaming import csv_chunks
+from backend.utils.uploads import FileContent
 
 
 class ExcelToCsvConverter(ExcelToJsonConverter):
@@ -12,7 +13,7 @@ class ExcelToCsvConverter(ExcelToJsonConverter):
     Inherits Excel parsing logic from ExcelToJsonConverter.
     """
 
-    def convert(self, content: bytes) -> bytes:
+    def convert(self, content: FileContent) -> bytes:
         """Convert Excel to CSV.
 
         Args:
@@ -24,7 +25,22 @@ class ExcelToCsvConverter(ExcelToJsonConverter):
         Raises:
             ValueError: If Excel file is invalid or cannot be converted.
         """
-        df = self._excel_to_dataframe(content)
-        output = io.StringIO()
-        df.to_csv(output, index=False)
-        return output.getvalue().encode("utf-8")
+        return b"".join(self.iter_csv(content))
+
+    def iter_csv(self, content: FileContent) -> Iterator[bytes]:
+        """Convert Excel to CSV produced in row batches.
+
+        The workbook is read before this returns, so errors are raised up
+        front; only serialization is deferred to the iterator.
+
+        Args:
+            content: Excel content as bytes (.xlsx or .xls).
+
+        Returns:
+            Iterator over chunks of the CSV content.
+
+        Raises:
+            ValueError: If Excel file is invalid or cannot be converted.
+        """
+        df = self._load_dataframe(content)
+        return csv_chunks(df)
@@ -1,41 +1,58 @@
 """Excel to JSON converter."""
 
-import io
-import json
+from collections.abc import Iterator
 from typing import Any
 
 import pandas as pd
 
 from backend.converters.base import BaseConverter
+from backend.converters.streaming import JsonStyle, json_chunks
+from backend.utils.uploads import FileContent, open_buffer
 
 
 class ExcelToJsonConverter(BaseConverter):
     """Converts Excel data to JSON format."""
 
-    def convert(self, content: bytes) -> bytes:
+    def convert(
+        self, content: FileContent, json_style: JsonStyle = JsonStyle.PRETTY
+    ) -> bytes:
         """Convert Excel to JSON.
 
         Args:
             content: Excel content as bytes (.xlsx or .xls).
+            json_style: Layout of the JSON output.
 
         Returns:
-            JSON content as bytes (array of objects).
+            JSON content as bytes (array of objects by default).
 
         Raises:
             ValueError: If Excel file is invalid or cannot be converted.
         """
-        df = self._excel_to_dataframe(content)
-        # Convert to list of dicts, handling NaN values
-        records = df.to_dict(orient="records")
-        # Replace NaN with None
-        for record in records:
-            for key, value in record.items():
-                if pd.isna(value):
-                    record[key] = None
-        return json.dumps(records, indent=2, ensure_ascii=False).encode("utf-8")
+        return b"".join(self.iter_json(content, json_style))
+
+    def iter_json(
+        self, content: FileContent, json_style: JsonStyle = JsonStyle.PRETTY
+    ) -> Iterator[bytes]:
+        """Convert Excel to JSON produced in row batches.
+
+        The workbook is read before this returns, so errors are raised up front;
+        only serialization is deferred to the iterator.
+
+        Args:
+            content: Excel content as bytes (.xlsx or .xls).
+            json_style: Layout of the JSON output.
+
+        Returns:
+            Iterator over chunks of the JSON content.
+
+        Raises:
+            ValueError: If Excel file is invalid or cannot be converted.
+        """
+        df = self._load_dataframe(content)
+        return json_chunks(df, json_style)
 
     def preview(
-        self, content: bytes, page: int = 1, page_size: int = 10
+        self, content: FileContent, page: int = 1, page_size: int = 10
     ) -> dict[str, Any]:
         """Generate preview of Excel data with pagination.
 
@@ -48,7 +65,7 @@ class ExcelToJsonConverter(BaseConverter):
             Preview dictionary with columns, rows, total_rows, and pagination info.
         """
         # Read as strings to preserve original formatting (e.g., "007" stays "007")
-        df = self._excel_to_dataframe(content, dtype=str)
+        df = self._load_dataframe(content, dtype=str)
         total_rows = len(df)
         total_pages = max(1, (total_rows + page_size - 1) // page_size)
 
@@ -72,8 +89,30 @@ class ExcelToJsonConverter(BaseConverter):
             "page_size": page_size,
         }
 
+    def _load_dataframe(
+        self, content: FileContent, dtype: type | None = None
+    ) -> pd.DataFrame:
+        """Get the parsed DataFrame for Excel content, using the parse cache.
+
+        Args:
+            content: Excel content as bytes.
+            dtype: Data type to force for all columns (e.g., str for preview).
+
+        Returns:
+            A pandas DataFrame shared with the cache (do not modify).
+
+        Raises:
+            ValueError: If Excel file cannot be parsed.
+        """
+        return self._cached_parse(
+            content,
+            "excel",
+            lambda: self._excel_to_dataframe(content, dtype=dtype),
+            dtype=dtype,
+        )
+
     def _excel_to_dataframe(
-        self, content: bytes, dtype: type | None = None
+        self, content: FileContent, dtype: type | None = None
     ) -> pd.DataFrame:
         """Parse Excel content to DataFrame.
 
@@ -94,12 +133,12 @@ class ExcelToJsonConverter(BaseConverter):
 
         try:
             # Try xlsx first (openpyxl)
-            df = pd.read_excel(io.BytesIO(content), engine="openpyxl", dtype=dtype)
+            df = pd.read_excel(open_buffer(content), engine="openpyxl", dtype=dtype)
         except Exception as e:
             xlsx_error = str(e)
             try:
                 # Fall back to xls (xlrd)
-                df = pd.read_excel(io.BytesIO(content), engine="xlrd", dtype=dtype)
+                df = pd.read_excel(open_buffer(content), engine="xlrd", dtype=dtype)
             except Exception as e2:
                 xls_error = str(e2)
                 # Provide helpful error message based on the errors
@@ -109,7 +148,10 @@ class ExcelToJsonConverter(BaseConverter):
                         "is not a valid Excel file. Please check that the file "
                         "opens correctly in Excel."
                     ) from e2
-                elif "Unsupported format" in xls_error or "not supported" in xls_error.lower():
+                elif (
+                    "Unsupported format" in xls_error
+                    or "not supported" in xls_error.lower()
+                ):
                     raise ValueError(
                         "Unsupported Excel format. Please save the file as .xlsx "
                         "(Excel 2007+) or .xls (Excel 97-2003) format."
@@ -0,0 +1,474 @@
+"""Record flatteners planned once per JSON record shape.
+
+Real exports are mostly homogeneous: records share their keys, key order
+and the kinds of their values. For each shape a plan is built once from a
+sample record: the key tuple and value kinds of each object to unpack, the
+position of each leaf value among the unpacked values and the column names.
+A record is then flattened by unpacking its values by position, checking
+their kinds and building the row from the precomputed columns, instead of
+walking the record key by key. A record that doesn't match the shape of
+its plan makes the plan return None, and the caller takes the generic path.
+"""
+
+import operator
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from backend.converters import json_codec
+from backend.converters.json_walk import iter_leaves, iter_objects
+
+# Maximum number of record shapes planned per cache; the least recently
+# used shapes are evicted past it
+MAX_PLANS = 1024
+# Maximum number of shapes planned for one key sequence (e.g. a nested
+# object that is sometimes null)
+MAX_VARIANTS = 8
+
+# Types of the values a plan copies into the row as they are; any other
+# type sends the record to the generic path
+_SCALARS = frozenset((str, int, float, bool, type(None)))
+_DICTS = frozenset((dict,))
+_LISTS = frozenset((list,))
+
+# Operations of a record split for row expansion, applied in order:
+# (SCALAR_FIELDS, {column: value, ...})
+SCALAR_FIELDS = 0
+# (NESTED_OBJECT, object, prefix of its keys)
+NESTED_OBJECT = 1
+# (ARRAY, array, column, prefix of the keys of its objects)
+ARRAY = 2
+
+
+class PlanCache:
+    """Record plans keyed by column prefix and key sequence.
+
+    Records with the same keys can still differ in the kinds of their
+    values or the keys of nested objects, so each key sequence keeps a few
+    variants, tried in order. Key sequences are evicted least recently used
+    first, with all their variants, once the cache holds more than
+    max_plans plans. Lookups are single dict operations and insertions and
+    evictions hold a lock, so the cache can be shared between threads;
+    racing threads at worst plan a variant twice.
+    """
+
+    def __init__(
+        self,
+        compile_plan: Callable[[dict[str, Any], str], Callable[..., Any] | None],
+        max_plans: int = MAX_PLANS,
+        max_variants: int = MAX_VARIANTS,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            compile_plan: Function building the plan for a sample record and
+                column prefix, or returning None if the record has no plan.
+                A plan returns None for records not of the sample's shape.
+            max_plans: Maximum number of cached plans.
+            max_variants: Maximum number of plans per key sequence.
+        """
+        self.max_plans = max_plans
+        self.max_variants = max_variants
+        self._compile_plan = compile_plan
+        self._plans: OrderedDict[tuple[str, tuple[Any, ...]], tuple[Any, ...]] = (
+            OrderedDict()
+        )
+        self._plan_count = 0
+        self._lock = threading.Lock()
+
+    def apply(self, obj: dict[str, Any], prefix: str = "", *args: Any) -> Any:
+        """Apply the plan matching a record's shape, building it if needed.
+
+        Args:
+            obj: The record.
+            prefix: Prefix of the record's column names.
+            *args: Further arguments of the plan.
+
+        Returns:
+            The plan's result, or None if no plan matches the record and no
+            more variants can be planned for its key sequence.
+        """
+        key = (prefix, tuple(obj))
+        plans = self._plans.get(key, ())
+        if plans:
+            try:
+                self._plans.move_to_end(key)
+            except KeyError:
+                pass  # Evicted by another thread since
+        for plan in plans:
+            result = plan(obj, *args)
+            if result is not None:
+                return result
+
+        if len(plans) >= self.max_variants:
+            return None
+        plan = self._compile_plan(obj, prefix)
+        if plan is None:
+            return None
+        with self._lock:
+            self._plans[key] = (*self._plans.pop(key, ()), plan)
+            self._plan_count += 1
+            while self._plan_count > self.max_plans:
+                _, evicted = self._plans.popitem(last=False)
+                self._plan_count -= len(evicted)
+        return plan(obj, *args)
+
+
+class _Shape:
+    """Unpacking of the records of one shape.
+
+    The values of the record are unpacked first, then those of each nested
+    object unpacked in place, in the order they are reached, all into one
+    tuple: each nested object is found at a precomputed position of the
+    values before it. Leaves are all the other values, picked from the
+    tuple in the order the record's keys are walked.
+    """
+
+    def __init__(
+        self, obj: dict[str, Any], prefix: str, inline: Callable[[Any], bool]
+    ) -> None:
+        """Plan the unpacking of a sample record, depth-first.
+
+        Args:
+            obj: The sample record.
+            prefix: Prefix of the column names.
+            inline: Whether a nested object is unpacked in place.
+        """
+        self.width = len(obj)
+        # (position among the unpacked values, key sequence) of each nested
+        # object unpacked in place
+        self.nested: list[tuple[int, tuple[str, ...]]] = []
+        # Allowed types of each unpacked value
+        self.kinds: tuple[frozenset[type], ...] = ()
+        # (column, sample value) of each leaf
+        self.leaves: list[tuple[str, Any]] = []
+        slots = []
+
+        stack = [self._add_object(obj, prefix)]
+        while stack:
+            for column, value, slot in stack[-1]:
+                if isinstance(value, dict) and inline(value):
+                    self.nested.append((slot, tuple(value)))
+                    stack.append(self._add_object(value, f"{column}."))
+                    break
+                self.leaves.append((column, value))
+                slots.append(slot)
+            else:
+                stack.pop()
+
+        # Without nested objects the leaves are the record's values
+        self.flat = not self.nested
+        if len(slots) == 1:
+            slot = slots[0]
+            self._pick = lambda values: (values[slot],)
+        else:
+            self._pick = operator.itemgetter(*slots) if slots else lambda _: ()
+
+    def _add_object(
+        self, obj: dict[str, Any], prefix: str
+    ) -> Iterator[tuple[str, Any, int]]:
+        """Add an object to unpack and iterate over its values.
+
+        Args:
+            obj: The sample object.
+            prefix: Prefix of the object's column names.
+
+        Returns:
+            (column, sample value, position among the unpacked values) of
+            each of its values.
+        """
+        offset = len(self.kinds)
+        self.kinds += tuple(_kind(value) for value in obj.values())
+        return iter(
+            [
+                (f"{prefix}{key}", value, offset + i)
+                for i, (key, value) in enumerate(obj.items())
+            ]
+        )
+
+    def unpack(self, obj: dict[str, Any]) -> tuple[Any, ...] | None:
+        """Unpack the leaf values of a record.
+
+        Args:
+            obj: The record, with the sample's key sequence (PlanCache keys
+                plans on it).
+
+        Returns:
+            The leaf values in order, or None if the record's value kinds or
+            nested keys differ from the sample's.
+        """
+        if len(obj) != self.width:
+            return None
+        values = tuple(obj.values())
+        for slot, keys in self.nested:
+            node = values[slot]
+            if type(node) is not dict or tuple(node) != keys:
+                return None
+            values += tuple(node.values())
+        if not all(map(frozenset.__contains__, self.kinds, map(type, values))):
+            return None
+        return values if self.flat else self._pick(values)
+
+
+def _kind(value: Any) -> frozenset[type]:
+    """Return the types a value of a record's shape can have."""
+    if isinstance(value, dict):
+        return _DICTS
+    if isinstance(value, list):
+        return _LISTS
+    return _SCALARS
+
+
+def _has_string_keys(obj: dict[str, Any]) -> bool:
+    """Check that an object and all its nested objects have string keys."""
+    return all(isinstance(key, str) for node in iter_objects(obj) for key in node)
+
+
+def _has_arrays(obj: dict[str, Any]) -> bool:
+    """Check whether an object or any of its nested objects holds an array."""
+    return any(isinstance(value, list) for _, value in iter_leaves(obj))
+
+
+def _inline_all(value: dict[str, Any]) -> bool:
+    """Unpack every nested object in place."""
+    return True
+
+
+def _dump_array(value: list[Any]) -> str:
+    """Serialize an array kept in a single row, as flatten_record does."""
+    return json_codec.dumps(value) if value else "[]"
+
+
+def compile_flattener(
+    obj: dict[str, Any], prefix: str = ""
+) -> Callable[[dict[str, Any]], dict[str, Any] | None] | None:
+    """Plan a single-row flattener for the shape of a sample record.
+
+    The planned function returns the same row as flatten_record for any
+    record of the sample's shape, and None for any other record.
+
+    Args:
+        obj: The sample record.
+        prefix: Prefix of the column names.
+
+    Returns:
+        The planned function, or None if the record has non-string keys.
+    """
+    if not _has_string_keys(obj):
+        return None
+
+    shape = _Shape(obj, prefix, _inline_all)
+    unpack = shape.unpack
+    columns = [column for column, _ in shape.leaves]
+    arrays = [i for i, (_, value) in enumerate(shape.leaves) if isinstance(value, list)]
+    # Columns are then the record's keys, so the row starts as its copy
+    copy = shape.flat and not prefix
+
+    def flatten(record: dict[str, Any]) -> dict[str, Any] | None:
+        values = unpack(record)
+        if values is None:
+            return None
+        if copy:
+            row = record.copy()
+            for i in arrays:
+                row[columns[i]] = _dump_array(values[i])
+            return row
+        if arrays:
+            values = list(values)
+            for i in arrays:
+                values[i] = _dump_array(values[i])
+        return dict(zip(columns, values))
+
+    return flatten
+
+
+def compile_splitter(
+    obj: dict[str, Any], prefix: str = ""
+) -> Callable[[dict[str, Any]], list[tuple[Any, ...]] | None] | None:
+    """Plan the split of a record shape for row expansion.
+
+    The planned function returns the record's split operations (see
+    record_split), or None if the record doesn't have the sample's shape.
+    Nested objects without arrays are inlined into the scalar fields.
+
+    Args:
+        obj: The sample record.
+        prefix: Prefix of the column names.
+
+    Returns:
+        The planned function, or None if the record has non-string keys.
+    """
+    if not _has_string_keys(obj):
+        return None
+
+    def inline(value: dict[str, Any]) -> bool:
+        return not _has_arrays(value)
+
+    shape = _Shape(obj, prefix, inline)
+    # (SCALAR_FIELDS, columns, first leaf, end leaf), (NESTED_OBJECT, leaf,
+    # prefix) or (ARRAY, leaf, column, prefix)
+    steps: list[tuple[Any, ...]] = []
+    fields: list[str] = []
+    for i, (column, value) in enumerate(shape.leaves):
+        if not isinstance(value, (dict, list)):
+            fields.append(column)
+            continue
+        if fields:
+            steps.append((SCALAR_FIELDS, fields, i - len(fields), i))
+            fields = []
+        if isinstance(value, dict):
+            steps.append((NESTED_OBJECT, i, f"{column}."))
+        else:
+            steps.append((ARRAY, i, column, f"{column}."))
+    if fields:
+        end = len(shape.leaves)
+        steps.append((SCALAR_FIELDS, fields, end - len(fields), end))
+
+    unpack = shape.unpack
+
+    def split(record: dict[str, Any]) -> list[tuple[Any, ...]] | None:
+        values = unpack(record)
+        if values is None:
+            return None
+        operations = []
+        for step in steps:
+            if step[0] == SCALAR_FIELDS:
+                _, columns, begin, end = step
+                operations.append(
+                    (SCALAR_FIELDS, dict(zip(columns, values[begin:end])))
+                )
+            elif step[0] == NESTED_OBJECT:
+                operations.append((NESTED_OBJECT, values[step[1]], step[2]))
+            else:
+                operations.append((ARRAY, values[step[1]], step[2], step[3]))
+        return operations
+
+    return split
+
+
+def compile_array_free_flattener(
+    obj: dict[str, Any], prefix: str = ""
+) -> Callable[[dict[str, Any]], tuple[tuple[str, ...], tuple[Any, ...]] | None] | None:
+    """Plan a flattener to row values for a record shape holding no arrays.
+
+    The planned function returns the column names and the values of the
+    flattened row, or None for any record not of the sample's shape. It
+    returns the same column tuple object for every record, and rejects any
+    record holding an array, so the row it describes is also the record's
+    only row when arrays are expanded.
+
+    Args:
+        obj: The sample record.
+        prefix: Prefix of the column names.
+
+    Returns:
+        The planned function, or None if the sample holds an array, has
+        non-string keys, or flattens two keys to the same column.
+    """
+    if _has_arrays(obj) or not _has_string_keys(obj):
+        return None
+
+    shape = _Shape(obj, prefix, _inline_all)
+    unpack = shape.unpack
+    columns = tuple(column for column, _ in shape.leaves)
+    if len(set(columns)) < len(columns):
+        return None
+
+    def flatten_values(
+        record: dict[str, Any],
+    ) -> tuple[tuple[str, ...], tuple[Any, ...]] | None:
+        values = unpack(record)
+        if values is None:
+            return None
+        return columns, values
+
+    return flatten_values
+
+
+_flatteners = PlanCache(compile_flattener)
+_array_free_flatteners = PlanCache(compile_array_free_flattener)
+_splitters = PlanCache(compile_splitter)
+
+
+def flatten_array_free(
+    obj: dict[str, Any],
+) -> tuple[tuple[str, ...], tuple[Any, ...]] | None:
+    """Flatten a record that holds no arrays at any depth, to row values.
+
+    Such a record expands to exactly one row, its flattened form, so it
+    doesn't need the expansion path. Records of one shape share the same
+    column tuple, which ColumnBuilder.append_values batches on.
+
+    Args:
+        obj: The record.
+
+    Returns:
+        The column names and the row's values, or None if the record holds
+        an array or no plan matches it.
+    """
+    return _array_free_flatteners.apply(obj)
+
+
+def record_split(obj: dict[str, Any], prefix: str = "") -> list[tuple[Any, ...]]:
+    """Split a record into the operations that expand it into rows.
+
+    Consecutive scalar fields are grouped into one SCALAR_FIELDS operation;
+    each nested object and array becomes its own operation, in key order.
+    Records of a shape seen before are split by its plan, which
+    also inlines nested objects without arrays.
+
+    Args:
+        obj: The record.
+        prefix: Prefix of the record's column names.
+
+    Returns:
+        The split operations.
+    """
+    operations = _splitters.apply(obj, prefix)
+    if operations is not None:
+        return operations
+
+    operations = []
+    fields: dict[str, Any] = {}
+    for key, value in obj.items():
+        column = f"{prefix}{key}"
+        if not isinstance(value, (dict, list)):
+            fields[column] = value
+            continue
+        if fields:
+            operations.append((SCALAR_FIELDS, fields))
+            fields = {}
+        if isinstance(value, dict):
+            operations.append((NESTED_OBJECT, value, f"{column}."))
+        else:
+            operations.append((ARRAY, value, column, f"{column}."))
+    if fields:
+        operations.append((SCALAR_FIELDS, fields))
+    return operations
+
+
+def flatten_record(obj: dict[str, Any], prefix: str = "") -> dict[str, Any]:
+    """Flatten a record to a single row using dot notation.
+
+    Nested objects are flattened into the row and arrays are kept as JSON
+    strings. Records of a shape seen before use its planned flattener.
+
+    Args:
+        obj: The record.
+        prefix: Prefix for the column names.
+
+    Returns:
+        The flat row.
+    """
+    row = _flatteners.apply(obj, prefix)
+    if row is not None:
+        return row
+
+    row = {}
+    for column, value in iter_leaves(obj, prefix):
+        if isinstance(value, list):
+            row[column] = json_codec.dumps(value) if value else "[]"
+        else:
+            row[column] = value
+    return row
@@ -0,0 +1,156 @@
+"""Column-at-a-time construction of DataFrames from flat rows."""
+
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+class ColumnBuilder:
+    """Accumulates flat rows into per-column lists.
+
+    Each column name is mapped to an index the first time it is seen, and
+    values are appended to that column's list, so no dict is kept per row.
+    Columns missing from a row are backfilled with NaN, as
+    ``pd.DataFrame(rows)`` does. Building the DataFrame from the columns
+    gives the same frame as from the list of rows, with columns in order of
+    first appearance.
+
+    Consecutive rows given as values for the same column tuple are batched
+    and transposed into the columns together.
+    """
+
+    def __init__(self) -> None:
+        self._index: dict[str, int] = {}
+        self._columns: list[list[Any]] = []
+        self._row_count = 0
+        self._batch_columns: tuple[str, ...] = ()
+        self._batch: list[tuple[Any, ...]] = []
+
+    def __len__(self) -> int:
+        return self._row_count + len(self._batch)
+
+    def append(self, row: dict[str, Any]) -> None:
+        """Add one row.
+
+        Args:
+            row: Mapping of column name to value.
+        """
+        if self._batch:
+            self._flush()
+        index = self._index
+        columns = self._columns
+        row_count = self._row_count
+        for key, value in row.items():
+            position = index.get(key)
+            if position is None:
+                index[key] = len(columns)
+                columns.append([np.nan] * row_count)
+                columns[-1].append(value)
+            else:
+                columns[position].append(value)
+
+        self._row_count = row_count + 1
+        if len(row) != len(columns):
+            # Some known columns are missing from this row
+            for column in columns:
+                if len(column) == row_count:
+                    column.append(np.nan)
+
+    def append_values(self, columns: tuple[str, ...], values: tuple[Any, ...]) -> None:
+        """Add one row given as values in column order.
+
+        Args:
+            columns: Distinct column names. Passing the same tuple object
+                for consecutive rows lets them be batched.
+            values: One value per column.
+        """
+        if columns is not self._batch_columns:
+            self._flush()
+            self._batch_columns = columns
+        self._batch.append(values)
+
+    def _flush(self) -> None:
+        """Move the batched rows into the columns."""
+        if not self._batch:
+            return
+        batch = self._batch
+        self._batch = []
+        self._add_columns(self._batch_columns, zip(*batch), len(batch))
+
+    def _add_columns(
+        self, names: Iterable[str], values: Iterable[Iterable[Any]], row_count: int
+    ) -> None:
+        """Append rows given column by column.
+
+        Args:
+            names: Distinct column names.
+            values: The values of each named column, row_count each.
+            row_count: Number of rows added.
+        """
+        index = self._index
+        columns = self._columns
+        total = self._row_count
+        for key, column_values in zip(names, values):
+            position = index.get(key)
+            if position is None:
+                index[key] = len(columns)
+                columns.append([np.nan] * total)
+                columns[-1].extend(column_values)
+            else:
+                columns[position].extend(column_values)
+
+        total += row_count
+        self._row_count = total
+        for column in columns:
+            if len(column) < total:
+                column.extend([np.nan] * (total - len(column)))
+
+    def to_columns(self) -> tuple[list[str], list[list[Any]], int]:
+        """Get the accumulated rows as columns, e.g. to merge into another builder.
+
+        Returns:
+            (column names in order of first appearance, their value lists,
+            row count).
+        """
+        self._flush()
+        return list(self._index), self._columns, self._row_count
+
+    def extend_columns(
+        self, names: list[str], columns: list[list[Any]], row_count: int
+    ) -> None:
+        """Add rows accumulated by another builder, after the rows added so far.
+
+        Merging builders in order gives the same columns as adding all their
+        rows to one builder.
+
+        Args:
+            names: Column names, as returned by to_columns.
+            columns: Values of each column, as returned by to_columns.
+            row_count: Number of rows, as returned by to_columns.
+        """
+        self._flush()
+        self._add_columns(names, columns, row_count)
+
+    def extend(self, rows: Iterable[dict[str, Any]]) -> None:
+        """Add rows in order.
+
+        Args:
+            rows: Mappings of column name to value, consumed once.
+        """
+        for row in rows:
+            self.append(row)
+
+    def build(self) -> pd.DataFrame:
+        """Build the DataFrame from the accumulated columns.
+
+        Returns:
+            A DataFrame with one column per name seen, in order of first
+            appearance.
+        """
+        self._flush()
+        return pd.DataFrame(
+            dict(zip(self._index, self._columns)),
+            index=pd.RangeIndex(self._row_count),
+        )
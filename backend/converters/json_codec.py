@@ -0,0 +1,161 @@
+"""JSON decoding and encoding through the fastest installed backend.
+
+Documents are decoded with msgspec or orjson when one of them is installed
+(the ``json`` extra installs msgspec), and with the standard library
+otherwise. The accelerated decoders are strict RFC 8259 parsers and report
+errors without line and column, so any document they reject is decoded
+again with the standard library: it either accepts the document (e.g. NaN
+literals) or raises json.JSONDecodeError with the position, exactly as
+before.
+
+msgspec is preferred as it decodes integers of any width, as the standard
+library does. orjson silently decodes integers outside the 64-bit range as
+floats, so documents holding an integer literal of 19 digits or more are
+left to the standard library when orjson is the backend.
+
+Encoding always uses the standard library. Neither orjson nor msgspec can
+write json.dumps's separators, ASCII escapes or float spellings, and the
+output of the converters must stay byte for byte the same.
+"""
+
+import json
+import mmap
+import re
+from collections.abc import Callable
+from typing import Any
+
+from backend.utils.uploads import FileContent
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_fast_decode: Callable[[FileContent | str], Any] | None
+_fast_errors: tuple[type[Exception], ...]
+# Whether the backend decodes integers wider than 64 bits as floats
+_narrow_ints = False
+if msgspec is not None:
+    BACKEND = "msgspec"
+    _fast_decode = msgspec.json.decode
+    _fast_errors = (msgspec.DecodeError,)
+elif orjson is not None:
+    BACKEND = "orjson"
+    _fast_decode = orjson.loads
+    _fast_errors = (orjson.JSONDecodeError,)
+    _narrow_ints = True
+else:
+    BACKEND = "json"
+    _fast_decode = None
+    _fast_errors = ()
+
+# A run of 19 or more digits outside a fraction: the integer part of a
+# number that may not fit in 64 bits. Runs inside strings or exponents match
+# too, which only costs the standard library's slower decode.
+_WIDE_INT = r"(?<![\d.])\d{19,}"
+_WIDE_INT_BYTES = re.compile(_WIDE_INT.encode())
+_WIDE_INT_TEXT = re.compile(_WIDE_INT)
+
+# Built once: json.dumps constructs a new encoder per call for non-default
+# options
+_ASCII_ENCODER = json.JSONEncoder()
+_UNICODE_ENCODER = json.JSONEncoder(ensure_ascii=False)
+_COMPACT_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+_PRETTY_ENCODER = json.JSONEncoder(ensure_ascii=False, indent=2)
+
+
+def loads(content: FileContent | str) -> Any:
+    """Decode a JSON document.
+
+    Args:
+        content: UTF-8 encoded JSON, or JSON text.
+
+    Returns:
+        The decoded value, as json.loads returns it.
+
+    Raises:
+        UnicodeDecodeError: If bytes content is not valid UTF-8.
+        json.JSONDecodeError: If the document is not valid JSON.
+    """
+    if _fast_decode is not None and not (_narrow_ints and _has_wide_int(content)):
+        try:
+            if isinstance(content, mmap.mmap):
+                # Release the export so the mapping can still be closed
+                with memoryview(content) as view:
+                    return _fast_decode(view)
+            return _fast_decode(content)
+        except _fast_errors:
+            # Re-decode below for the standard library's verdict and position
+            pass
+    if not isinstance(content, str):
+        content = str(content, "utf-8")
+    return json.loads(content)
+
+
+def _has_wide_int(content: FileContent | str) -> bool:
+    """Check whether a document may hold an integer wider than 64 bits.
+
+    Args:
+        content: UTF-8 encoded JSON, or JSON text.
+
+    Returns:
+        True if the document holds a run of 19 or more digits outside a
+        fraction, so it must be decoded by the standard library.
+    """
+    if isinstance(content, str):
+        return _WIDE_INT_TEXT.search(content) is not None
+    return _WIDE_INT_BYTES.search(content) is not None
+
+
+def dumps(obj: Any) -> str:
+    """Encode a value as json.dumps does with default options.
+
+    Args:
+        obj: The value to encode.
+
+    Returns:
+        Compact JSON text with non-ASCII characters escaped.
+    """
+    return _ASCII_ENCODER.encode(obj)
+
+
+def dumps_unicode(obj: Any) -> str:
+    """Encode a value as json.dumps does with ``ensure_ascii=False``.
+
+    Args:
+        obj: The value to encode.
+
+    Returns:
+        Compact JSON text with non-ASCII characters kept.
+    """
+    return _UNICODE_ENCODER.encode(obj)
+
+
+def dumps_compact(obj: Any) -> str:
+    """Encode a value without whitespace, keeping non-ASCII characters.
+
+    Args:
+        obj: The value to encode.
+
+    Returns:
+        JSON text as json.dumps writes it with ``ensure_ascii=False,
+        separators=(",", ":")``.
+    """
+    return _COMPACT_ENCODER.encode(obj)
+
+
+def dumps_pretty(obj: Any) -> str:
+    """Encode a value as json.dumps does with ``indent=2, ensure_ascii=False``.
+
+    Args:
+        obj: The value to encode.
+
+    Returns:
+        Indented JSON text with non-ASCII characters kept.
+    """
+    return _PRETTY_ENCODER.encode(obj)
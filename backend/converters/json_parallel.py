@@ -0,0 +1,317 @@
+"""Parallel processing of the objects of a large root JSON array.
+
+The document is cut into one range of root objects per worker process.
+Each worker parses the objects of its range and processes them, so parsing
+is spread over the workers as well and only bytes and processed results
+cross process boundaries.
+
+The commas separating root objects are found first, by one vectorized scan
+of the raw bytes that follows strings (with their escapes) and the nesting
+of brackets and braces, so each range is cut exactly between two root
+objects and is parsed once. The scan doesn't validate the document: a
+worker only accepts its range if it is a run of objects separated by
+commas (the last one closing the array), so the ranges joined by commas
+are a valid array of objects whatever the scan found. Any invalid range
+or worker failure gives up, and the caller takes its serial path, which
+also reports errors exactly as before.
+"""
+
+import json
+import multiprocessing
+import re
+import threading
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+import numpy as np
+
+from backend.config import JSON_WORKERS, PARALLEL_JSON_MIN_BYTES
+from backend.utils.uploads import FileContent
+
+# Bytes scanned at a time, bounding the scan's temporary arrays
+_SCAN_BLOCK_BYTES = 16 * 1024 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_WHITESPACE_BYTES = re.compile(rb"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+_QUOTE = ord('"')
+_BACKSLASH = ord("\\")
+_COMMA = ord(",")
+# Nesting change of each structural byte
+_DEPTH = np.zeros(256, dtype=np.int8)
+_DEPTH[[ord("["), ord("{")]] = 1
+_DEPTH[[ord("]"), ord("}")]] = -1
+_STRUCTURAL = (_DEPTH != 0) | (np.arange(256) == _COMMA)
+
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def map_array_chunks[R](
+    content: FileContent,
+    process: Callable[[list[dict[str, Any]]], R],
+    workers: int | None = None,
+    min_bytes: int | None = None,
+) -> list[R] | None:
+    """Process the objects of a root JSON array in parallel chunks.
+
+    Args:
+        content: JSON content as bytes.
+        process: Picklable function applied in a worker to each chunk of
+            consecutive root objects.
+        workers: Number of worker processes. Defaults to JSON_WORKERS.
+        min_bytes: Smallest content processed in parallel. Defaults to
+            PARALLEL_JSON_MIN_BYTES.
+
+    Returns:
+        The result of each chunk, in document order, or None if the content
+        is too small, not a valid array of at least two objects, or could
+        not be processed in parallel. Concatenated, the chunks are the root
+        objects in order.
+    """
+    workers = JSON_WORKERS if workers is None else workers
+    min_bytes = PARALLEL_JSON_MIN_BYTES if min_bytes is None else min_bytes
+    if workers < 2 or len(content) < min_bytes:
+        return None
+
+    start = _WHITESPACE_BYTES.match(content).end()
+    if content[start : start + 1] != b"[":
+        return None
+    start = _WHITESPACE_BYTES.match(content, start + 1).end()
+    if content[start : start + 1] != b"{":
+        return None
+
+    ranges = _split_ranges(content, start, workers)
+    if len(ranges) < 2:
+        return None
+    try:
+        pool = _get_pool(workers)
+        futures = [
+            pool.submit(
+                _process_range, process, content[begin:end], end == len(content)
+            )
+            for begin, end in ranges
+        ]
+        chunks = [future.result() for future in futures]
+    except BrokenProcessPool:
+        _reset_pool()
+        return None
+
+    if any(chunk is None for chunk in chunks):
+        return None
+    return [chunk[0] for chunk in chunks]
+
+
+def _split_ranges(
+    content: FileContent, start: int, workers: int
+) -> list[tuple[int, int]]:
+    """Cut the root objects of an array into about equal ranges of bytes.
+
+    Args:
+        content: JSON content as bytes.
+        start: Position of the first root object.
+        workers: Number of ranges wanted.
+
+    Returns:
+        (start, end) of each range, between two root separators; the last
+        one runs to the end of the content.
+    """
+    separators = _root_separators(content, start)
+    if not len(separators):
+        return [(start, len(content))]
+    size = len(content) - start
+    targets = [start + size * k // workers for k in range(1, workers)]
+    # Each range ends at the first separator from its target on, or the last
+    found = np.minimum(np.searchsorted(separators, targets), len(separators) - 1)
+    cuts = sorted({int(separators[i]) for i in found})
+    begins = [start] + [cut + 1 for cut in cuts]
+    ends = cuts + [len(content)]
+    return list(zip(begins, ends, strict=True))
+
+
+def _root_separators(content: FileContent, start: int) -> np.ndarray:
+    """Find the commas between the root objects of an array.
+
+    A byte is inside a string if an odd number of unescaped quotes precede
+    it; outside strings, brackets and braces open and close nesting levels,
+    and root separators are the commas at depth 1.
+
+    Args:
+        content: JSON content as bytes.
+        start: Position of the first root object, just inside the array.
+
+    Returns:
+        Positions of the root separators, in order.
+    """
+    found = []
+    depth = 1
+    in_string = False
+    # Backslashes ending the previous block, escaping a quote starting this one
+    backslashes = 0
+    size = len(content)
+    with memoryview(content) as view:
+        for base in range(start, size, _SCAN_BLOCK_BYTES):
+            block = np.frombuffer(
+                view[base : min(base + _SCAN_BLOCK_BYTES, size)], dtype=np.uint8
+            )
+            runs = _BackslashRuns(block, backslashes)
+            is_quote = block == _QUOTE
+            # A quote after an odd run of backslashes is escaped
+            quotes = np.flatnonzero(is_quote)
+            previous = block[np.maximum(quotes - 1, 0)] == _BACKSLASH
+            previous[quotes == 0] = backslashes > 0
+            candidates = quotes[previous]
+            is_quote[candidates[runs.before(candidates) % 2 == 1]] = False
+
+            inside = np.bitwise_xor.accumulate(is_quote)
+            structural = np.flatnonzero(_STRUCTURAL[block])
+            structural = structural[inside[structural] == in_string]
+            kinds = block[structural]
+            depths = depth + np.cumsum(_DEPTH[kinds], dtype=np.int64)
+            found.append(base + structural[(kinds == _COMMA) & (depths == 1)])
+
+            in_string ^= bool(inside[-1])
+            if len(depths):
+                depth = int(depths[-1])
+            backslashes = int(runs.before(np.array([len(block)]))[0])
+    return np.concatenate(found) if found else np.empty(0, dtype=np.intp)
+
+
+class _BackslashRuns:
+    """Runs of backslashes in a block of JSON bytes."""
+
+    def __init__(self, block: np.ndarray, carried: int) -> None:
+        """Find the runs of a block.
+
+        Args:
+            block: The bytes of the block.
+            carried: Backslashes ending the previous block, which continue
+                a run starting the block.
+        """
+        self.carried = carried
+        self.positions = np.flatnonzero(block == _BACKSLASH)
+        # Backslashes of a run have consecutive positions, so position minus
+        # rank is the same along a run and changes between runs
+        key = self.positions - np.arange(len(self.positions))
+        self.run_starts = np.flatnonzero(np.diff(key, prepend=-1) != 0)
+
+    def before(self, positions: np.ndarray) -> np.ndarray:
+        """Count the backslashes right before each position.
+
+        Args:
+            positions: Positions in the block, in order.
+
+        Returns:
+            Length of the run of backslashes ending just before each position.
+        """
+        counts = np.zeros(len(positions), dtype=np.int64)
+        # The run ending the previous block is right before the first byte
+        counts[positions == 0] = self.carried
+        if not len(self.positions):
+            return counts
+
+        last = np.searchsorted(self.positions, positions) - 1
+        ends_run = (last >= 0) & (self.positions[np.maximum(last, 0)] == positions - 1)
+        last = last[ends_run]
+        first = self.run_starts[np.searchsorted(self.run_starts, last, "right") - 1]
+        lengths = last - first + 1
+        lengths[self.positions[first] == 0] += self.carried
+        counts[ends_run] = lengths
+        return counts
+
+
+def _process_range[R](
+    process: Callable[[list[dict[str, Any]]], R], data: bytes, last: bool
+) -> tuple[R] | None:
+    """Parse and process a range of root objects.
+
+    Runs in a worker process.
+
+    Args:
+        process: Function applied to the parsed objects.
+        data: The objects of the range, separated by commas.
+        last: Whether the range runs to the end of the document, so it
+            closes the array.
+
+    Returns:
+        (the processed objects,), or None if the range isn't valid UTF-8
+        or a run of objects.
+    """
+    try:
+        objects = _parse_run(str(data, "utf-8"), last)
+    except (ValueError, RecursionError):
+        return None
+    return (process(objects),)
+
+
+def _parse_run(text: str, last: bool) -> list[dict[str, Any]]:
+    """Parse a run of objects separated by commas.
+
+    Args:
+        text: The text to parse.
+        last: Whether the run must be followed by the array's closing ']'
+            and nothing else but whitespace.
+
+    Returns:
+        The parsed objects.
+
+    Raises:
+        ValueError: If the text isn't a run of objects (UnicodeDecodeError
+            and json.JSONDecodeError are ValueErrors).
+    """
+    objects = []
+    pos = _WHITESPACE.match(text).end()
+    while True:
+        value, pos = _DECODER.raw_decode(text, pos)
+        if type(value) is not dict:
+            raise ValueError("Array item is not an object")
+        objects.append(value)
+        pos = _WHITESPACE.match(text, pos).end()
+        separator = text[pos : pos + 1]
+        if separator == ",":
+            pos = _WHITESPACE.match(text, pos + 1).end()
+        elif not last and pos == len(text):
+            return objects
+        elif separator == "]" and last:
+            if _WHITESPACE.match(text, pos + 1).end() != len(text):
+                raise ValueError("Extra data after the array")
+            return objects
+        else:
+            raise ValueError("Expecting ',' delimiter")
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Get the shared worker pool, starting it on first use.
+
+    Workers are spawned rather than forked, as forking a multi-threaded
+    server process is unsafe.
+
+    Args:
+        workers: Number of worker processes.
+
+    Returns:
+        The pool.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def _reset_pool() -> None:
+    """Drop a broken pool so the next call starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = None
@@ -0,0 +1,153 @@
+"""Incremental parsing of JSON documents whose root is an array."""
+
+import codecs
+import json
+import re
+from collections.abc import Iterator
+from typing import Any
+
+from backend.utils.uploads import FileContent
+
+# Bytes decoded per read; a value larger than this grows the window
+READ_CHUNK_BYTES = 1024 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_LEADING_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+# Characters that must follow a value before it is known to be complete
+_NUMBER_LOOKAHEAD = 3
+
+
+def is_root_array(content: FileContent) -> bool:
+    """Check whether a JSON document's root value is an array.
+
+    Args:
+        content: JSON content as bytes.
+
+    Returns:
+        True if the first non-whitespace byte is '['.
+    """
+    start = _LEADING_WHITESPACE.match(content).end()
+    return content[start : start + 1] == b"["
+
+
+def iter_array_items(
+    content: FileContent, chunk_bytes: int = READ_CHUNK_BYTES
+) -> Iterator[Any]:
+    """Yield the items of a root JSON array one at a time.
+
+    The content is decoded and parsed through a sliding window, so only the
+    current item and one read chunk are held as text and Python objects.
+    The document is validated exactly as json.loads would, up to the
+    closing bracket and trailing whitespace.
+
+    Args:
+        content: UTF-8 JSON content whose root value is an array.
+        chunk_bytes: Number of bytes decoded per read.
+
+    Yields:
+        Each item of the root array.
+
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON. Positions
+            are relative to the window, not the document.
+        UnicodeDecodeError: If the content is not valid UTF-8.
+    """
+    window = _TextWindow(content, chunk_bytes)
+    if window.skip_whitespace() != "[":
+        raise json.JSONDecodeError("Expecting '['", window.text, window.pos)
+    window.pos += 1
+
+    if window.skip_whitespace() == "]":
+        window.pos += 1
+    else:
+        while True:
+            yield window.decode_value()
+            char = window.skip_whitespace()
+            if char == "]":
+                window.pos += 1
+                break
+            if char != ",":
+                raise json.JSONDecodeError(
+                    "Expecting ',' delimiter", window.text, window.pos
+                )
+            window.pos += 1
+            window.skip_whitespace()
+
+    if window.skip_whitespace():
+        raise json.JSONDecodeError("Extra data", window.text, window.pos)
+
+
+class _TextWindow:
+    """Decoded text over a read position in UTF-8 content."""
+
+    def __init__(self, content: FileContent, chunk_bytes: int) -> None:
+        """Initialize the window at the start of the content.
+
+        Args:
+            content: UTF-8 content.
+            chunk_bytes: Number of bytes decoded per read.
+        """
+        self.text = ""
+        self.pos = 0
+        self._view = memoryview(content)
+        self._offset = 0
+        self._chunk_bytes = chunk_bytes
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def fill(self) -> bool:
+        """Drop consumed text and decode the next chunk.
+
+        The read size at least matches the pending text, so a value spanning
+        many chunks is re-parsed a logarithmic number of times.
+
+        Returns:
+            False if the content was already fully read.
+        """
+        if self._offset >= len(self._view):
+            return False
+        size = max(self._chunk_bytes, len(self.text) - self.pos)
+        end = min(self._offset + size, len(self._view))
+        chunk = self._view[self._offset : end]
+        self._offset = end
+        final = end == len(self._view)
+        self.text = self.text[self.pos :] + self._decoder.decode(chunk, final)
+        self.pos = 0
+        return True
+
+    def skip_whitespace(self) -> str:
+        """Move past whitespace, reading more content as needed.
+
+        Returns:
+            The next character, or "" at the end of the content.
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def decode_value(self) -> Any:
+        """Decode the JSON value at the current position.
+
+        Returns:
+            The decoded value.
+
+        Raises:
+            json.JSONDecodeError: If the value is invalid.
+        """
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                # Possibly cut off by the end of the window
+                if not self.fill():
+                    raise
+                continue
+            # A number near the end of the window may continue in the next
+            # chunk, e.g. "1.5" cut from "1.5e-3" leaves only "e-" behind
+            if len(self.text) - end < _NUMBER_LOOKAHEAD and self.fill():
+                continue
+            self.pos = end
+            return value
@@ -0,0 +1,180 @@
+"""One-pass structural summary of a parsed JSON document."""
+
+from dataclasses import dataclass
+from typing import Any
+
+from backend.converters.json_walk import Frame, resolve
+
+_PRIMITIVES = (str, int, float, bool, type(None))
+
+
+@dataclass(frozen=True)
+class ArraySummary:
+    """An array path of a document.
+
+    Attributes:
+        path: Dot-notation path of the array, as its column is named.
+        count: Number of elements of the first non-empty occurrence, as the
+            representative size of the array (0 if every occurrence is
+            empty).
+        kind: "objects" or "primitives" if every non-empty occurrence holds
+            only that kind of element, "mixed" otherwise, "empty" if every
+            occurrence is empty.
+    """
+
+    path: str
+    count: int
+    kind: str
+
+
+@dataclass(frozen=True)
+class DocumentSummary:
+    """Structure of a parsed JSON document, gathered in a single walk.
+
+    Attributes:
+        root: "array", "object", or the type name of another root value.
+        record_count: Number of root records: the length of a root array,
+            1 for a root object, 0 otherwise.
+        objects_only: Whether the root is an object or an array of objects.
+            The other fields describe the records only if it is.
+        row_count: Exact number of rows in normal (expanded) mode.
+        arrays: Array paths in order of first appearance.
+        max_depth: Deepest object nesting, counting the record as 1 and
+            each nested object or object in an array as one more.
+    """
+
+    root: str
+    record_count: int
+    objects_only: bool
+    row_count: int = 0
+    arrays: tuple[ArraySummary, ...] = ()
+    max_depth: int = 0
+
+
+def summarize(data: Any) -> DocumentSummary:
+    """Summarize the structure of a parsed JSON document.
+
+    Every value of every record is visited once, with an explicit stack.
+
+    Args:
+        data: Parsed JSON data.
+
+    Returns:
+        The document summary.
+    """
+    if isinstance(data, list):
+        if not all(isinstance(item, dict) for item in data):
+            return DocumentSummary("array", len(data), objects_only=False)
+        root, records = "array", data
+    elif isinstance(data, dict):
+        root, records = "object", [data]
+    else:
+        return DocumentSummary(type(data).__name__, 0, objects_only=False)
+
+    walk = _Walk()
+    row_count = sum(resolve(walk.frame, record, "", 1) for record in records)
+    return DocumentSummary(
+        root,
+        len(records),
+        objects_only=True,
+        row_count=row_count,
+        arrays=tuple(
+            ArraySummary(path, count, kind)
+            for path, (count, kind) in walk.arrays.items()
+        ),
+        max_depth=walk.max_depth,
+    )
+
+
+def count_rows(obj: dict[str, Any]) -> int:
+    """Count the rows an object expands to in normal mode, without expanding it.
+
+    Args:
+        obj: The object to count.
+
+    Returns:
+        The exact number of rows JsonToCsvConverter expands the object to.
+    """
+    return resolve(_Walk().frame, obj, "", 1)
+
+
+def _array_kind(value: list[Any]) -> str:
+    """Classify the elements of an array.
+
+    Args:
+        value: The array.
+
+    Returns:
+        "empty", "objects", "primitives" or "mixed".
+    """
+    if not value:
+        return "empty"
+    if all(isinstance(item, dict) for item in value):
+        return "objects"
+    if all(isinstance(item, _PRIMITIVES) for item in value):
+        return "primitives"
+    return "mixed"
+
+
+class _Walk:
+    """State gathered while walking the records of a document."""
+
+    def __init__(self) -> None:
+        self.arrays: dict[str, tuple[int, str]] = {}
+        self.max_depth = 0
+
+    def frame(self, obj: dict[str, Any], prefix: str, depth: int) -> Frame:
+        """Walk one object and count its rows, given those of nested ones.
+
+        Rows are counted as JsonToCsvConverter expands them: nested objects
+        and arrays multiply the count, and the objects of an array add up
+        their own counts.
+
+        Args:
+            obj: The object to walk.
+            prefix: Path prefix of its keys.
+            depth: Nesting depth of the object.
+
+        Yields:
+            (nested object, prefix, depth) for each nested object.
+
+        Returns:
+            The number of rows of the object.
+        """
+        self.max_depth = max(self.max_depth, depth)
+        count = 1
+        for key, value in obj.items():
+            path = f"{prefix}{key}"
+            if isinstance(value, dict):
+                count *= yield value, f"{path}.", depth + 1
+                continue
+            if not isinstance(value, list):
+                continue
+
+            kind = _array_kind(value)
+            self._add_array(path, len(value), kind)
+            if kind == "objects":
+                total = 0
+                for item in value:
+                    total += yield item, f"{path}.", depth + 1
+                count *= total
+            elif kind == "primitives":
+                count *= len(value)
+        return count
+
+    def _add_array(self, path: str, count: int, kind: str) -> None:
+        """Record an occurrence of an array path.
+
+        Args:
+            path: Path of the array.
+            count: Number of elements of this occurrence.
+            kind: Kind of this occurrence's elements.
+        """
+        previous = self.arrays.get(path)
+        if previous is not None:
+            count = previous[0] or count
+            if previous[1] != kind and kind != "empty":
+                kind = kind if previous[1] == "empty" else "mixed"
+            else:
+                kind = previous[1]
+        self.arrays[path] = (count, kind)
@@ -1,15 +1,30 @@
 """JSON to CSV converter."""
 
-import io
 import itertools
 import json
+from collections.abc import Iterable, Iterator
 from enum import Enum
 from typing import Any
 
 import pandas as pd
 
 from backend.config import COMPLEX_JSON_THRESHOLD, MAX_EXPANDED_ROWS
+from backend.converters import json_codec
 from backend.converters.base import BaseConverter
+from backend.converters.flatten_plan import (
+    NESTED_OBJECT,
+    SCALAR_FIELDS,
+    flatten_array_free,
+    flatten_record,
+    record_split,
+)
+from backend.converters.frame_builder import ColumnBuilder
+from backend.converters.json_parallel import map_array_chunks
+from backend.converters.json_stream import is_root_array, iter_array_items
+from backend.converters.json_summary import DocumentSummary, count_rows, summarize
+from backend.converters.json_walk import Frame, resolve
+from backend.converters.streaming import csv_chunks
+from backend.utils.uploads import FileContent
 
 
 class ExportMode(str, Enum):
@@ -27,7 +42,7 @@ class JsonToCsvConverter(BaseConverter):
     (Cartesian product / denormalization).
     """
 
-    def analyze_json_structure(self, content: bytes) -> dict[str, Any]:
+    def analyze_json_structure(self, content: FileContent) -> dict[str, Any]:
         """Analyze JSON structure to determine complexity.
 
         Calculates the potential Cartesian product expansion without
@@ -42,68 +57,75 @@ class JsonToCsvConverter(BaseConverter):
                 "is_complex": bool,
                 "estimated_rows": int,
                 "arrays_found": [{"path": str, "count": int}, ...],
-                "expansion_formula": str  # e.g., "3 × 6 × 4 = 72"
+                "expansion_formula": str,  # e.g., "3 × 6 × 4 = 72"
+                "record_count": int,  # root objects (or array items)
+                "max_depth": int  # deepest object nesting
             }
 
         Raises:
             ValueError: If JSON is invalid.
         """
-        try:
-            text = content.decode("utf-8")
-        except UnicodeDecodeError as e:
-            raise ValueError(
-                f"File encoding error: Unable to decode as UTF-8. Details: {e}"
-            ) from e
+        data = self._parse_json(content)
+        return self._analyze_data(self._summarize(content, data))
 
-        try:
-            data = json.loads(text)
-        except json.JSONDecodeError as e:
-            raise ValueError(
-                f"Invalid JSON at line {e.lineno}, column {e.colno}: {e.msg}"
-            ) from e
+    def _analyze_data(self, summary: DocumentSummary) -> dict[str, Any]:
+        """Analyze the structure of a JSON document from its summary.
 
-        # Analyze structure
-        if isinstance(data, list):
-            if not data:
+        Args:
+            summary: The document's structural summary.
+
+        Returns:
+            Analysis results (see analyze_json_structure).
+        """
+        if summary.root == "array":
+            if not summary.record_count:
                 return {
                     "is_complex": False,
                     "estimated_rows": 0,
                     "arrays_found": [],
                     "expansion_formula": "0",
+                    "record_count": 0,
+                    "max_depth": 0,
                 }
-            # For array of objects, analyze the first object as representative
-            # and multiply by array length
-            if all(isinstance(item, dict) for item in data):
-                # Analyze first item structure
-                arrays_info = self._find_arrays_in_object(data[0])
-                single_obj_rows = self._calculate_expansion_rows(arrays_info)
-                total_rows = single_obj_rows * len(data)
+            if summary.objects_only:
+                arrays_info = self._arrays_found(summary)
+                total_rows = summary.row_count
 
                 return {
                     "is_complex": total_rows > COMPLEX_JSON_THRESHOLD
                     and len(arrays_info) >= 2,
                     "estimated_rows": total_rows,
                     "arrays_found": arrays_info,
-                    "expansion_formula": self._build_formula(arrays_info, len(data)),
+                    "expansion_formula": self._build_formula(
+                        arrays_info, summary.record_count, total_rows
+                    ),
+                    "record_count": summary.record_count,
+                    "max_depth": summary.max_depth,
                 }
 
             return {
                 "is_complex": False,
-                "estimated_rows": len(data),
+                "estimated_rows": summary.record_count,
                 "arrays_found": [],
-                "expansion_formula": str(len(data)),
+                "expansion_formula": str(summary.record_count),
+                "record_count": summary.record_count,
+                "max_depth": 0,
             }
 
-        elif isinstance(data, dict):
-            arrays_info = self._find_arrays_in_object(data)
-            estimated_rows = self._calculate_expansion_rows(arrays_info)
+        elif summary.root == "object":
+            arrays_info = self._arrays_found(summary)
+            estimated_rows = summary.row_count
 
             return {
                 "is_complex": estimated_rows > COMPLEX_JSON_THRESHOLD
                 and len(arrays_info) >= 2,
                 "estimated_rows": estimated_rows,
                 "arrays_found": arrays_info,
-                "expansion_formula": self._build_formula(arrays_info),
+                "expansion_formula": self._build_formula(
+                    arrays_info, total_rows=estimated_rows
+                ),
+                "record_count": 1,
+                "max_depth": summary.max_depth,
             }
 
         return {
@@ -111,108 +133,84 @@ class JsonToCsvConverter(BaseConverter):
             "estimated_rows": 1,
             "arrays_found": [],
             "expansion_formula": "1",
+            "record_count": 0,
+            "max_depth": 0,
         }
 
-    def _find_arrays_in_object(
-        self, obj: dict[str, Any], prefix: str = ""
-    ) -> list[dict[str, Any]]:
-        """Find all arrays in a JSON object (both objects and primitives).
+    def _summarize(self, content: FileContent, data: Any) -> DocumentSummary:
+        """Get the structural summary of a parsed document, using the parse cache.
+
+        Analysis and every export mode of the same content share one walk of
+        the document.
 
         Args:
-            obj: The object to analyze.
-            prefix: Current path prefix.
+            content: JSON content as bytes (used for the cache key).
+            data: Parsed JSON data.
 
         Returns:
-            List of dicts with path, count, and type for each array found.
-            Type is "objects" for arrays of objects, "primitives" for arrays
-            of primitive values (strings, numbers, booleans).
+            The document summary.
         """
-        arrays: list[dict[str, Any]] = []
-
-        for key, value in obj.items():
-            full_key = f"{prefix}{key}" if prefix else key
-
-            if isinstance(value, dict):
-                # Recurse into nested objects
-                nested_arrays = self._find_arrays_in_object(value, f"{full_key}.")
-                arrays.extend(nested_arrays)
-
-            elif isinstance(value, list) and value:
-                if all(isinstance(item, dict) for item in value):
-                    # Found an array of objects
-                    arrays.append({
-                        "path": full_key,
-                        "count": len(value),
-                        "type": "objects",
-                    })
-                    # Also check inside array items for nested arrays
-                    nested_in_items = self._find_arrays_in_object(
-                        value[0], f"{full_key}."
-                    )
-                    arrays.extend(nested_in_items)
-                elif all(
-                    isinstance(item, (str, int, float, bool, type(None)))
-                    for item in value
-                ):
-                    # Found an array of primitives
-                    arrays.append({
-                        "path": full_key,
-                        "count": len(value),
-                        "type": "primitives",
-                    })
-
-        return arrays
+        return self._cached_parse(
+            content, "json", lambda: summarize(data), kind="summary"
+        )
 
-    def _calculate_expansion_rows(
-        self, arrays_info: list[dict[str, Any]]
-    ) -> int:
-        """Calculate estimated rows from Cartesian product.
+    def _arrays_found(self, summary: DocumentSummary) -> list[dict[str, Any]]:
+        """List the arrays that expand into rows, for the analysis results.
 
         Args:
-            arrays_info: List of arrays with their counts.
+            summary: The document's structural summary.
 
         Returns:
-            Estimated row count.
+            List of dicts with path, representative count, and type for each
+            array found. Type is "objects" for arrays of objects, "primitives"
+            for arrays of primitive values (strings, numbers, booleans).
         """
-        if not arrays_info:
-            return 1
-
-        result = 1
-        for arr in arrays_info:
-            result *= arr["count"]
-        return result
+        return [
+            {"path": array.path, "count": array.count, "type": array.kind}
+            for array in summary.arrays
+            if array.kind in ("objects", "primitives")
+        ]
 
     def _build_formula(
-        self, arrays_info: list[dict[str, Any]], multiplier: int = 1
+        self,
+        arrays_info: list[dict[str, Any]],
+        multiplier: int = 1,
+        total_rows: int | None = None,
     ) -> str:
         """Build a human-readable expansion formula.
 
         Args:
             arrays_info: List of arrays with their counts.
             multiplier: Additional multiplier (e.g., array length for root arrays).
+            total_rows: Exact row count. When the arrays differ between
+                objects, the product of the representative counts doesn't
+                match it and the formula states the exact total instead.
 
         Returns:
             Formula string like "3 × 6 × 4 = 72"
         """
-        if not arrays_info:
-            return str(multiplier) if multiplier > 1 else "1"
-
         counts = [arr["count"] for arr in arrays_info]
         if multiplier > 1:
             counts.insert(0, multiplier)
 
-        if len(counts) == 1:
-            return str(counts[0])
-
         result = 1
         for c in counts:
             result *= c
 
+        if total_rows is not None and total_rows != result:
+            return f"{multiplier} × varying array sizes = {total_rows}"
+
+        if not arrays_info:
+            return str(multiplier) if multiplier > 1 else "1"
+
+        if len(counts) == 1:
+            return str(counts[0])
+
         formula_parts = " × ".join(str(c) for c in counts)
         return f"{formula_parts} = {result}"
 
     def convert(
-        self, content: bytes, export_mode: ExportMode = ExportMode.NORMAL
+        self, content: FileContent, export_mode: ExportMode = ExportMode.NORMAL
     ) -> bytes:
         """Convert JSON to CSV.
 
@@ -226,24 +224,41 @@ class JsonToCsvConverter(BaseConverter):
         Raises:
             ValueError: If JSON is invalid or cannot be converted.
         """
-        if export_mode == ExportMode.SINGLE_ROW:
-            df = self._json_to_dataframe_single_row(content)
-        elif export_mode == ExportMode.MULTI_TABLE:
+        return b"".join(self.iter_csv(content, export_mode))
+
+    def iter_csv(
+        self, content: FileContent, export_mode: ExportMode = ExportMode.NORMAL
+    ) -> Iterator[bytes]:
+        """Convert JSON to CSV produced in row batches.
+
+        The JSON is parsed and flattened before this returns, so errors are
+        raised up front; only serialization is deferred to the iterator.
+
+        Args:
+            content: JSON content as bytes.
+            export_mode: Export mode (NORMAL or SINGLE_ROW).
+
+        Returns:
+            Iterator over chunks of the CSV content.
+
+        Raises:
+            ValueError: If JSON is invalid or cannot be converted.
+        """
+        if export_mode == ExportMode.MULTI_TABLE:
             # Multi-table returns dict of DataFrames, handle in subclass or main.py
             # For CSV, this will be handled separately (ZIP file)
             raise ValueError(
                 "MULTI_TABLE mode for CSV requires special handling (ZIP output)."
             )
-        else:
-            df = self._json_to_dataframe(content)
-
-        output = io.StringIO()
-        df.to_csv(output, index=False)
-        return output.getvalue().encode("utf-8")
+        df = self._load_dataframe(content, export_mode)
+        return csv_chunks(df)
 
-    def convert_multi_table(self, content: bytes) -> dict[str, pd.DataFrame]:
+    def convert_multi_table(self, content: FileContent) -> dict[str, pd.DataFrame]:
         """Convert JSON to multiple DataFrames (one per array).
 
+        Results are served from the parse cache when the same content was
+        already converted; the returned DataFrames must not be modified.
+
         Args:
             content: JSON content as bytes.
 
@@ -254,22 +269,66 @@ class JsonToCsvConverter(BaseConverter):
         Raises:
             ValueError: If JSON is invalid.
         """
-        data = self._parse_json(content)
+        return self._cached_parse(
+            content,
+            "json",
+            lambda: self._json_to_tables(content),
+            export_mode=ExportMode.MULTI_TABLE.value,
+        )
+
+    def _json_to_tables(self, content: FileContent) -> dict[str, pd.DataFrame]:
+        """Parse JSON and split it into multiple DataFrames (one per array).
+
+        Root arrays are parsed one object at a time.
+
+        Args:
+            content: JSON content as bytes.
+
+        Returns:
+            Dictionary mapping table names to DataFrames.
+
+        Raises:
+            ValueError: If JSON is invalid.
+        """
+        if not is_root_array(content):
+            data = self._parse_json(content)
+            return self._data_to_tables(data, self._summarize(content, data))
+
+        message = "JSON must be an array of objects or a single object."
+        objects = self._stream_objects(content, message, message)
+        return self._extract_tables_from_objects(objects)
+
+    def _data_to_tables(
+        self, data: Any, summary: DocumentSummary | None = None
+    ) -> dict[str, pd.DataFrame]:
+        """Split a parsed JSON document into multiple DataFrames.
 
-        if isinstance(data, list):
-            if not data or not all(isinstance(item, dict) for item in data):
+        Args:
+            data: Parsed JSON data.
+            summary: The document's structural summary, computed if not given.
+
+        Returns:
+            Dictionary mapping table names to DataFrames.
+
+        Raises:
+            ValueError: If the JSON structure is not supported.
+        """
+        if summary is None:
+            summary = summarize(data)
+        if summary.root == "array":
+            if not summary.record_count or not summary.objects_only:
                 raise ValueError("JSON must be an array of objects or a single object.")
             # For array of objects, process first item structure
             # and apply to all items
             return self._extract_tables_from_objects(data)
 
-        elif isinstance(data, dict):
+        elif summary.root == "object":
             return self._extract_tables_from_objects([data])
 
         raise ValueError("Invalid JSON structure.")
 
     def _extract_tables_from_objects(
-        self, objects: list[dict[str, Any]]
+        self, objects: Iterable[dict[str, Any]]
     ) -> dict[str, pd.DataFrame]:
         """Extract multiple tables from a list of objects.
 
@@ -278,13 +337,13 @@ class JsonToCsvConverter(BaseConverter):
         Both are linked to the main table via _record_id.
 
         Args:
-            objects: List of JSON objects.
+            objects: JSON objects, consumed once.
 
         Returns:
             Dictionary of table name -> DataFrame.
         """
-        main_rows: list[dict[str, Any]] = []
-        array_tables: dict[str, list[dict[str, Any]]] = {}
+        main_table = ColumnBuilder()
+        array_tables: dict[str, ColumnBuilder] = {}
 
         for idx, obj in enumerate(objects):
             record_id = idx + 1
@@ -299,30 +358,23 @@ class JsonToCsvConverter(BaseConverter):
                 elif isinstance(value, list) and value:
                     if all(isinstance(item, dict) for item in value):
                         # Array of objects -> separate table
-                        table_name = key
-                        if table_name not in array_tables:
-                            array_tables[table_name] = []
-
+                        table = array_tables.setdefault(key, ColumnBuilder())
                         for item in value:
                             row = {"_record_id": record_id}
                             flat = self._flatten_dict(item)
                             row.update(flat)
-                            array_tables[table_name].append(row)
+                            table.append(row)
                     elif all(
                         isinstance(item, (str, int, float, bool, type(None)))
                         for item in value
                     ):
                         # Array of primitives -> separate table with 'value' column
-                        table_name = key
-                        if table_name not in array_tables:
-                            array_tables[table_name] = []
-
+                        table = array_tables.setdefault(key, ColumnBuilder())
                         for item in value:
-                            row = {"_record_id": record_id, "value": item}
-                            array_tables[table_name].append(row)
+                            table.append({"_record_id": record_id, "value": item})
                     else:
                         # Mixed array -> JSON string in main
-                        main_row[key] = json.dumps(value)
+                        main_row[key] = json_codec.dumps(value)
 
                 elif isinstance(value, list):
                     # Empty array
@@ -332,22 +384,22 @@ class JsonToCsvConverter(BaseConverter):
                     # Scalar value
                     main_row[key] = value
 
-            main_rows.append(main_row)
+            main_table.append(main_row)
 
         # Build result dictionary
-        result: dict[str, pd.DataFrame] = {"main": pd.DataFrame(main_rows)}
+        result: dict[str, pd.DataFrame] = {"main": main_table.build()}
 
-        for table_name, rows in array_tables.items():
-            if rows:
-                result[table_name] = pd.DataFrame(rows)
+        for table_name, table in array_tables.items():
+            if len(table):
+                result[table_name] = table.build()
 
         return result
 
-    def _flatten_dict(
-        self, obj: dict[str, Any], prefix: str = ""
-    ) -> dict[str, Any]:
+    def _flatten_dict(self, obj: dict[str, Any], prefix: str = "") -> dict[str, Any]:
         """Flatten a nested dictionary using dot notation.
 
+        Uses the compiled flattener of the dictionary's shape.
+
         Args:
             obj: Dictionary to flatten.
             prefix: Prefix for keys.
@@ -355,23 +407,11 @@ class JsonToCsvConverter(BaseConverter):
         Returns:
             Flattened dictionary.
         """
-        result: dict[str, Any] = {}
-
-        for key, value in obj.items():
-            full_key = f"{prefix}{key}"
-
-            if isinstance(value, dict):
-                result.update(self._flatten_dict(value, f"{full_key}."))
-            elif isinstance(value, list):
-                result[full_key] = json.dumps(value) if value else "[]"
-            else:
-                result[full_key] = value
-
-        return result
+        return flatten_record(obj, prefix)
 
     def preview(
         self,
-        content: bytes,
+        content: FileContent,
         page: int = 1,
         page_size: int = 10,
         export_mode: ExportMode = ExportMode.NORMAL,
@@ -388,16 +428,36 @@ class JsonToCsvConverter(BaseConverter):
             Preview dictionary with columns, rows, total_rows, and pagination info.
             For MULTI_TABLE mode, includes table_info with counts per table.
         """
-        if export_mode == ExportMode.SINGLE_ROW:
-            df = self._json_to_dataframe_single_row(content)
-        elif export_mode == ExportMode.MULTI_TABLE:
+        if export_mode == ExportMode.MULTI_TABLE:
             tables = self.convert_multi_table(content)
             # Preview the main table, but include info about other tables
             df = tables.get("main", pd.DataFrame())
             table_info = {name: len(tdf) for name, tdf in tables.items()}
         else:
-            df = self._json_to_dataframe(content)
+            df = self._load_dataframe(content, export_mode)
+
+        result = self._build_preview(df, page, page_size)
+
+        # Add table info for multi-table mode
+        if export_mode == ExportMode.MULTI_TABLE:
+            result["table_info"] = table_info
+            result["preview_table"] = "main"
+
+        return result
 
+    def _build_preview(
+        self, df: pd.DataFrame, page: int, page_size: int
+    ) -> dict[str, Any]:
+        """Build one preview page from a DataFrame.
+
+        Args:
+            df: The full DataFrame.
+            page: Page number (1-indexed), clamped to the valid range.
+            page_size: Number of rows per page.
+
+        Returns:
+            Preview dictionary with columns, rows, total_rows, and pagination info.
+        """
         total_rows = len(df)
         total_pages = max(1, (total_rows + page_size - 1) // page_size)
 
@@ -411,7 +471,7 @@ class JsonToCsvConverter(BaseConverter):
         # Get the page slice
         page_df = df.iloc[start_idx:end_idx]
 
-        result = {
+        return {
             "columns": df.columns.tolist(),
             "rows": page_df.values.tolist(),
             "total_rows": total_rows,
@@ -420,18 +480,65 @@ class JsonToCsvConverter(BaseConverter):
             "page_size": page_size,
         }
 
-        # Add table info for multi-table mode
-        if export_mode == ExportMode.MULTI_TABLE:
-            result["table_info"] = table_info
-            result["preview_table"] = "main"
+    def _load_dataframe(
+        self,
+        content: FileContent,
+        export_mode: ExportMode = ExportMode.NORMAL,
+        data: Any = None,
+    ) -> pd.DataFrame:
+        """Get the flattened DataFrame for JSON content, using the parse cache.
 
-        return result
+        Args:
+            content: JSON content as bytes.
+            export_mode: Export mode (NORMAL or SINGLE_ROW).
+            data: The already parsed document, if available, to avoid
+                parsing the content again on a cache miss.
+
+        Returns:
+            A pandas DataFrame shared with the cache (do not modify).
+
+        Raises:
+            ValueError: If JSON cannot be parsed or converted.
+        """
+        if export_mode == ExportMode.SINGLE_ROW:
+            parse = self._json_to_dataframe_single_row
+            to_dataframe = self._data_to_dataframe_single_row
+        else:
+            parse = self._json_to_dataframe
+            to_dataframe = self._data_to_dataframe
+
+        def build() -> pd.DataFrame:
+            if data is None:
+                return parse(content)
+            return to_dataframe(data, self._summarize(content, data))
+
+        return self._cached_parse(
+            content, "json", build, export_mode=ExportMode(export_mode).value
+        )
+
+    def _load_tables(self, content: FileContent, data: Any) -> dict[str, pd.DataFrame]:
+        """Get the multi-table split of an already parsed document, cached.
 
-    def _json_to_dataframe_single_row(self, content: bytes) -> pd.DataFrame:
+        Args:
+            content: JSON content as bytes (used for the cache key).
+            data: Parsed JSON data.
+
+        Returns:
+            Dictionary mapping table names to DataFrames (do not modify).
+        """
+        return self._cached_parse(
+            content,
+            "json",
+            lambda: self._data_to_tables(data, self._summarize(content, data)),
+            export_mode=ExportMode.MULTI_TABLE.value,
+        )
+
+    def _json_to_dataframe_single_row(self, content: FileContent) -> pd.DataFrame:
         """Convert JSON to DataFrame keeping arrays as JSON strings.
 
         Each root object becomes a single row, with arrays serialized
-        as JSON strings rather than expanded.
+        as JSON strings rather than expanded. Root arrays are parsed one
+        object at a time.
 
         Args:
             content: JSON content as bytes.
@@ -442,20 +549,48 @@ class JsonToCsvConverter(BaseConverter):
         Raises:
             ValueError: If JSON cannot be parsed.
         """
-        data = self._parse_json(content)
+        if not is_root_array(content):
+            data = self._parse_json(content)
+            return self._data_to_dataframe_single_row(
+                data, self._summarize(content, data)
+            )
+
+        chunks = map_array_chunks(content, self._flatten_chunk)
+        if chunks is not None:
+            return self._merge_chunks(chunks)
+
+        objects = self._stream_objects(
+            content, "JSON array is empty.", "JSON array must contain objects."
+        )
+        return self._build_frame(map(self._flatten_object_single_row, objects))
 
-        if isinstance(data, list):
-            if not data:
+    def _data_to_dataframe_single_row(
+        self, data: Any, summary: DocumentSummary | None = None
+    ) -> pd.DataFrame:
+        """Convert a parsed JSON document to a DataFrame, one row per object.
+
+        Args:
+            data: Parsed JSON data.
+            summary: The document's structural summary, computed if not given.
+
+        Returns:
+            A pandas DataFrame with one row per root object.
+
+        Raises:
+            ValueError: If the JSON structure is not supported.
+        """
+        if summary is None:
+            summary = summarize(data)
+        if summary.root == "array":
+            if not summary.record_count:
                 raise ValueError("JSON array is empty.")
-            if not all(isinstance(item, dict) for item in data):
+            if not summary.objects_only:
                 raise ValueError("JSON array must contain objects.")
 
-            rows = [self._flatten_object_single_row(item) for item in data]
-            return pd.DataFrame(rows)
+            return self._build_frame(map(self._flatten_object_single_row, data))
 
-        elif isinstance(data, dict):
-            row = self._flatten_object_single_row(data)
-            return pd.DataFrame([row])
+        elif summary.root == "object":
+            return self._build_frame([self._flatten_object_single_row(data)])
 
         raise ValueError("Invalid JSON structure.")
 
@@ -464,6 +599,8 @@ class JsonToCsvConverter(BaseConverter):
     ) -> dict[str, Any]:
         """Flatten an object to a single row, keeping arrays as JSON strings.
 
+        Uses the compiled flattener of the object's shape.
+
         Args:
             obj: The object to flatten.
             prefix: Prefix for nested keys.
@@ -471,29 +608,11 @@ class JsonToCsvConverter(BaseConverter):
         Returns:
             A flat dictionary (single row).
         """
-        result: dict[str, Any] = {}
-
-        for key, value in obj.items():
-            full_key = f"{prefix}{key}" if prefix else key
-
-            if isinstance(value, dict):
-                # Recursively flatten nested objects
-                nested = self._flatten_object_single_row(value, f"{full_key}.")
-                result.update(nested)
-
-            elif isinstance(value, list):
-                # Keep arrays as JSON strings (no expansion)
-                result[full_key] = json.dumps(value) if value else "[]"
-
-            else:
-                # Scalar value
-                result[full_key] = value
-
-        return result
+        return flatten_record(obj, prefix)
 
     def preview_all_tables(
         self,
-        content: bytes,
+        content: FileContent,
         rows_per_table: int = 5,
     ) -> dict[str, Any]:
         """Preview all tables from complex JSON for multi-table mode.
@@ -519,7 +638,20 @@ class JsonToCsvConverter(BaseConverter):
             ValueError: If JSON is invalid.
         """
         tables = self.convert_multi_table(content)
+        return {"tables": self._build_tables_preview(tables, rows_per_table)}
+
+    def _build_tables_preview(
+        self, tables: dict[str, pd.DataFrame], rows_per_table: int
+    ) -> dict[str, Any]:
+        """Build the first rows of every table of a multi-table split.
+
+        Args:
+            tables: Dictionary mapping table names to DataFrames.
+            rows_per_table: Maximum rows to return per table.
 
+        Returns:
+            Dictionary mapping table names to columns, rows and total_rows.
+        """
         result: dict[str, Any] = {}
         for table_name, df in tables.items():
             result[table_name] = {
@@ -527,10 +659,84 @@ class JsonToCsvConverter(BaseConverter):
                 "rows": df.head(rows_per_table).values.tolist(),
                 "total_rows": len(df),
             }
+        return result
+
+    def inspect(
+        self,
+        content: FileContent,
+        page_size: int = 10,
+        export_mode: ExportMode = ExportMode.NORMAL,
+        include_tables: bool | None = None,
+        include_single_row: bool | None = None,
+        rows_per_table: int = 5,
+        single_row_page_size: int = 5,
+    ) -> dict[str, Any]:
+        """Analyze and preview JSON from a single parse of the document.
+
+        Combines analyze_json_structure, page 1 of preview and optionally
+        preview_all_tables and a single-row preview. The DataFrames built
+        here are stored in the parse cache, so later preview pages and
+        conversions of the same content reuse them.
+
+        Args:
+            content: JSON content as bytes.
+            page_size: Number of rows in the first preview page.
+            export_mode: Export mode of the first preview page.
+            include_tables: Include the multi-table preview. None includes
+                it only when the document is complex.
+            include_single_row: Include a single-row mode preview. None
+                includes it only when the document is complex.
+            rows_per_table: Maximum rows per table in the multi-table preview.
+            single_row_page_size: Rows in the single-row mode preview.
+
+        Returns:
+            Dictionary with:
+            {
+                "analysis": {...},  # as analyze_json_structure
+                "preview": {...} or None,  # as preview, page 1
+                "preview_error": str,  # only if the preview failed
+                "tables": {...},  # optional, as preview_all_tables
+                "single_row_preview": {...}  # optional, as preview
+            }
 
-        return {"tables": result}
+        Raises:
+            ValueError: If JSON is invalid, or a requested multi-table or
+                single-row preview cannot be built.
+        """
+        data = self._parse_json(content)
+        analysis = self._analyze_data(self._summarize(content, data))
+        is_complex = analysis["is_complex"]
+        result: dict[str, Any] = {"analysis": analysis}
 
-    def _parse_json(self, content: bytes) -> Any:
+        # A complex document may exceed the expansion limit in normal mode;
+        # report that alongside the analysis instead of failing the request
+        try:
+            if export_mode == ExportMode.MULTI_TABLE:
+                tables = self._load_tables(content, data)
+                preview = self._build_preview(tables["main"], 1, page_size)
+                preview["table_info"] = {name: len(df) for name, df in tables.items()}
+                preview["preview_table"] = "main"
+            else:
+                df = self._load_dataframe(content, export_mode, data=data)
+                preview = self._build_preview(df, 1, page_size)
+            result["preview"] = preview
+        except ValueError as e:
+            result["preview"] = None
+            result["preview_error"] = str(e)
+
+        if include_tables or (include_tables is None and is_complex):
+            tables = self._load_tables(content, data)
+            result["tables"] = self._build_tables_preview(tables, rows_per_table)
+
+        if include_single_row or (include_single_row is None and is_complex):
+            df = self._load_dataframe(content, ExportMode.SINGLE_ROW, data=data)
+            result["single_row_preview"] = self._build_preview(
+                df, 1, single_row_page_size
+            )
+
+        return result
+
+    def _parse_json(self, content: FileContent) -> Any:
         """Parse JSON content from bytes.
 
         Args:
@@ -543,24 +749,23 @@ class JsonToCsvConverter(BaseConverter):
             ValueError: If JSON is invalid.
         """
         try:
-            text = content.decode("utf-8")
+            return json_codec.loads(content)
         except UnicodeDecodeError as e:
             raise ValueError(
-                f"File encoding error: Unable to decode as UTF-8. Details: {e}"
+                f"File encoding error: Unable to decode as UTF-8. "
+                f"Please ensure the file is saved with UTF-8 encoding. Details: {e}"
             ) from e
-
-        try:
-            return json.loads(text)
         except json.JSONDecodeError as e:
             raise ValueError(
                 f"Invalid JSON at line {e.lineno}, column {e.colno}: {e.msg}"
             ) from e
 
-    def _json_to_dataframe(self, content: bytes) -> pd.DataFrame:
+    def _json_to_dataframe(self, content: FileContent) -> pd.DataFrame:
         """Parse JSON and convert to DataFrame.
 
         Handles arrays of objects and expands nested arrays into multiple rows
-        using Cartesian product (denormalization).
+        using Cartesian product (denormalization). Root arrays are parsed one
+        object at a time, so the whole document is never held in memory.
 
         Args:
             content: JSON content as bytes.
@@ -571,51 +776,224 @@ class JsonToCsvConverter(BaseConverter):
         Raises:
             ValueError: If JSON cannot be parsed or converted.
         """
-        try:
-            text = content.decode("utf-8")
-        except UnicodeDecodeError as e:
-            raise ValueError(
-                f"File encoding error: Unable to decode as UTF-8. "
-                f"Please ensure the file is saved with UTF-8 encoding. Details: {e}"
-            ) from e
+        if not is_root_array(content):
+            data = self._parse_json(content)
+            return self._data_to_dataframe(data, self._summarize(content, data))
+
+        chunks = map_array_chunks(content, self._expand_chunk)
+        if chunks is not None:
+            self._check_row_limit(sum(row_count for row_count, _ in chunks))
+            return self._merge_chunks(columns for _, columns in chunks)
+
+        objects = self._stream_objects(
+            content,
+            "JSON array is empty. The file contains '[]' with no data.",
+            "JSON array must contain objects. Found non-object items in array.",
+        )
+        return self._objects_to_dataframe(objects)
+
+    def _data_to_dataframe(
+        self, data: Any, summary: DocumentSummary | None = None
+    ) -> pd.DataFrame:
+        """Convert a parsed JSON document to a DataFrame, expanding arrays.
 
-        try:
-            data = json.loads(text)
-        except json.JSONDecodeError as e:
-            raise ValueError(
-                f"Invalid JSON at line {e.lineno}, column {e.colno}: {e.msg}"
-            ) from e
+        Args:
+            data: Parsed JSON data.
+            summary: The document's structural summary, computed if not given.
 
+        Returns:
+            A pandas DataFrame.
+
+        Raises:
+            ValueError: If the JSON structure is not supported or expands
+                to too many rows.
+        """
         # Handle different JSON structures
-        if isinstance(data, list):
-            if not data:
+        if summary is None:
+            summary = summarize(data)
+        if summary.root == "array":
+            if not summary.record_count:
                 raise ValueError(
                     "JSON array is empty. The file contains '[]' with no data."
                 )
             # Check if items are objects
-            if not all(isinstance(item, dict) for item in data):
+            if not summary.objects_only:
                 raise ValueError(
                     "JSON array must contain objects. Found non-object items in array."
                 )
-            # Expand each object and combine all rows
-            all_rows: list[dict[str, Any]] = []
-            for item in data:
-                all_rows.extend(self._expand_object(item))
-            self._check_row_limit(len(all_rows))
-            return pd.DataFrame(all_rows)
-
-        elif isinstance(data, dict):
+            return self._objects_to_dataframe(data, summary.row_count)
+
+        elif summary.root == "object":
             # Single object - expand it fully
-            rows = self._expand_object(data)
-            self._check_row_limit(len(rows))
-            return pd.DataFrame(rows)
+            self._check_row_limit(summary.row_count)
+            return self._build_frame(self._expand_object(data))
 
         else:
             raise ValueError(
                 f"Invalid JSON structure. Expected an array of objects or an object, "
-                f"but got {type(data).__name__}."
+                f"but got {summary.root}."
             )
 
+    def _objects_to_dataframe(
+        self, objects: Iterable[dict[str, Any]], row_count: int | None = None
+    ) -> pd.DataFrame:
+        """Expand root objects and combine all their rows into a DataFrame.
+
+        Args:
+            objects: The root JSON objects, consumed once.
+            row_count: Total rows of the objects, if already known; they are
+                counted while expanding otherwise.
+
+        Returns:
+            A pandas DataFrame.
+
+        Raises:
+            ValueError: If the expansion creates too many rows.
+        """
+        builder = ColumnBuilder()
+        if row_count is None:
+            self._check_row_limit(self._expand_into(builder, objects))
+        else:
+            self._check_row_limit(row_count)
+            self._expand_into(builder, objects, count=False)
+        return builder.build()
+
+    def _expand_into(
+        self,
+        builder: ColumnBuilder,
+        objects: Iterable[dict[str, Any]],
+        count: bool = True,
+    ) -> int:
+        """Expand root objects into a builder, stopping past the row limit.
+
+        Args:
+            builder: Builder the rows are added to.
+            objects: The root JSON objects, consumed once.
+            count: Count the rows of each object before expanding it. Pass
+                False when the total was checked against the limit already.
+
+        Returns:
+            The number of rows of all the objects (0 if not counted). If it
+            exceeds MAX_EXPANDED_ROWS, only part of them were added.
+        """
+        objects = iter(objects)
+        total_rows = 0
+        for item in objects:
+            # Objects without arrays (the common shallow export) are exactly
+            # one row and skip the expansion path
+            row = flatten_array_free(item)
+            # Count before expanding, so an oversized document fails before
+            # any rows are built
+            if count:
+                total_rows += 1 if row is not None else count_rows(item)
+            if total_rows > MAX_EXPANDED_ROWS:
+                # Count the rest for the error message
+                return total_rows + sum(map(count_rows, objects))
+            if row is not None:
+                builder.append_values(*row)
+            else:
+                builder.extend(self._expand_object(item))
+        return total_rows
+
+    def _expand_chunk(
+        self, objects: list[dict[str, Any]]
+    ) -> tuple[int, tuple[list[str], list[list[Any]], int]]:
+        """Expand a chunk of root objects in a worker process.
+
+        Args:
+            objects: Consecutive root objects.
+
+        Returns:
+            (number of rows of the objects, their rows as columns).
+        """
+        builder = ColumnBuilder()
+        row_count = self._expand_into(builder, objects)
+        return row_count, builder.to_columns()
+
+    def _flatten_chunk(
+        self, objects: list[dict[str, Any]]
+    ) -> tuple[list[str], list[list[Any]], int]:
+        """Flatten a chunk of root objects to single rows in a worker process.
+
+        Args:
+            objects: Consecutive root objects.
+
+        Returns:
+            Their rows as columns.
+        """
+        builder = ColumnBuilder()
+        builder.extend(map(self._flatten_object_single_row, objects))
+        return builder.to_columns()
+
+    def _merge_chunks(
+        self, chunks: Iterable[tuple[list[str], list[list[Any]], int]]
+    ) -> pd.DataFrame:
+        """Build a DataFrame from the columns of consecutive chunks of rows.
+
+        Args:
+            chunks: Rows as columns, in order.
+
+        Returns:
+            The same DataFrame as from all the rows at once.
+        """
+        builder = ColumnBuilder()
+        for columns in chunks:
+            builder.extend_columns(*columns)
+        return builder.build()
+
+    def _build_frame(self, rows: Iterable[dict[str, Any]]) -> pd.DataFrame:
+        """Build a DataFrame column by column from flat rows.
+
+        Args:
+            rows: Flat dictionaries, one per row, consumed once.
+
+        Returns:
+            The same DataFrame as pd.DataFrame(list(rows)).
+        """
+        builder = ColumnBuilder()
+        builder.extend(rows)
+        return builder.build()
+
+    def _stream_objects(
+        self, content: FileContent, empty_message: str, type_message: str
+    ) -> Iterator[dict[str, Any]]:
+        """Yield the objects of a root JSON array as they are parsed.
+
+        Errors are reported as a full parse would report them: syntax errors
+        anywhere in the document take precedence over structure errors.
+
+        Args:
+            content: JSON content as bytes, with an array as root value.
+            empty_message: Error message if the array is empty.
+            type_message: Error message if the array contains a non-object.
+
+        Yields:
+            Each root object.
+
+        Raises:
+            ValueError: If JSON is invalid, or the array is empty or contains
+                a non-object.
+        """
+        items = iter_array_items(content)
+        empty = True
+        try:
+            for item in items:
+                if not isinstance(item, dict):
+                    # Read the rest so a later syntax error is reported instead
+                    for _ in items:
+                        pass
+                    raise ValueError(type_message)
+                empty = False
+                yield item
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            # Error positions are relative to the parse window; a full parse
+            # gives the document line and column
+            self._parse_json(content)
+            raise
+
+        if empty:
+            raise ValueError(empty_message)
+
     def _check_row_limit(self, row_count: int) -> None:
         """Check if row count exceeds the safety limit.
 
@@ -627,87 +1005,126 @@ class JsonToCsvConverter(BaseConverter):
         """
         if row_count > MAX_EXPANDED_ROWS:
             raise ValueError(
-                f"Expansion would create {row_count} rows (limit: {MAX_EXPANDED_ROWS}). "
+                f"Expansion would create {row_count} rows "
+                f"(limit: {MAX_EXPANDED_ROWS}). "
                 f"The nested arrays in your JSON create too many combinations. "
                 f"Consider simplifying your JSON structure or processing it in parts."
             )
 
     def _expand_object(
         self, obj: dict[str, Any], prefix: str = ""
-    ) -> list[dict[str, Any]]:
+    ) -> Iterator[dict[str, Any]]:
         """Expand an object with nested arrays into multiple flat rows.
 
         Creates the Cartesian product of all nested arrays, producing one row
-        per combination. Scalar fields are repeated in each row.
+        per combination. Scalar fields are repeated in each row. Rows are
+        generated lazily, so a caller that stops early never builds the
+        rest of the product.
 
         Arrays of objects are expanded with their keys prefixed.
         Arrays of primitives are expanded with each value in the column.
+        Nested objects are expanded with an explicit stack, so documents of
+        any depth can be expanded.
 
         Args:
             obj: The object to expand.
             prefix: Prefix for nested keys (used for dot notation).
 
-        Returns:
-            A list of flat dictionaries, one per row.
+        Yields:
+            Flat dictionaries, one per row.
         """
-        # Separate scalars from nested structures
-        scalars: dict[str, Any] = {}
-        array_expansions: list[tuple[str, list[dict[str, Any]]]] = []
+        scalars, array_expansions = resolve(self._split_frame, obj, prefix)
+        yield from self._combine_rows(scalars, array_expansions)
+
+    def _combine_rows(
+        self,
+        scalars: dict[str, Any],
+        array_expansions: list[list[dict[str, Any]]],
+    ) -> Iterator[dict[str, Any]]:
+        """Combine scalar fields with each combination of array rows.
+
+        Args:
+            scalars: The scalar fields of every row.
+            array_expansions: The rows of each array or multi-row nested
+                object.
 
-        for key, value in obj.items():
-            full_key = f"{prefix}{key}"
+        Yields:
+            Flat dictionaries, one per row.
+        """
+        # If no arrays to expand, return single row with scalars
+        if not array_expansions:
+            yield scalars
+            return
 
-            if isinstance(value, dict):
-                # Recursively expand nested objects
-                nested_rows = self._expand_object(value, f"{full_key}.")
+        # Combine scalars with each Cartesian product combination, lazily
+        for combination in itertools.product(*array_expansions):
+            row = scalars.copy()
+            for expanded_row in combination:
+                row.update(expanded_row)
+            yield row
+
+    def _split_frame(self, obj: dict[str, Any], prefix: str) -> Frame:
+        """Separate an object's scalar fields from the rows of its arrays.
+
+        Nested objects and the objects of arrays are split first, by
+        yielding them to resolve, so that deep documents don't recurse.
+        Objects of a shape seen before are split by its compiled plan.
+
+        Args:
+            obj: The object to split.
+            prefix: Prefix for nested keys (used for dot notation).
+
+        Yields:
+            (nested object, prefix) for each object whose split is needed.
+
+        Returns:
+            The scalar fields of every row, and the rows of each array or
+            multi-row nested object, in key order.
+        """
+        scalars: dict[str, Any] = {}
+        array_expansions: list[list[dict[str, Any]]] = []
+
+        for operation in record_split(obj, prefix):
+            kind = operation[0]
+            if kind == SCALAR_FIELDS:
+                scalars.update(operation[1])
+
+            elif kind == NESTED_OBJECT:
+                # Expand nested objects
+                _, value, nested_prefix = operation
+                split = yield value, nested_prefix
+                nested_rows = list(self._combine_rows(*split))
                 if len(nested_rows) == 1:
                     # Single row - merge into scalars
                     scalars.update(nested_rows[0])
                 else:
                     # Multiple rows - add to array expansions
-                    array_expansions.append((full_key, nested_rows))
+                    array_expansions.append(nested_rows)
+
+            else:
+                # Array
+                _, value, full_key, nested_prefix = operation
+                if not value:
+                    # Empty array
+                    scalars[full_key] = "[]"
 
-            elif isinstance(value, list) and value:
-                if all(isinstance(item, dict) for item in value):
+                elif all(isinstance(item, dict) for item in value):
                     # Array of objects - expand each item with key prefix
                     expanded_items: list[dict[str, Any]] = []
                     for item in value:
-                        item_rows = self._expand_object(item, f"{full_key}.")
-                        expanded_items.extend(item_rows)
-                    array_expansions.append((full_key, expanded_items))
+                        split = yield item, nested_prefix
+                        expanded_items.extend(self._combine_rows(*split))
+                    array_expansions.append(expanded_items)
+
                 elif all(
                     isinstance(item, (str, int, float, bool, type(None)))
                     for item in value
                 ):
                     # Array of primitives - expand each value as a row
-                    expanded_items = [{full_key: item} for item in value]
-                    array_expansions.append((full_key, expanded_items))
+                    array_expansions.append([{full_key: item} for item in value])
+
                 else:
                     # Mixed array - convert to JSON string
-                    scalars[full_key] = json.dumps(value)
-
-            elif isinstance(value, list):
-                # Empty array
-                scalars[full_key] = "[]"
-
-            else:
-                # Scalar value
-                scalars[full_key] = value
-
-        # If no arrays to expand, return single row with scalars
-        if not array_expansions:
-            return [scalars] if scalars else [{}]
-
-        # Compute Cartesian product of all array expansions
-        array_rows_list = [rows for _, rows in array_expansions]
-        product = list(itertools.product(*array_rows_list))
-
-        # Combine scalars with each product combination
-        result: list[dict[str, Any]] = []
-        for combination in product:
-            row = scalars.copy()
-            for expanded_row in combination:
-                row.update(expanded_row)
-            result.append(row)
+                    scalars[full_key] = json_codec.dumps(value)
 
-        return result if result else [scalars]
+        return scalars, array_expansions
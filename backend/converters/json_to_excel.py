@@ -1,10 +1,8 @@
 """JSON to Excel converter."""
 
-import io
-
-import pandas as pd
-
+from backend.converters.archives import write_xlsx
 from backend.converters.json_to_csv import ExportMode, JsonToCsvConverter
+from backend.utils.uploads import FileContent
 
 
 class JsonToExcelConverter(JsonToCsvConverter):
@@ -14,7 +12,7 @@ class JsonToExcelConverter(JsonToCsvConverter):
     """
 
     def convert(
-        self, content: bytes, export_mode: ExportMode = ExportMode.NORMAL
+        self, content: FileContent, export_mode: ExportMode = ExportMode.NORMAL
     ) -> bytes:
         """Convert JSON to Excel (.xlsx).
 
@@ -28,26 +26,12 @@ class JsonToExcelConverter(JsonToCsvConverter):
         Raises:
             ValueError: If JSON is invalid or cannot be converted.
         """
-        output = io.BytesIO()
-
         if export_mode == ExportMode.MULTI_TABLE:
             # Multi-table: one sheet per array
             tables = self.convert_multi_table(content)
-            with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                for table_name, df in tables.items():
-                    # Excel sheet names have 31 char limit
-                    sheet_name = table_name[:31] if len(table_name) > 31 else table_name
-                    df.to_excel(writer, sheet_name=sheet_name, index=False)
-
-        elif export_mode == ExportMode.SINGLE_ROW:
-            df = self._json_to_dataframe_single_row(content)
-            with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                df.to_excel(writer, sheet_name="Data", index=False)
-
-        else:
-            # Normal mode
-            df = self._json_to_dataframe(content)
-            with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                df.to_excel(writer, sheet_name="Data", index=False)
-
-        return output.getvalue()
+            # Excel sheet names have 31 char limit
+            return write_xlsx((name[:31], df) for name, df in tables.items())
+
+        # Normal and single-row modes
+        df = self._load_dataframe(content, export_mode)
+        return write_xlsx([("Data", df)])
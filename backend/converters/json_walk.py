@@ -0,0 +1,84 @@
+"""Traversal of nested JSON objects with an explicit stack.
+
+Recursion costs a Python frame per level and fails on documents nested
+deeper than the interpreter's recursion limit. These walkers keep their
+state on a list instead, so any document that parses can be traversed.
+"""
+
+from collections.abc import Callable, Generator, Iterator
+from typing import Any
+
+# A computation over one object: yields (child, *args) for each nested value
+# whose result it needs, is sent that result, and returns its own
+Frame = Generator[tuple[Any, ...], Any, Any]
+
+
+def iter_leaves(obj: dict[str, Any], prefix: str = "") -> Iterator[tuple[str, Any]]:
+    """Yield the non-object values of an object, depth-first in key order.
+
+    Args:
+        obj: The object to walk.
+        prefix: Prefix of the column names.
+
+    Yields:
+        (dot-notation column name, value) for each scalar and array.
+    """
+    stack = [(prefix, iter(obj.items()))]
+    while stack:
+        node_prefix, items = stack[-1]
+        for key, value in items:
+            column = f"{node_prefix}{key}"
+            if isinstance(value, dict):
+                stack.append((f"{column}.", iter(value.items())))
+                break
+            yield column, value
+        else:
+            stack.pop()
+
+
+def iter_objects(obj: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Yield an object and every object nested in it, in no particular order.
+
+    Objects inside arrays are not included.
+
+    Args:
+        obj: The object to walk.
+
+    Yields:
+        Each object.
+    """
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(value for value in node.values() if isinstance(value, dict))
+
+
+def resolve(frame: Callable[..., Frame], *args: Any) -> Any:
+    """Evaluate a recursive computation without recursing.
+
+    ``frame(*args)`` starts the computation for the root. Whenever a frame
+    yields ``(child, *child_args)``, ``frame(child, *child_args)`` is run to
+    completion first and its return value is sent back to the yielding
+    frame.
+
+    Args:
+        frame: Generator function computing the result for one object.
+        *args: Arguments of the root frame.
+
+    Returns:
+        The return value of the root frame.
+    """
+    stack = [frame(*args)]
+    result = None
+    while True:
+        try:
+            request = stack[-1].send(result)
+        except StopIteration as done:
+            stack.pop()
+            result = done.value
+            if not stack:
+                return result
+        else:
+            stack.append(frame(*request))
+            result = None
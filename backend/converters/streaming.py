@@ -0,0 +1,238 @@
+"""Chunked serialization of DataFrames for streamed responses."""
+
+from collections.abc import Iterator
+from enum import Enum
+from json.encoder import encode_basestring
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from backend.config import STREAM_CHUNK_ROWS
+from backend.converters import json_codec
+
+
+class JsonStyle(str, Enum):
+    """Layouts for JSON output of a table."""
+
+    PRETTY = "pretty"  # Array of objects indented by two spaces
+    COMPACT = "compact"  # Array of objects without whitespace
+    NDJSON = "ndjson"  # One object per line
+    SPLIT = "split"  # {"columns": [...], "data": [[...], ...]} without whitespace
+
+
+def csv_chunks(
+    df: pd.DataFrame, chunk_rows: int = STREAM_CHUNK_ROWS
+) -> Iterator[bytes]:
+    """Serialize a DataFrame to UTF-8 CSV in row batches.
+
+    Joining the chunks gives the same bytes as ``df.to_csv(index=False)``,
+    but only one batch is held as text at a time.
+
+    Args:
+        df: The DataFrame to serialize.
+        chunk_rows: Number of rows per chunk.
+
+    Yields:
+        CSV bytes, starting with the header row.
+    """
+    # An empty frame still yields its header
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start : start + chunk_rows]
+        yield chunk.to_csv(index=False, header=start == 0).encode("utf-8")
+
+
+def json_chunks(
+    df: pd.DataFrame,
+    style: JsonStyle = JsonStyle.PRETTY,
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+) -> Iterator[bytes]:
+    """Serialize a DataFrame to JSON in the given layout, in row batches.
+
+    Args:
+        df: The DataFrame to serialize. Cells must be scalars.
+        style: The output layout.
+        chunk_rows: Number of rows per chunk.
+
+    Returns:
+        Iterator over UTF-8 encoded JSON text.
+    """
+    if style == JsonStyle.PRETTY:
+        return json_records_chunks(df, chunk_rows)
+    if style == JsonStyle.SPLIT:
+        return json_split_chunks(df, chunk_rows)
+    return json_compact_chunks(df, chunk_rows, lines=style == JsonStyle.NDJSON)
+
+
+def json_records_chunks(
+    df: pd.DataFrame, chunk_rows: int = STREAM_CHUNK_ROWS
+) -> Iterator[bytes]:
+    """Serialize a DataFrame to a pretty-printed JSON array of objects.
+
+    Joining the chunks gives the same bytes as ``json.dumps(records,
+    indent=2, ensure_ascii=False)`` on ``df.to_dict(orient="records")`` with
+    missing values replaced by None. Values are encoded a column at a time
+    from the column arrays, with missing values found by a vectorized mask,
+    so neither the list of records nor the whole output string is built.
+
+    Args:
+        df: The DataFrame to serialize. Cells must be scalars.
+        chunk_rows: Number of rows per chunk.
+
+    Yields:
+        UTF-8 encoded JSON text.
+    """
+    if df.empty or not df.columns.is_unique:
+        # No rows, no columns, or keys that collapse in a dict: take the
+        # record path, which is cheap or rare here
+        yield json_codec.dumps_pretty(_records(df)).encode("utf-8")
+        return
+
+    keys = [f"    {_encode_key(key)}: " for key in df.columns]
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start : start + chunk_rows]
+        columns = [_encode_column(chunk.iloc[:, i]) for i in range(len(keys))]
+        objects = ",\n".join(
+            "  {\n" + ",\n".join(map(str.__add__, keys, values)) + "\n  }"
+            for values in zip(*columns)
+        )
+        prefix = "[\n" if start == 0 else ",\n"
+        yield (prefix + objects).encode("utf-8")
+    yield b"\n]"
+
+
+def json_compact_chunks(
+    df: pd.DataFrame, chunk_rows: int = STREAM_CHUNK_ROWS, lines: bool = False
+) -> Iterator[bytes]:
+    """Serialize a DataFrame to JSON objects without whitespace.
+
+    Joining the chunks gives the same bytes as ``json.dumps(records,
+    ensure_ascii=False, separators=(",", ":"))`` on the records as
+    json_records_chunks builds them, or with ``lines`` one such object per
+    line, each followed by a newline (NDJSON).
+
+    Args:
+        df: The DataFrame to serialize. Cells must be scalars.
+        chunk_rows: Number of rows per chunk.
+        lines: Write newline-delimited objects instead of an array.
+
+    Yields:
+        UTF-8 encoded JSON text.
+    """
+    if df.empty or not df.columns.is_unique:
+        objects = list(map(json_codec.dumps_compact, _records(df)))
+        if lines:
+            yield "".join(f"{text}\n" for text in objects).encode("utf-8")
+        else:
+            yield ("[" + ",".join(objects) + "]").encode("utf-8")
+        return
+
+    keys = [f"{_encode_key(key)}:" for key in df.columns]
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start : start + chunk_rows]
+        columns = [_encode_column(chunk.iloc[:, i]) for i in range(len(keys))]
+        objects = [
+            "{" + ",".join(map(str.__add__, keys, values)) + "}"
+            for values in zip(*columns)
+        ]
+        if lines:
+            yield ("\n".join(objects) + "\n").encode("utf-8")
+        else:
+            prefix = "[" if start == 0 else ","
+            yield (prefix + ",".join(objects)).encode("utf-8")
+    if not lines:
+        yield b"]"
+
+
+def json_split_chunks(
+    df: pd.DataFrame, chunk_rows: int = STREAM_CHUNK_ROWS
+) -> Iterator[bytes]:
+    """Serialize a DataFrame to a column list and an array of row arrays.
+
+    The output is ``{"columns":[...],"data":[[...],...]}`` without
+    whitespace, so each key is written once instead of once per row.
+    Columns are written as the keys of the record layouts and values as
+    their values, with missing values as null.
+
+    Args:
+        df: The DataFrame to serialize. Cells must be scalars.
+        chunk_rows: Number of rows per chunk.
+
+    Yields:
+        UTF-8 encoded JSON text.
+    """
+    names = ",".join(map(_encode_key, df.columns))
+    yield ('{"columns":[' + names + '],"data":[').encode("utf-8")
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start : start + chunk_rows]
+        columns = [_encode_column(chunk.iloc[:, i]) for i in range(df.shape[1])]
+        if columns:
+            rows = ",".join("[" + ",".join(values) + "]" for values in zip(*columns))
+        else:
+            rows = ",".join(["[]"] * len(chunk))
+        prefix = "" if start == 0 else ","
+        yield (prefix + rows).encode("utf-8")
+    yield b"]}"
+
+
+def _records(df: pd.DataFrame) -> list[dict[Any, Any]]:
+    """Build the list of records of a DataFrame with missing values as None.
+
+    Args:
+        df: The DataFrame.
+
+    Returns:
+        One dict per row, as ``df.to_dict(orient="records")`` builds them.
+    """
+    records = df.to_dict(orient="records")
+    for record in records:
+        for key, value in record.items():
+            if pd.isna(value):
+                record[key] = None
+    return records
+
+
+def _encode_key(key: Any) -> str:
+    """Encode a column label as a JSON object key.
+
+    Args:
+        key: The column label.
+
+    Returns:
+        The key as json.dumps writes it (non-string keys are converted).
+    """
+    # Strip '{' and ': null}' so the key conversion rules are json's own
+    return json_codec.dumps_unicode({key: None})[1:-7]
+
+
+def _encode_column(column: pd.Series) -> list[str]:
+    """Encode every value of a column as JSON.
+
+    Args:
+        column: The column to encode.
+
+    Returns:
+        The encoded values, with "null" for missing values.
+    """
+    values = column.tolist()
+    kind = column.dtype.kind
+    if kind in "iu":
+        encoded = list(map(int.__repr__, values))
+    elif kind == "f":
+        encoded = list(map(float.__repr__, values))
+        array = column.to_numpy()
+        for i in np.flatnonzero(np.isinf(array)):
+            encoded[i] = "Infinity" if array[i] > 0 else "-Infinity"
+    elif kind == "b":
+        encoded = ["true" if value else "false" for value in values]
+    else:
+        encoded = [
+            encode_basestring(value)
+            if isinstance(value, str)
+            else json_codec.dumps_unicode(value)
+            for value in values
+        ]
+
+    for i in np.flatnonzero(column.isna().to_numpy()):
+        encoded[i] = "null"
+    return encoded
@@ -1,14 +1,17 @@
 """FastAPI application for ParseWiz."""
 
+import hashlib
 import io
-import zipfile
+from collections.abc import Iterator
 from pathlib import Path
+from enum import Enum
+from typing import Any
 
 import httpx
-from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi import FastAPI, File, Form, Header, HTTPException, UploadFile
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, Response
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
 from backend.config import (
@@ -16,6 +19,8 @@ from backend.config import (
     CORS_ORIGINS,
     DISCORD_WEBHOOK_URL,
     MIME_TYPES,
+    OUTPUT_CACHE_MAX_ENTRY_BYTES,
+    OUTPUT_VERSION,
     PREVIEW_ROWS,
 )
 from backend.converters import (
@@ -26,9 +31,14 @@ from backend.converters import (
     JsonToCsvConverter,
     JsonToExcelConverter,
 )
+from backend.converters.archives import write_zip
 from backend.converters.json_to_csv import ExportMode
+from backend.converters.streaming import JsonStyle
+from backend.utils.cache import OUTPUT_CACHE, bind_content, content_hash
 from backend.utils.file_detection import detect_file_type
+from backend.utils.file_store import FILE_STORE
 from backend.utils.security import SecurityHeadersMiddleware, encode_filename_header
+from backend.utils.uploads import FileContent, read_upload
 from backend.utils.validators import validate_file
 
 app = FastAPI(
@@ -46,7 +56,8 @@ app.add_middleware(
     allow_origins=CORS_ORIGINS,
     allow_credentials=False,  # No cookies needed
     allow_methods=["GET", "POST", "OPTIONS"],
-    allow_headers=["Content-Type"],
+    allow_headers=["Content-Type", "If-None-Match"],
+    expose_headers=["ETag"],
 )
 
 # Converter registry
@@ -80,21 +91,42 @@ async def health_check() -> dict[str, str]:
     return {"status": "ok"}
 
 
-@app.post("/api/analyze")
-async def analyze_file(file: UploadFile = File(...)) -> dict:
-    """Analyze JSON file structure to determine complexity.
+async def _load_file(
+    file: UploadFile | None, file_id: str | None
+) -> tuple[FileContent, str, str | None]:
+    """Load the file a request refers to.
+
+    Requests either upload the file directly (multipart) or reference a file
+    previously stored via /api/upload by its handle. The content is bound to
+    the request, so its cache lookups hash it at most once.
 
     Args:
-        file: The uploaded file.
+        file: The uploaded file, if sent with the request.
+        file_id: Handle of a previously uploaded file.
 
     Returns:
-        Analysis results with is_complex, estimated_rows, arrays_found,
-        and expansion_formula.
+        A tuple of (content, filename, detected file type or None).
 
     Raises:
-        HTTPException: If file is invalid or not JSON.
+        HTTPException: If no file is given, the handle is unknown or expired,
+            or the uploaded file is invalid.
     """
-    content = await file.read()
+    if file_id:
+        stored = FILE_STORE.get(file_id)
+        if stored is None:
+            raise HTTPException(
+                status_code=404,
+                detail="Uploaded file not found or expired. Please upload it again.",
+            )
+        # Its digest was computed when it was stored
+        bind_content(stored.content, stored.digest)
+        return stored.content, stored.filename, stored.file_type
+
+    if file is None:
+        raise HTTPException(status_code=400, detail="No file provided")
+
+    content = await read_upload(file)
+    bind_content(content)
     filename = file.filename or "unknown"
 
     # Validate file
@@ -102,20 +134,64 @@ async def analyze_file(file: UploadFile = File(...)) -> dict:
     if not is_valid:
         raise HTTPException(status_code=400, detail=error)
 
-    # Detect file type
-    file_type = detect_file_type(content, filename)
+    return content, filename, detect_file_type(content, filename)
+
+
+@app.post("/api/upload")
+async def upload_file(file: UploadFile = File(...)) -> dict:
+    """Store a file server-side so later requests can reference it.
+
+    The returned file_id can be sent instead of the file to /api/preview,
+    /api/analyze, /api/preview-all-tables and /api/convert.
+
+    Args:
+        file: The uploaded file.
+
+    Returns:
+        Dictionary with file_id, filename, detected_type, size and expires_in.
+
+    Raises:
+        HTTPException: If file is invalid or its type cannot be detected.
+    """
+    content, filename, file_type = await _load_file(file, None)
+    if not file_type:
+        raise HTTPException(status_code=400, detail="Could not detect file type")
+
+    stored = FILE_STORE.put(content, filename, file_type)
+    return {
+        "file_id": stored.file_id,
+        "filename": stored.filename,
+        "detected_type": stored.file_type,
+        "size": stored.size,
+        "expires_in": FILE_STORE.ttl_seconds,
+    }
+
+
+@app.post("/api/analyze")
+async def analyze_file(
+    file: UploadFile | None = File(default=None),
+    file_id: str | None = Form(default=None),
+) -> dict:
+    """Analyze JSON file structure to determine complexity.
+
+    Args:
+        file: The uploaded file.
+        file_id: Handle from /api/upload, used instead of file.
+
+    Returns:
+        Analysis results with is_complex, estimated_rows, arrays_found,
+        and expansion_formula.
+
+    Raises:
+        HTTPException: If file is invalid or not JSON.
+    """
+    content, _, file_type = await _load_file(file, file_id)
     if not file_type:
         raise HTTPException(status_code=400, detail="Could not detect file type")
 
     # Only JSON files need complexity analysis
     if file_type != "json":
-        return {
-            "is_complex": False,
-            "estimated_rows": None,
-            "arrays_found": [],
-            "expansion_formula": None,
-            "message": "Only JSON files require complexity analysis",
-        }
+        return _non_json_analysis()
 
     # Analyze JSON structure
     converter = JsonToCsvConverter()
@@ -126,9 +202,100 @@ async def analyze_file(file: UploadFile = File(...)) -> dict:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
+def _non_json_analysis() -> dict:
+    """Return the complexity analysis reported for non-JSON files."""
+    return {
+        "is_complex": False,
+        "estimated_rows": None,
+        "arrays_found": [],
+        "expansion_formula": None,
+        "message": "Only JSON files require complexity analysis",
+    }
+
+
+@app.post("/api/inspect")
+async def inspect_file(
+    file: UploadFile | None = File(default=None),
+    file_id: str | None = Form(default=None),
+    page_size: int = Form(default=PREVIEW_ROWS),
+    export_mode: str = Form(default="normal"),
+    include_tables: bool | None = Form(default=None),
+    include_single_row: bool | None = Form(default=None),
+    rows_per_table: int = Form(default=5),
+) -> dict:
+    """Detect, analyze and preview a file in one request.
+
+    JSON documents are parsed once and the analysis, the first preview page
+    and the optional multi-table and single-row previews are all built from
+    that parse. Other file types get the first preview page.
+
+    Args:
+        file: The uploaded file.
+        file_id: Handle from /api/upload, used instead of file.
+        page_size: Number of rows in the first preview page.
+        export_mode: Export mode for JSON files (normal, multi_table, single_row).
+        include_tables: Include the multi-table preview (JSON only).
+            Defaults to including it only for complex JSON.
+        include_single_row: Include a 5-row single-row mode preview (JSON only).
+            Defaults to including it only for complex JSON.
+        rows_per_table: Maximum rows per table in the multi-table preview.
+
+    Returns:
+        Dictionary with detected_type, analysis, preview (page 1, or None
+        with preview_error if it could not be built), and optionally tables
+        and single_row_preview.
+
+    Raises:
+        HTTPException: If file is invalid or cannot be parsed.
+    """
+    content, _, file_type = await _load_file(file, file_id)
+    if not file_type:
+        raise HTTPException(status_code=400, detail="Could not detect file type")
+
+    # Validate pagination parameters
+    if page_size < 1:
+        page_size = PREVIEW_ROWS
+    if page_size > 100:
+        page_size = 100  # Cap at 100 rows per page
+    if rows_per_table < 1:
+        rows_per_table = 5
+    if rows_per_table > 100:
+        rows_per_table = 100
+
+    converter = PREVIEW_CONVERTERS.get(file_type)
+    if not converter:
+        raise HTTPException(
+            status_code=400, detail=f"Preview not supported for {file_type} files"
+        )
+
+    try:
+        if file_type == "json":
+            result = converter.inspect(
+                content,
+                page_size=page_size,
+                export_mode=ExportMode(export_mode),
+                include_tables=include_tables,
+                include_single_row=include_single_row,
+                rows_per_table=rows_per_table,
+            )
+        else:
+            result = {
+                "analysis": _non_json_analysis(),
+                "preview": converter.preview(content, page=1, page_size=page_size),
+            }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    result["detected_type"] = file_type
+    if result["preview"] is not None:
+        result["preview"]["detected_type"] = file_type
+    return result
+
+
 @app.post("/api/preview")
 async def preview_file(
-    file: UploadFile = File(...),
+    file: UploadFile | None = File(default=None),
+    file_id: str | None = Form(default=None),
     page: int = Form(default=1),
     page_size: int = Form(default=PREVIEW_ROWS),
     export_mode: str = Form(default="normal"),
@@ -137,6 +304,7 @@ async def preview_file(
 
     Args:
         file: The uploaded file.
+        file_id: Handle from /api/upload, used instead of file.
         page: Page number (1-indexed). Defaults to 1.
         page_size: Number of rows per page. Defaults to PREVIEW_ROWS (10).
         export_mode: Export mode for JSON files (normal, multi_table, single_row).
@@ -148,8 +316,7 @@ async def preview_file(
     Raises:
         HTTPException: If file is invalid or cannot be previewed.
     """
-    content = await file.read()
-    filename = file.filename or "unknown"
+    content, _, file_type = await _load_file(file, file_id)
 
     # Validate pagination parameters
     if page < 1:
@@ -159,13 +326,6 @@ async def preview_file(
     if page_size > 100:
         page_size = 100  # Cap at 100 rows per page
 
-    # Validate file
-    is_valid, error = validate_file(content, filename)
-    if not is_valid:
-        raise HTTPException(status_code=400, detail=error)
-
-    # Detect file type
-    file_type = detect_file_type(content, filename)
     if not file_type:
         raise HTTPException(status_code=400, detail="Could not detect file type")
 
@@ -194,7 +354,8 @@ async def preview_file(
 
 @app.post("/api/preview-all-tables")
 async def preview_all_tables(
-    file: UploadFile = File(...),
+    file: UploadFile | None = File(default=None),
+    file_id: str | None = Form(default=None),
     rows_per_table: int = Form(default=5),
 ) -> dict:
     """Preview all tables from complex JSON in multi-table mode.
@@ -204,6 +365,7 @@ async def preview_all_tables(
 
     Args:
         file: The uploaded JSON file.
+        file_id: Handle from /api/upload, used instead of file.
         rows_per_table: Maximum rows per table. Defaults to 5.
 
     Returns:
@@ -212,16 +374,7 @@ async def preview_all_tables(
     Raises:
         HTTPException: If file is invalid or not JSON.
     """
-    content = await file.read()
-    filename = file.filename or "unknown"
-
-    # Validate file
-    is_valid, error = validate_file(content, filename)
-    if not is_valid:
-        raise HTTPException(status_code=400, detail=error)
-
-    # Detect file type
-    file_type = detect_file_type(content, filename)
+    content, _, file_type = await _load_file(file, file_id)
     if file_type != "json":
         raise HTTPException(
             status_code=400,
@@ -245,33 +398,39 @@ async def preview_all_tables(
 
 @app.post("/api/convert")
 async def convert_file(
-    file: UploadFile = File(...),
+    file: UploadFile | None = File(default=None),
+    file_id: str | None = Form(default=None),
     output_format: str = Form(...),
     export_mode: str = Form(default="normal"),
+    json_style: str = Form(default="pretty"),
+    if_none_match: str | None = Header(default=None),
 ) -> Response:
     """Convert file to specified format.
 
+    Converted output is cached by (content hash, output format, export mode,
+    JSON style), so repeated downloads of the same conversion skip the
+    conversion. CSV and JSON output that isn't cached yet is streamed in row
+    batches. The response carries a strong ETag derived from the same key,
+    as the output is byte-for-byte reproducible. Conditional requests whose
+    If-None-Match matches it get an empty 304 response once the conversion
+    is known to succeed: from the output cache, or else after parsing
+    without serializing.
+
     Args:
         file: The uploaded file.
+        file_id: Handle from /api/upload, used instead of file.
         output_format: Target format (csv, xlsx, json).
         export_mode: Export mode for JSON files (normal, multi_table, single_row).
+        json_style: Layout of JSON output (pretty, compact, ndjson, split).
+        if_none_match: ETags from the If-None-Match request header.
 
     Returns:
-        The converted file.
+        The converted file, or 304 Not Modified.
 
     Raises:
         HTTPException: If conversion fails or is not supported.
     """
-    content = await file.read()
-    filename = file.filename or "unknown"
-
-    # Validate file
-    is_valid, error = validate_file(content, filename)
-    if not is_valid:
-        raise HTTPException(status_code=400, detail=error)
-
-    # Detect file type
-    file_type = detect_file_type(content, filename)
+    content, filename, file_type = await _load_file(file, file_id)
     if not file_type:
         raise HTTPException(status_code=400, detail="Could not detect file type")
 
@@ -299,45 +458,191 @@ async def convert_file(
     base_name = Path(filename).stem
 
     try:
-        # Handle JSON to CSV/Excel with export_mode
-        if file_type == "json":
-            mode = ExportMode(export_mode)
+        # Export mode only applies to JSON input
+        mode = ExportMode(export_mode) if file_type == "json" else None
+        # JSON style only applies to JSON output
+        style = JsonStyle(json_style) if output_format == "json" else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    is_zip = mode == ExportMode.MULTI_TABLE and output_format == "csv"
+    cache_key: tuple = (content_hash(content), output_format, mode, style)
+    if is_zip:
+        # ZIP entries are named after the uploaded file
+        cache_key += (base_name,)
+
+    etag = _conversion_etag(cache_key)
+
+    # Multi-table CSV -> ZIP file with multiple CSVs
+    if is_zip:
+        media_type = "application/zip"
+        extension = "zip"
+    else:
+        extension = "ndjson" if style == JsonStyle.NDJSON else output_format
+        media_type = MIME_TYPES.get(extension, "application/octet-stream")
+
+    # Use secure filename encoding for Content-Disposition header
+    headers = {
+        "Content-Disposition": encode_filename_header(f"{base_name}.{extension}"),
+        "ETag": etag,
+    }
 
-            # Multi-table CSV -> ZIP file with multiple CSVs
-            if mode == ExportMode.MULTI_TABLE and output_format == "csv":
-                tables = converter.convert_multi_table(content)
-                zip_content = _create_csv_zip(tables, base_name)
-                output_filename = f"{base_name}.zip"
-                return Response(
-                    content=zip_content,
-                    media_type="application/zip",
-                    headers={
-                        "Content-Disposition": encode_filename_header(output_filename)
-                    },
+    output = OUTPUT_CACHE.get(cache_key)
+    chunks = None
+    if output is None:
+        try:
+            # Parse now so errors become a 400; serialize while sending
+            chunks = _stream_conversion(converter, content, output_format, mode, style)
+            if chunks is None:
+                output = _run_conversion(
+                    converter, content, output_format, mode, base_name
                 )
+                OUTPUT_CACHE.put(cache_key, output)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+
+    # Only a conversion known to succeed has a current ETag to match
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    if chunks is not None:
+        return StreamingResponse(
+            _stream_to_cache(cache_key, chunks),
+            media_type=media_type,
+            headers=headers,
+        )
+    return Response(content=output, media_type=media_type, headers=headers)
 
-            # Other modes (including multi-table Excel)
-            converted_content = converter.convert(content, export_mode=mode)
-        else:
-            converted_content = converter.convert(content)
 
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e)) from e
+def _run_conversion(
+    converter: Any,
+    content: FileContent,
+    output_format: str,
+    mode: ExportMode | None,
+    base_name: str,
+) -> bytes:
+    """Run a conversion that produces its whole output at once.
 
-    # Generate output filename
-    output_filename = f"{base_name}.{output_format}"
+    Args:
+        converter: The converter for the input/output format pair.
+        content: The source file content as bytes.
+        output_format: Target format (csv, xlsx, json).
+        mode: Export mode for JSON input, None for other inputs.
+        base_name: Base name of the uploaded file (used for ZIP entries).
 
-    # Get MIME type
-    mime_type = MIME_TYPES.get(output_format, "application/octet-stream")
+    Returns:
+        The converted file content.
+
+    Raises:
+        ValueError: If the content cannot be converted.
+    """
+    if mode == ExportMode.MULTI_TABLE and output_format == "csv":
+        tables = converter.convert_multi_table(content)
+        return _create_csv_zip(tables, base_name)
+
+    # Other modes (including multi-table Excel)
+    if mode is not None:
+        return converter.convert(content, export_mode=mode)
+    return converter.convert(content)
+
+
+def _stream_conversion(
+    converter: Any,
+    content: FileContent,
+    output_format: str,
+    mode: ExportMode | None,
+    style: JsonStyle | None,
+) -> Iterator[bytes] | None:
+    """Start a conversion whose output can be produced in chunks.
+
+    CSV and JSON output are written in row batches; xlsx workbooks and
+    multi-table ZIP archives can only be built whole.
+
+    Args:
+        converter: The converter for the input/output format pair.
+        content: The source file content as bytes.
+        output_format: Target format (csv, xlsx, json).
+        mode: Export mode for JSON input, None for other inputs.
+        style: Layout of JSON output, None for other outputs.
+
+    Returns:
+        Iterator over the converted output, or None if it can't be streamed.
+
+    Raises:
+        ValueError: If the content cannot be converted.
+    """
+    if output_format == "json":
+        return converter.iter_json(content, style)
+    if output_format != "csv" or mode == ExportMode.MULTI_TABLE:
+        return None
+    if mode is not None:
+        return converter.iter_csv(content, export_mode=mode)
+    return converter.iter_csv(content)
 
-    # Use secure filename encoding for Content-Disposition header
-    content_disposition = encode_filename_header(output_filename)
 
-    return Response(
-        content=converted_content,
-        media_type=mime_type,
-        headers={"Content-Disposition": content_disposition},
-    )
+def _stream_to_cache(key: tuple, chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Pass output chunks through, caching the output once fully sent.
+
+    Chunks are only kept while their total fits OUTPUT_CACHE_MAX_ENTRY_BYTES,
+    so larger output is streamed without being held in memory, and nothing
+    is cached if the client disconnects before the end.
+
+    Args:
+        key: The output cache key.
+        chunks: The converted output in chunks.
+
+    Yields:
+        The chunks, unchanged.
+    """
+    max_bytes = min(OUTPUT_CACHE_MAX_ENTRY_BYTES, OUTPUT_CACHE.max_bytes)
+    parts: list[bytes] | None = []
+    size = 0
+    for chunk in chunks:
+        if parts is not None:
+            size += len(chunk)
+            if size > max_bytes:
+                parts = None
+            else:
+                parts.append(chunk)
+        yield chunk
+    if parts is not None:
+        OUTPUT_CACHE.put(key, b"".join(parts))
+
+
+def _conversion_etag(key: tuple) -> str:
+    """Build the ETag of a conversion from its output cache key.
+
+    The output is fully determined by the input content, the conversion
+    options and the converters' OUTPUT_VERSION, and xlsx and ZIP output have
+    their timestamps pinned, so the ETag is strong and known before
+    converting.
+
+    Args:
+        key: The output cache key.
+
+    Returns:
+        The quoted strong ETag.
+    """
+    parts = [OUTPUT_VERSION]
+    parts += (part.value if isinstance(part, Enum) else str(part) for part in key)
+    return f'"{hashlib.sha256("|".join(parts).encode()).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag.
+
+    Uses weak comparison, as required for If-None-Match.
+
+    Args:
+        if_none_match: The If-None-Match header value (a list of ETags or "*").
+        etag: The current ETag of the resource.
+
+    Returns:
+        True if the client's cached copy is still current.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
 
 
 def _create_csv_zip(tables: dict, base_name: str) -> bytes:
@@ -350,19 +655,15 @@ def _create_csv_zip(tables: dict, base_name: str) -> bytes:
     Returns:
         ZIP file content as bytes.
     """
-    zip_buffer = io.BytesIO()
+    files = {}
+    for table_name, df in tables.items():
+        csv_buffer = io.StringIO()
+        df.to_csv(csv_buffer, index=False)
 
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-        for table_name, df in tables.items():
-            csv_buffer = io.StringIO()
-            df.to_csv(csv_buffer, index=False)
-            csv_content = csv_buffer.getvalue().encode("utf-8")
+        # Use table name as filename
+        files[f"{base_name}_{table_name}.csv"] = csv_buffer.getvalue().encode("utf-8")
 
-            # Use table name as filename
-            csv_filename = f"{base_name}_{table_name}.csv"
-            zip_file.writestr(csv_filename, csv_content)
-
-    return zip_buffer.getvalue()
+    return write_zip(files)
 
 
 class FeedbackRequest(BaseModel):
@@ -406,7 +707,9 @@ async def send_feedback(feedback: FeedbackRequest) -> dict[str, str]:
 
     try:
         async with httpx.AsyncClient() as client:
-            response = await client.post(DISCORD_WEBHOOK_URL, json=payload, timeout=10.0)
+            response = await client.post(
+                DISCORD_WEBHOOK_URL, json=payload, timeout=10.0
+            )
             response.raise_for_status()
     except httpx.HTTPError as e:
         raise HTTPException(status_code=503, detail="Failed to send feedback") from e
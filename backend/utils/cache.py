@@ -0,0 +1,217 @@
+"""In-memory caches shared across requests."""
+
+import dataclasses
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+import pandas as pd
+
+from backend.config import OUTPUT_CACHE_MAX_BYTES, PARSE_CACHE_MAX_BYTES
+from backend.utils.uploads import FileContent
+
+T = TypeVar("T")
+
+
+class _RequestContent:
+    """The content a request works on and its digest, once known."""
+
+    def __init__(self, content: FileContent, digest: str | None) -> None:
+        self.content = content
+        self.digest = digest
+
+
+_request_content: ContextVar[_RequestContent | None] = ContextVar(
+    "request_content", default=None
+)
+
+
+def bind_content(content: FileContent, digest: str | None = None) -> None:
+    """Hash the content of the current request at most once.
+
+    For the rest of the current context (the request being handled),
+    content_hash of this content object computes its digest on first use
+    only, or never if the digest is already known.
+
+    Args:
+        content: The request's file content.
+        digest: The content's SHA-256 hex digest, if known (e.g. the file_id
+            of a stored upload).
+    """
+    _request_content.set(_RequestContent(content, digest))
+
+
+def content_hash(content: FileContent) -> str:
+    """Return the SHA-256 hex digest of file content.
+
+    The digest of the content bound to the current request is reused.
+
+    Args:
+        content: The file content (bytes or a memory-mapped upload).
+
+    Returns:
+        The hex digest, used as the content part of cache keys.
+    """
+    bound = _request_content.get()
+    if bound is None or bound.content is not content:
+        return hashlib.sha256(content).hexdigest()
+    if bound.digest is None:
+        bound.digest = hashlib.sha256(content).hexdigest()
+    return bound.digest
+
+
+def estimate_size(value: Any) -> int:
+    """Estimate the memory footprint of a cached value in bytes.
+
+    Args:
+        value: A DataFrame, a dict, tuple or list of values, a dataclass
+            instance, bytes, or any other object.
+
+    Returns:
+        Approximate size in bytes.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, dict):
+        return sum(estimate_size(v) for v in value.values())
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return sys.getsizeof(value) + sum(
+            estimate_size(getattr(value, field.name))
+            for field in dataclasses.fields(value)
+        )
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by the total size of its values.
+
+    Values larger than the whole budget are never stored. Hit and miss
+    counters are kept for monitoring.
+    """
+
+    def __init__(
+        self, max_bytes: int, sizeof: Callable[[Any], int] = estimate_size
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Maximum total size of cached values.
+            sizeof: Function returning the size of a value in bytes.
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._sizeof = sizeof
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        """Get a cached value and mark it as recently used.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The cached value, or None on a miss.
+        """
+        entry = self._lookup(key)
+        return entry[0] if entry is not None else None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting least recently used entries over budget.
+
+        Args:
+            key: The cache key.
+            value: The value to cache.
+        """
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous[1]
+
+            self._entries[key] = (value, size)
+            self._total_bytes += size
+
+            while self._total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+
+    def get_or_build(self, key: Hashable, build: Callable[[], T]) -> T:
+        """Get a cached value, building and storing it on a miss.
+
+        Args:
+            key: The cache key.
+            build: Function producing the value when it is not cached.
+
+        Returns:
+            The cached or newly built value. A built None is cached too.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry[0]
+        value = build()
+        self.put(key, value)
+        return value
+
+    def _lookup(self, key: Hashable) -> tuple[Any, int] | None:
+        """Find an entry, count the hit or miss and mark it as recently used.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The (value, size) entry, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, entries, size_bytes and max_bytes.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Parsed tables and other parse results keyed by (content hash, input type,
+# kind of result, dtype, export mode)
+PARSE_CACHE = LRUCache(PARSE_CACHE_MAX_BYTES)
+
+# Converted output keyed by (content hash, output format, export mode). Kept
+# separate from the parse cache so large outputs can't evict parsed tables.
+OUTPUT_CACHE = LRUCache(OUTPUT_CACHE_MAX_BYTES)
@@ -0,0 +1,173 @@
+"""CSV dialect sniffing from the start of a file."""
+
+import csv
+import io
+import itertools
+import re
+from dataclasses import dataclass
+
+# Candidate delimiters, in order of preference on ties
+CSV_DELIMITERS = (",", ";", "\t", "|")
+# Candidate quote characters, in order of preference on ties
+CSV_QUOTE_CHARS = ('"', "'")
+# Records parsed to score each candidate dialect
+CSV_SNIFF_RECORDS = 10
+
+
+@dataclass(frozen=True)
+class CsvDialect:
+    """Layout of a CSV file.
+
+    Attributes:
+        delimiter: Field delimiter.
+        quotechar: Character quoting fields that contain delimiters,
+            quotes or line breaks.
+        lineterminator: Line break of the records: "\\n", "\\r\\n" or "\\r".
+        fields: Number of fields of the header record.
+        consistent: Whether at least two records were sampled and they all
+            have the same number of fields.
+    """
+
+    delimiter: str = ","
+    quotechar: str = '"'
+    lineterminator: str = "\n"
+    fields: int = 1
+    consistent: bool = False
+
+
+def sniff_dialect(text: str, truncated: bool = False) -> CsvDialect | None:
+    """Detect the dialect of CSV text from its first records.
+
+    Each candidate delimiter and quote character is scored by how many of
+    the first CSV_SNIFF_RECORDS records, parsed with quoting respected, have
+    as many fields as the header. For each delimiter, a quote character
+    other than the first candidate is only used if it is next to the
+    delimiter somewhere and more records match with it. Between delimiters,
+    ties go to the one most often next to the quote character, as quoted
+    fields are, then to the one splitting the header into the most fields.
+    The default dialect is kept unless the best candidate scores at least
+    as high.
+
+    Args:
+        text: The start of the file.
+        truncated: Whether the text was cut from a longer file, in which case
+            the last, possibly incomplete, record is ignored.
+
+    Returns:
+        The best scoring dialect, or None if no candidate delimiter is in
+        the text.
+    """
+    best = None
+    for delimiter in CSV_DELIMITERS:
+        if delimiter not in text:
+            continue
+        chosen = None
+        for quotechar in CSV_QUOTE_CHARS:
+            candidate = _score_dialect(text, delimiter, quotechar, truncated)
+            if candidate is None:
+                continue
+            if chosen is None or (
+                candidate[0][0] > chosen[0][0] and candidate[0][1] > 0
+            ):
+                chosen = candidate
+        if chosen and (best is None or chosen[0] > best[0]):
+            best = chosen
+    if best is None:
+        return None
+
+    # Lines the default dialect reads more consistently aren't split
+    default = CsvDialect()
+    fallback = _score_dialect(text, default.delimiter, default.quotechar, truncated)
+    if fallback and fallback[0][0] > best[0][0]:
+        best = fallback
+    return best[1]
+
+
+def _score_dialect(
+    text: str, delimiter: str, quotechar: str, truncated: bool
+) -> tuple[tuple[float, int, int], CsvDialect] | None:
+    """Score a candidate dialect on the first records of CSV text.
+
+    Args:
+        text: The start of the file.
+        delimiter: Field delimiter.
+        quotechar: Quote character.
+        truncated: Whether the last record may be incomplete.
+
+    Returns:
+        ((share of records as wide as the header, occurrences of the quote
+        character next to the delimiter, header width), the dialect), or
+        None if the text has no records with this dialect.
+    """
+    records = _sample_records(text, delimiter, quotechar, truncated)
+    if not records:
+        return None
+
+    width = len(records[0])
+    matching = sum(len(record) == width for record in records)
+    quoted = text.count(delimiter + quotechar) + text.count(quotechar + delimiter)
+    dialect = CsvDialect(
+        delimiter,
+        quotechar,
+        _line_terminator(text, quotechar),
+        fields=width,
+        consistent=len(records) >= 2 and matching == len(records),
+    )
+    return (matching / len(records), quoted, width), dialect
+
+
+def _sample_records(
+    text: str, delimiter: str, quotechar: str, truncated: bool
+) -> list[list[str]]:
+    """Parse the first non-empty records of CSV text.
+
+    Args:
+        text: The start of the file.
+        delimiter: Field delimiter.
+        quotechar: Quote character.
+        truncated: Whether the last record may be incomplete.
+
+    Returns:
+        Up to CSV_SNIFF_RECORDS records, or none if the text can't be parsed
+        with this dialect.
+    """
+    reader = csv.reader(
+        io.StringIO(text, newline=""), delimiter=delimiter, quotechar=quotechar
+    )
+    try:
+        records = [
+            record
+            for record in itertools.islice(reader, CSV_SNIFF_RECORDS + 1)
+            if record
+        ]
+    except csv.Error:
+        return []
+
+    if len(records) > CSV_SNIFF_RECORDS:
+        return records[:CSV_SNIFF_RECORDS]
+    if truncated:
+        # The whole sample may be one incomplete record
+        return records[:-1]
+    return records
+
+
+def _line_terminator(text: str, quotechar: str) -> str:
+    """Find the line break ending the first record.
+
+    Args:
+        text: The start of the file.
+        quotechar: Quote character; line breaks inside quotes are skipped.
+
+    Returns:
+        "\\r\\n", "\\r" or "\\n" ("\\n" if the text is a single line).
+    """
+    quoted = False
+    for match in re.finditer(f"[{re.escape(quotechar)}\r\n]", text):
+        char = match.group()
+        if char == quotechar:
+            quoted = not quoted
+        elif not quoted:
+            if char == "\r" and text[match.end() : match.end() + 1] == "\n":
+                return "\r\n"
+            return char
+    return "\n"
@@ -1,10 +1,35 @@
 """File type detection utilities."""
 
-import json
+import codecs
+import re
 from pathlib import Path
 
+from backend.utils.csv_dialect import sniff_dialect
+from backend.utils.uploads import FileContent
 
-def detect_file_type(content: bytes, filename: str) -> str | None:
+# Bytes examined at the start of a file when sniffing its type
+SNIFF_BYTES = 64 * 1024
+# Bytes examined at the end of a file for the closing JSON bracket
+TAIL_BYTES = 4096
+
+# Byte order marks and the codecs that decode (and drop) them. UTF-32 comes
+# first, as its little-endian mark starts with the UTF-16 one.
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# First non-whitespace character
+_NON_SPACE = re.compile(r"\S")
+
+# Characters that can start a JSON value (used to check the token after "[")
+JSON_VALUE_START = frozenset('{["-0123456789tfn')
+
+
+def detect_file_type(content: FileContent, filename: str) -> str | None:
     """Detect file type by content and filename.
 
     Attempts to detect the file type by examining the content first,
@@ -26,9 +51,44 @@ def detect_file_type(content: bytes, filename: str) -> str | None:
     return _detect_by_extension(filename)
 
 
-def _detect_by_content(content: bytes) -> str | None:
+def decode_sample(content: FileContent) -> tuple[str, str]:
+    """Detect the text encoding of content and decode its start.
+
+    The encoding is decided from a byte order mark if there is one,
+    otherwise from the first SNIFF_BYTES: UTF-8 if they decode as UTF-8,
+    latin-1 (which accepts any byte) if they don't. A byte order mark is
+    not part of the decoded text.
+
+    Args:
+        content: The file content as bytes.
+
+    Returns:
+        (the first SNIFF_BYTES decoded, the encoding to read the content
+        with). A non-UTF-8 byte after the sample can still make "utf-8"
+        fail on the whole content; latin-1 is the fallback then.
+    """
+    sample = content[:SNIFF_BYTES]
+    final = len(content) <= SNIFF_BYTES
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            return decoder.decode(sample, final=final), encoding
+
+    # The incremental decoder tolerates a multi-byte character cut off at
+    # the end of the sample
+    try:
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        return decoder.decode(sample, final=final), "utf-8"
+    except UnicodeDecodeError:
+        return str(sample, "latin-1"), "latin-1"
+
+
+def _detect_by_content(content: FileContent) -> str | None:
     """Detect file type by examining content.
 
+    Only a bounded window at the start of the file (and a few bytes at the
+    end for JSON) is examined, so detection cost stays flat as files grow.
+
     Args:
         content: The file content as bytes.
 
@@ -44,26 +104,34 @@ def _detect_by_content(content: bytes) -> str | None:
     if content[:4] == b"\xd0\xcf\x11\xe0":
         return "xls"
 
-    # Try to decode as text for JSON/CSV detection
-    try:
-        text = content.decode("utf-8").strip()
-    except UnicodeDecodeError:
-        try:
-            text = content.decode("latin-1").strip()
-        except UnicodeDecodeError:
-            return None
+    text, _ = decode_sample(content)
+    truncated = len(content) > SNIFF_BYTES
 
     # Check for JSON
-    if _is_json(text):
+    if _is_json(text.lstrip(), _last_token(content)):
         return "json"
 
     # Check for CSV (has multiple lines with consistent delimiters)
-    if _is_csv(text):
+    if _is_csv(text, truncated):
         return "csv"
 
     return None
 
 
+def _last_token(content: FileContent) -> str:
+    """Return the last non-whitespace character of the content.
+
+    Args:
+        content: The file content as bytes.
+
+    Returns:
+        The last non-whitespace character, or "" if the end of the file is
+        only whitespace.
+    """
+    tail = content[-TAIL_BYTES:].rstrip()
+    return chr(tail[-1]) if tail else ""
+
+
 def _detect_by_extension(filename: str) -> str | None:
     """Detect file type by file extension.
 
@@ -83,58 +151,50 @@ def _detect_by_extension(filename: str) -> str | None:
     return extension_map.get(ext)
 
 
-def _is_json(text: str) -> bool:
-    """Check if text is valid JSON.
+def _is_json(text: str, last_token: str) -> bool:
+    """Check if text looks like a JSON document.
+
+    Only the structure around the first and last tokens is checked, so the
+    cost doesn't grow with the file. Full validation happens once, when the
+    converter parses the document (which also reports the error position).
 
     Args:
-        text: The text to check.
+        text: The start of the document, without leading whitespace.
+        last_token: The last non-whitespace character of the document.
 
     Returns:
-        True if valid JSON, False otherwise.
+        True if the text looks like a JSON object or array, False otherwise.
     """
     if not text:
         return False
 
-    # JSON should start with [ or {
-    if text[0] not in "[{":
+    # JSON should start with [ or { and end with the matching bracket
+    opening = text[0]
+    if opening not in "[{" or last_token != {"[": "]", "{": "}"}[opening]:
         return False
 
-    try:
-        json.loads(text)
-        return True
-    except json.JSONDecodeError:
-        return False
+    # The next token must be valid after the opening bracket:
+    # a key or "}" for objects, a value or "]" for arrays
+    match = _NON_SPACE.search(text, 1)
+    following = match.group() if match else last_token
+    if opening == "{":
+        return following in ('"', "}")
+    return following == "]" or following in JSON_VALUE_START
 
 
-def _is_csv(text: str) -> bool:
+def _is_csv(text: str, truncated: bool = False) -> bool:
     """Check if text appears to be CSV.
 
+    Sniffs the dialect of the first few records, respecting quoted fields,
+    and requires a consistent number of fields per record, at least two.
+
     Args:
-        text: The text to check.
+        text: The text to check (the start of the file).
+        truncated: Whether the text was cut from a longer file, in which case
+            the last, possibly incomplete, record is ignored.
 
     Returns:
         True if appears to be CSV, False otherwise.
     """
-    if not text:
-        return False
-
-    lines = text.split("\n")
-    if len(lines) < 2:
-        return False
-
-    # Check for common delimiters
-    delimiters = [",", ";", "\t"]
-    for delimiter in delimiters:
-        if delimiter in lines[0]:
-            # Check if delimiter count is consistent across first few lines
-            first_count = lines[0].count(delimiter)
-            if first_count > 0:
-                consistent = all(
-                    line.count(delimiter) == first_count
-                    for line in lines[1:4]
-                    if line.strip()
-                )
-                if consistent:
-                    return True
-
-    return False
+    dialect = sniff_dialect(text, truncated)
+    return dialect is not None and dialect.consistent and dialect.fields >= 2
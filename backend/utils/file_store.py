@@ -0,0 +1,170 @@
+"""Temporary server-side storage for uploaded files."""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from backend.config import UPLOAD_STORE_MAX_BYTES, UPLOAD_TTL_SECONDS
+from backend.utils.cache import content_hash
+from backend.utils.uploads import FileContent
+
+
+@dataclass
+class StoredFile:
+    """An uploaded file kept server-side so later requests can reference it.
+
+    Uploads of the same content share one copy of it, but each filename and
+    file type gets its own entry and handle.
+    """
+
+    file_id: str
+    digest: str
+    filename: str
+    file_type: str
+    content: FileContent
+    expires_at: float
+
+    @property
+    def size(self) -> int:
+        """Size of the stored content in bytes."""
+        return len(self.content)
+
+
+class FileStore:
+    """In-memory store of uploads, keeping identical content once.
+
+    Entries expire after a period without use (sliding TTL). When the total
+    size of the stored content exceeds the budget, the least recently used
+    entries are dropped first.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = UPLOAD_TTL_SECONDS,
+        max_bytes: int = UPLOAD_STORE_MAX_BYTES,
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            ttl_seconds: Seconds an entry stays available after its last use.
+            max_bytes: Maximum total size of stored content.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, StoredFile] = OrderedDict()
+        # Content by digest, with the number of entries sharing it
+        self._contents: dict[str, tuple[FileContent, int]] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, content: FileContent, filename: str, file_type: str) -> StoredFile:
+        """Store a file and return its entry.
+
+        Uploading the same file again refreshes its entry. The same content
+        under another filename or file type gets an entry of its own, which
+        shares the stored content instead of keeping a second copy.
+
+        Args:
+            content: The file content (bytes or a memory-mapped upload).
+            filename: The original filename.
+            file_type: The detected file type.
+
+        Returns:
+            The stored file entry.
+        """
+        digest = content_hash(content)
+        file_id = hashlib.sha256(
+            f"{digest}\0{file_type}\0{filename}".encode()
+        ).hexdigest()
+        expires_at = time.monotonic() + self.ttl_seconds
+
+        with self._lock:
+            entry = self._entries.get(file_id)
+            if entry is not None:
+                entry.expires_at = expires_at
+                self._entries.move_to_end(file_id)
+            else:
+                entry = StoredFile(
+                    file_id=file_id,
+                    digest=digest,
+                    filename=filename,
+                    file_type=file_type,
+                    content=self._retain(digest, content),
+                    expires_at=expires_at,
+                )
+                self._entries[file_id] = entry
+            self._evict()
+
+        return entry
+
+    def get(self, file_id: str) -> StoredFile | None:
+        """Get a stored file by its handle and extend its lifetime.
+
+        Args:
+            file_id: The handle returned when the file was stored.
+
+        Returns:
+            The stored file entry, or None if unknown or expired.
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(file_id)
+            if entry is None:
+                return None
+            if entry.expires_at <= now:
+                self._remove(file_id)
+                return None
+
+            entry.expires_at = now + self.ttl_seconds
+            self._entries.move_to_end(file_id)
+            return entry
+
+    def _retain(self, digest: str, content: FileContent) -> FileContent:
+        """Take a reference to stored content, storing it if new.
+
+        Must be called with the lock held.
+
+        Args:
+            digest: SHA-256 hex digest of the content.
+            content: The content, used if it isn't stored yet.
+
+        Returns:
+            The stored copy of the content.
+        """
+        stored = self._contents.get(digest)
+        if stored is None:
+            stored = (content, 0)
+            self._total_bytes += len(content)
+        self._contents[digest] = (stored[0], stored[1] + 1)
+        return stored[0]
+
+    def _evict(self) -> None:
+        """Drop expired entries, then least recently used ones over budget.
+
+        Must be called with the lock held.
+        """
+        now = time.monotonic()
+        for file_id in [k for k, v in self._entries.items() if v.expires_at <= now]:
+            self._remove(file_id)
+
+        # Always keep the most recent entry, even if it alone exceeds the budget
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            oldest_id = next(iter(self._entries))
+            self._remove(oldest_id)
+
+    def _remove(self, file_id: str) -> None:
+        """Remove an entry. Must be called with the lock held."""
+        entry = self._entries.pop(file_id)
+        content, refs = self._contents[entry.digest]
+        if refs > 1:
+            self._contents[entry.digest] = (content, refs - 1)
+        else:
+            del self._contents[entry.digest]
+            self._total_bytes -= len(content)
+
+
+# Process-wide store used by the API endpoints
+FILE_STORE = FileStore()
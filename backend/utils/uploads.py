@@ -0,0 +1,125 @@
+"""Reading uploaded files without holding large uploads in memory."""
+
+import io
+import mmap
+import tempfile
+
+from fastapi import UploadFile
+
+from backend.config import UPLOAD_MEMORY_THRESHOLD
+
+# File content handed to validators and converters: bytes for small uploads,
+# a read-only memory map of the spooled temporary file for large ones
+FileContent = bytes | mmap.mmap
+
+
+async def read_upload(file: UploadFile) -> FileContent:
+    """Get the content of an uploaded file.
+
+    Small uploads are read into memory. Larger ones are left in the spooled
+    temporary file the multipart parser wrote them to, forced to disk, and
+    memory-mapped, so their pages are backed by the file instead of the
+    process heap. The mapping stays valid after the upload is closed.
+
+    Args:
+        file: The uploaded file.
+
+    Returns:
+        The file content as bytes or as a read-only memory map.
+    """
+    spooled = file.file
+    size = file.size if file.size is not None else -1
+    if size <= UPLOAD_MEMORY_THRESHOLD or not isinstance(
+        spooled, tempfile.SpooledTemporaryFile
+    ):
+        return await file.read()
+
+    # Move the content to disk (no-op if already there) and map it
+    spooled.rollover()
+    spooled.flush()
+    return mmap.mmap(spooled.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class BufferReader(io.RawIOBase):
+    """Read-only binary file over bytes or a memory map, without copying.
+
+    Each reader has its own position, so one stored upload can be read by
+    several requests at the same time.
+    """
+
+    def __init__(self, content: FileContent) -> None:
+        """Initialize the reader.
+
+        Args:
+            content: The buffer to read from.
+        """
+        self._view = memoryview(content)
+        self._position = 0
+
+    def readable(self) -> bool:
+        """Return True: the reader supports reading."""
+        return True
+
+    def seekable(self) -> bool:
+        """Return True: the reader supports random access."""
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:
+        """Read bytes into a pre-allocated buffer.
+
+        Args:
+            buffer: The buffer to fill.
+
+        Returns:
+            Number of bytes read (0 at end of file).
+        """
+        count = max(0, min(len(buffer), len(self._view) - self._position))
+        buffer[:count] = self._view[self._position : self._position + count]
+        self._position += count
+        return count
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Change the read position.
+
+        Args:
+            offset: Offset relative to whence.
+            whence: io.SEEK_SET, io.SEEK_CUR or io.SEEK_END.
+
+        Returns:
+            The new absolute position.
+        """
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            # Same error as seeking before the start of a real file
+            raise OSError(f"Invalid seek position {position}")
+        self._position = position
+        return position
+
+    def tell(self) -> int:
+        """Return the current read position."""
+        return self._position
+
+    def close(self) -> None:
+        """Close the reader and release the underlying buffer."""
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+def open_buffer(content: FileContent) -> io.BufferedReader:
+    """Open file content as a seekable binary file object without copying it.
+
+    Args:
+        content: The file content.
+
+    Returns:
+        A buffered binary reader over the content.
+    """
+    return io.BufferedReader(BufferReader(content))
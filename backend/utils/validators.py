@@ -3,9 +3,10 @@
 import json
 
 from backend.config import ALLOWED_EXTENSIONS, MAX_FILE_SIZE
+from backend.utils.uploads import FileContent
 
 
-def validate_file(content: bytes, filename: str) -> tuple[bool, str | None]:
+def validate_file(content: FileContent, filename: str) -> tuple[bool, str | None]:
     """Validate an uploaded file.
 
     Args:
@@ -34,7 +35,7 @@ def validate_file(content: bytes, filename: str) -> tuple[bool, str | None]:
     return True, None
 
 
-def validate_json_content(content: bytes) -> tuple[bool, str | None]:
+def validate_json_content(content: FileContent) -> tuple[bool, str | None]:
     """Validate JSON content.
 
     Args:
@@ -44,7 +45,7 @@ def validate_json_content(content: bytes) -> tuple[bool, str | None]:
         A tuple of (is_valid, error_message).
     """
     try:
-        text = content.decode("utf-8")
+        text = str(content, "utf-8")
     except UnicodeDecodeError:
         return False, "Invalid encoding. File must be UTF-8 encoded."
 
@@ -82,6 +82,8 @@ const CONVERSION_OPTIONS = {
 
 // Current file reference
 let currentFile = null
+// Server-side handle for the current file (returned by /api/upload)
+let currentFileId = null
 
 // Pagination state
 let currentPage = 1
@@ -190,6 +192,9 @@ function hideSelectedFile() {
 
 // Process uploaded file
 async function processFile(file, page = 1) {
+    if (file !== currentFile) {
+        currentFileId = null
+    }
     currentFile = file
     currentPage = page
 
@@ -208,27 +213,28 @@ async function processFile(file, page = 1) {
     hideError()
 
     try {
-        const extension = file.name.split('.').pop().toLowerCase()
-
-        // For JSON files on first page, check complexity first
-        if (page === 1 && extension === 'json' && selectedExportMode === 'normal') {
-            const analysis = await analyzeJson(file)
-            if (analysis.is_complex) {
+        // On the first page, detect, analyze and preview in a single request
+        if (page === 1 && selectedExportMode === 'normal') {
+            const data = await inspectFile(file)
+            if (data.analysis.is_complex) {
+                // Keep the multi-table and single-row previews for the mode choice
+                multiTablePreviewData = { tables: data.tables, detected_type: data.detected_type }
+                singleFilePreviewData = data.single_row_preview
                 hideLoading()
-                showExportModeChoice(analysis)
+                showExportModeChoice(data.analysis)
                 return
             }
+            if (!data.preview) {
+                throw new Error(data.preview_error || 'Failed to preview file')
+            }
+            showPreview(file, data.preview)
+            return
         }
 
-        const formData = new FormData()
-        formData.append('file', file)
-        formData.append('page', page)
-        formData.append('page_size', pageSize)
-        formData.append('export_mode', selectedExportMode)
-
-        const response = await fetch(`${API_BASE}/preview`, {
-            method: 'POST',
-            body: formData
+        const response = await postWithFile('preview', file, {
+            page: page,
+            page_size: pageSize,
+            export_mode: selectedExportMode
         })
 
         if (!response.ok) {
@@ -264,6 +270,53 @@ async function processFile(file, page = 1) {
     }
 }
 
+// Upload file once and remember its handle for later requests
+async function uploadFile(file) {
+    const formData = new FormData()
+    formData.append('file', file)
+
+    const response = await fetch(`${API_BASE}/upload`, {
+        method: 'POST',
+        body: formData
+    })
+
+    if (!response.ok) {
+        const error = await response.json()
+        throw new Error(error.detail || 'Failed to upload file')
+    }
+
+    const data = await response.json()
+    currentFileId = data.file_id
+    return currentFileId
+}
+
+// POST to an API endpoint referencing the uploaded file by its handle.
+// Uploads the file first if needed, and again if the handle has expired.
+async function postWithFile(endpoint, file, fields = {}) {
+    const send = () => {
+        const formData = new FormData()
+        formData.append('file_id', currentFileId)
+        for (const [key, value] of Object.entries(fields)) {
+            formData.append(key, value)
+        }
+        return fetch(`${API_BASE}/${endpoint}`, {
+            method: 'POST',
+            body: formData
+        })
+    }
+
+    if (!currentFileId) {
+        await uploadFile(file)
+    }
+
+    let response = await send()
+    if (response.status === 404) {
+        await uploadFile(file)
+        response = await send()
+    }
+    return response
+}
+
 // Go to specific page
 async function goToPage(page) {
     if (!currentFile || page < 1 || page > totalPages) return
@@ -430,14 +483,9 @@ async function convertFile(format) {
     })
 
     try {
-        const formData = new FormData()
-        formData.append('file', currentFile)
-        formData.append('output_format', outputFormat)
-        formData.append('export_mode', selectedExportMode)
-
-        const response = await fetch(`${API_BASE}/convert`, {
-            method: 'POST',
-            body: formData
+        const response = await postWithFile('convert', currentFile, {
+            output_format: outputFormat,
+            export_mode: selectedExportMode
         })
 
         if (!response.ok) {
@@ -487,6 +535,7 @@ function downloadBlob(blob, filename) {
 // Reset UI to initial state
 function resetUI() {
     currentFile = null
+    currentFileId = null
     fileInput.value = ''
     currentPage = 1
     totalPages = 1
@@ -615,19 +664,18 @@ async function retryParse() {
     }
 }
 
-// Analyze JSON file for complexity
-async function analyzeJson(file) {
-    const formData = new FormData()
-    formData.append('file', file)
-
-    const response = await fetch(`${API_BASE}/analyze`, {
-        method: 'POST',
-        body: formData
+// Detect, analyze and preview the first page of a file from a single parse.
+// For complex JSON the response also includes the multi-table and
+// single-row previews.
+async function inspectFile(file) {
+    const response = await postWithFile('inspect', file, {
+        page_size: pageSize,
+        rows_per_table: 100
     })
 
     if (!response.ok) {
         const error = await response.json()
-        throw new Error(error.detail || 'Failed to analyze file')
+        throw new Error(error.detail || 'Failed to preview file')
     }
 
     return await response.json()
@@ -667,11 +715,17 @@ async function proceedWithExportMode() {
         // Calculate table count: arrays + main table
         const tableCount = jsonAnalysis ? jsonAnalysis.arrays_found.length + 1 : 0
 
-        // Fetch both previews in parallel for complex JSON
-        const [multiTableData, singleFileData] = await Promise.all([
-            fetchMultiTablePreview(currentFile, tableCount),
-            fetchSingleFilePreview(currentFile)
-        ])
+        let multiTableData = multiTablePreviewData
+        let singleFileData = singleFilePreviewData
+
+        // Reuse the previews from inspection unless there are many tables,
+        // which get the compact 5-row preview instead
+        if (!multiTableData || !multiTableData.tables || tableCount > 10) {
+            multiTableData = await fetchMultiTablePreview(currentFile, tableCount)
+        }
+        if (!singleFileData) {
+            singleFileData = await fetchSingleFilePreview(currentFile)
+        }
 
         multiTablePreviewData = multiTableData
         singleFilePreviewData = singleFileData
@@ -686,16 +740,12 @@ async function proceedWithExportMode() {
 
 // Fetch multi-table preview from API
 async function fetchMultiTablePreview(file, tableCount = 0) {
-    const formData = new FormData()
-    formData.append('file', file)
     // If 10 or fewer tables, show up to 100 rows per table with scroll
     // Otherwise, keep the compact 5-row preview
     const rowsPerTable = tableCount <= 10 ? 100 : 5
-    formData.append('rows_per_table', rowsPerTable)
 
-    const response = await fetch(`${API_BASE}/preview-all-tables`, {
-        method: 'POST',
-        body: formData
+    const response = await postWithFile('preview-all-tables', file, {
+        rows_per_table: rowsPerTable
     })
 
     if (!response.ok) {
@@ -708,15 +758,10 @@ async function fetchMultiTablePreview(file, tableCount = 0) {
 
 // Fetch single-file preview from API (using single_row mode)
 async function fetchSingleFilePreview(file) {
-    const formData = new FormData()
-    formData.append('file', file)
-    formData.append('page', 1)
-    formData.append('page_size', 5)
-    formData.append('export_mode', 'single_row')
-
-    const response = await fetch(`${API_BASE}/preview`, {
-        method: 'POST',
-        body: formData
+    const response = await postWithFile('preview', file, {
+        page: 1,
+        page_size: 5,
+        export_mode: 'single_row'
     })
 
     if (!response.ok) {
@@ -1,10 +1,14 @@
 """Tests for API endpoints."""
 
+import hashlib
 import json
 
 import pytest
 from httpx import AsyncClient
 
+from backend import main
+from backend.utils.cache import OUTPUT_CACHE, PARSE_CACHE
+
 
 @pytest.mark.asyncio
 async def test_health_check(client: AsyncClient):
@@ -284,7 +288,13 @@ async def test_convert_json_invalid_shows_line_number(client: AsyncClient):
 async def test_convert_excel_invalid_shows_helpful_error(client: AsyncClient):
     """Test that invalid Excel file shows helpful error."""
     invalid_excel = b"not an excel file at all"
-    files = {"file": ("test.xlsx", invalid_excel, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
+    files = {
+        "file": (
+            "test.xlsx",
+            invalid_excel,
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+    }
     data = {"output_format": "json"}
     response = await client.post("/api/convert", files=files, data=data)
 
@@ -372,10 +382,445 @@ async def test_preview_all_tables_json(client: AsyncClient, nested2_json: bytes)
 
 
 @pytest.mark.asyncio
-async def test_preview_all_tables_non_json_fails(client: AsyncClient, simple_csv: bytes):
+async def test_preview_all_tables_non_json_fails(
+    client: AsyncClient, simple_csv: bytes
+):
     """Test preview-all-tables endpoint rejects non-JSON files."""
     files = {"file": ("test.csv", simple_csv, "text/csv")}
     response = await client.post("/api/preview-all-tables", files=files)
 
     assert response.status_code == 400
     assert "JSON" in response.json()["detail"]
+
+
+# ============== UPLOAD SESSION TESTS ==============
+
+
+@pytest.mark.asyncio
+async def test_upload_returns_file_id(client: AsyncClient, simple_csv: bytes):
+    """Test upload endpoint stores the file and returns a handle."""
+    files = {"file": ("test.csv", simple_csv, "text/csv")}
+    response = await client.post("/api/upload", files=files)
+
+    assert response.status_code == 200
+    result = response.json()
+
+    assert len(result["file_id"]) == 64
+    assert result["filename"] == "test.csv"
+    assert result["detected_type"] == "csv"
+    assert result["size"] == len(simple_csv)
+
+
+@pytest.mark.asyncio
+async def test_upload_same_content_under_two_names(
+    client: AsyncClient, simple_csv: bytes
+):
+    """Test a second upload of the same bytes doesn't rename the first."""
+    first = await client.post(
+        "/api/upload", files={"file": ("first.csv", simple_csv, "text/csv")}
+    )
+    second = await client.post(
+        "/api/upload", files={"file": ("second.csv", simple_csv, "text/csv")}
+    )
+
+    assert first.json()["filename"] == "first.csv"
+    assert second.json()["filename"] == "second.csv"
+    for upload, name in ((first, "first.csv"), (second, "second.csv")):
+        data = {"file_id": upload.json()["file_id"], "output_format": "json"}
+        response = await client.post("/api/convert", data=data)
+        assert response.status_code == 200
+        stem = name.removesuffix(".csv")
+        assert f'filename="{stem}.json"' in response.headers["content-disposition"]
+
+
+@pytest.mark.asyncio
+async def test_preview_with_file_id(client: AsyncClient, simple_csv: bytes):
+    """Test paging through a preview using the upload handle."""
+    files = {"file": ("test.csv", simple_csv, "text/csv")}
+    file_id = (await client.post("/api/upload", files=files)).json()["file_id"]
+
+    data = {"file_id": file_id, "page": "2", "page_size": "2"}
+    response = await client.post("/api/preview", data=data)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["detected_type"] == "csv"
+    assert result["current_page"] == 2
+    assert len(result["rows"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_analyze_and_convert_with_file_id(
+    client: AsyncClient, nested2_json: bytes
+):
+    """Test analyze, preview-all-tables and convert accept the upload handle."""
+    files = {"file": ("nested2.json", nested2_json, "application/json")}
+    file_id = (await client.post("/api/upload", files=files)).json()["file_id"]
+
+    response = await client.post("/api/analyze", data={"file_id": file_id})
+    assert response.status_code == 200
+    assert response.json()["estimated_rows"] == 28
+
+    response = await client.post("/api/preview-all-tables", data={"file_id": file_id})
+    assert response.status_code == 200
+    assert "topping" in response.json()["tables"]
+
+    data = {"file_id": file_id, "output_format": "csv"}
+    response = await client.post("/api/convert", data=data)
+    assert response.status_code == 200
+    assert 'filename="nested2.csv"' in response.headers["content-disposition"]
+
+
+@pytest.mark.asyncio
+async def test_requests_hash_content_at_most_once(
+    client: AsyncClient, nested2_json: bytes, monkeypatch
+):
+    """Test uploads are hashed once per request and stored files never."""
+    files = {"file": ("nested2.json", nested2_json, "application/json")}
+    file_id = (await client.post("/api/upload", files=files)).json()["file_id"]
+    PARSE_CACHE.clear()
+    hashed = []
+    sha256 = hashlib.sha256
+
+    def counting_sha256(data):
+        hashed.append(len(data))
+        return sha256(data)
+
+    monkeypatch.setattr(hashlib, "sha256", counting_sha256)
+    response = await client.post("/api/preview-all-tables", files=files)
+    assert response.status_code == 200
+    assert hashed == [len(nested2_json)]
+
+    hashed.clear()
+    response = await client.post("/api/preview-all-tables", data={"file_id": file_id})
+    assert response.status_code == 200
+    assert hashed == []
+
+
+@pytest.mark.asyncio
+async def test_unknown_file_id_returns_404(client: AsyncClient):
+    """Test requests with an unknown handle ask for a new upload."""
+    data = {"file_id": "0" * 64}
+    response = await client.post("/api/preview", data=data)
+
+    assert response.status_code == 404
+    assert "upload" in response.json()["detail"].lower()
+
+
+@pytest.mark.asyncio
+async def test_preview_without_file_fails(client: AsyncClient):
+    """Test requests with neither a file nor a handle are rejected."""
+    response = await client.post("/api/preview", data={"page": "1"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "No file provided"
+
+
+@pytest.mark.asyncio
+async def test_upload_invalid_file_fails(client: AsyncClient):
+    """Test upload endpoint validates the file before storing it."""
+    files = {"file": ("test.txt", b"plain text", "text/plain")}
+    response = await client.post("/api/upload", files=files)
+
+    assert response.status_code == 400
+
+
+# ============== CONVERTED OUTPUT CACHE TESTS ==============
+
+
+@pytest.mark.asyncio
+async def test_convert_returns_etag(client: AsyncClient, simple_csv: bytes):
+    """Test converted files carry an ETag that is stable across requests."""
+    files = {"file": ("test.csv", simple_csv, "text/csv")}
+    data = {"output_format": "json"}
+    first = await client.post("/api/convert", files=files, data=data)
+    second = await client.post("/api/convert", files=files, data=data)
+
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('"') and etag.endswith('"')
+    assert second.headers["etag"] == etag
+    assert second.content == first.content
+
+
+@pytest.mark.asyncio
+async def test_convert_if_none_match_returns_304(
+    client: AsyncClient, simple_csv: bytes
+):
+    """Test conditional requests with a matching ETag get 304 Not Modified."""
+    files = {"file": ("test.csv", simple_csv, "text/csv")}
+    data = {"output_format": "xlsx"}
+    first = await client.post("/api/convert", files=files, data=data)
+    etag = first.headers["etag"]
+
+    headers = {"If-None-Match": f'"other", {etag}'}
+    response = await client.post(
+        "/api/convert", files=files, data=data, headers=headers
+    )
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+
+@pytest.mark.asyncio
+async def test_convert_if_none_match_star_on_failure_returns_400(
+    client: AsyncClient,
+):
+    """Test a conversion that fails is reported even if any ETag matches."""
+    files = {"file": ("test.json", b'{"a": [1, 2', "application/json")}
+    headers = {"If-None-Match": "*"}
+    response = await client.post(
+        "/api/convert", files=files, data={"output_format": "csv"}, headers=headers
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_convert_xlsx_is_reproducible(client: AsyncClient, simple_csv: bytes):
+    """Test converting again gives the same bytes, as the strong ETag claims."""
+    files = {"file": ("test.csv", simple_csv, "text/csv")}
+    data = {"output_format": "xlsx"}
+    first = await client.post("/api/convert", files=files, data=data)
+    OUTPUT_CACHE.clear()
+    second = await client.post("/api/convert", files=files, data=data)
+
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.content == first.content
+
+
+@pytest.mark.asyncio
+async def test_convert_if_none_match_mismatch_returns_file(
+    client: AsyncClient, simple_csv: bytes
+):
+    """Test a stale ETag gets the full converted file."""
+    files = {"file": ("test.csv", simple_csv, "text/csv")}
+    data = {"output_format": "json"}
+    headers = {"If-None-Match": '"stale"'}
+    response = await client.post(
+        "/api/convert", files=files, data=data, headers=headers
+    )
+
+    assert response.status_code == 200
+    assert len(json.loads(response.content)) == 3
+
+
+@pytest.mark.asyncio
+async def test_convert_etag_changes_with_output_version(
+    client: AsyncClient, simple_csv: bytes, monkeypatch
+):
+    """Test a new converter output version invalidates earlier ETags."""
+    files = {"file": ("test.csv", simple_csv, "text/csv")}
+    data = {"output_format": "json"}
+    first = await client.post("/api/convert", files=files, data=data)
+    monkeypatch.setattr(main, "OUTPUT_VERSION", "next")
+    headers = {"If-None-Match": first.headers["etag"]}
+    second = await client.post("/api/convert", files=files, data=data, headers=headers)
+
+    assert second.status_code == 200
+    assert second.headers["etag"] != first.headers["etag"]
+
+
+@pytest.mark.asyncio
+async def test_convert_etag_differs_per_output_format(
+    client: AsyncClient, simple_json: bytes
+):
+    """Test each output format is cached separately."""
+    files = {"file": ("test.json", simple_json, "application/json")}
+    csv_response = await client.post(
+        "/api/convert", files=files, data={"output_format": "csv"}
+    )
+    xlsx_response = await client.post(
+        "/api/convert", files=files, data={"output_format": "xlsx"}
+    )
+
+    assert csv_response.headers["etag"] != xlsx_response.headers["etag"]
+    assert "text/csv" in csv_response.headers["content-type"]
+    assert "spreadsheetml" in xlsx_response.headers["content-type"]
+
+
+@pytest.mark.asyncio
+async def test_convert_streams_csv_and_caches_it(client: AsyncClient):
+    """Test CSV output is streamed on a miss and served from cache after."""
+    records = [{"id": i, "user": {"name": f"user{i}"}} for i in range(5_000)]
+    content = json.dumps(records).encode("utf-8")
+    files = {"file": ("big.json", content, "application/json")}
+    data = {"output_format": "csv"}
+
+    streamed = await client.post("/api/convert", files=files, data=data)
+    cached = await client.post("/api/convert", files=files, data=data)
+
+    assert streamed.status_code == 200
+    assert "content-length" not in streamed.headers
+    assert cached.headers["content-length"] == str(len(streamed.content))
+    assert cached.content == streamed.content
+    assert cached.headers["etag"] == streamed.headers["etag"]
+
+    lines = streamed.content.decode("utf-8").splitlines()
+    assert lines[0] == "id,user.name"
+    assert len(lines) == 5_001
+    assert lines[-1] == "4999,user4999"
+
+
+@pytest.mark.asyncio
+async def test_convert_streams_large_csv_without_caching_it(
+    client: AsyncClient, monkeypatch
+):
+    """Test CSV output over the per-entry cap is streamed again, not cached."""
+    monkeypatch.setattr(main, "OUTPUT_CACHE_MAX_ENTRY_BYTES", 1024)
+    records = [{"id": i, "name": f"user{i}"} for i in range(500)]
+    files = {"file": ("large.json", json.dumps(records), "application/json")}
+    data = {"output_format": "csv"}
+
+    first = await client.post("/api/convert", files=files, data=data)
+    second = await client.post("/api/convert", files=files, data=data)
+
+    assert len(first.content) > 1024
+    assert "content-length" not in second.headers
+    assert second.content == first.content
+
+
+def test_stream_to_cache_drops_chunks_over_the_cap(monkeypatch):
+    """Test chunks stop being kept once the output passes the per-entry cap."""
+    monkeypatch.setattr(main, "OUTPUT_CACHE_MAX_ENTRY_BYTES", 10)
+    key = ("large-stream", "csv", None, None)
+    stream = main._stream_to_cache(key, iter([b"a" * 6, b"b" * 6, b"c" * 6]))
+
+    assert next(stream) == b"a" * 6
+    assert stream.gi_frame.f_locals["parts"] == [b"a" * 6]
+    assert next(stream) == b"b" * 6
+    assert stream.gi_frame.f_locals["parts"] is None
+    assert list(stream) == [b"c" * 6]
+    assert OUTPUT_CACHE.get(key) is None
+
+
+@pytest.mark.asyncio
+async def test_convert_streams_json(client: AsyncClient):
+    """Test JSON output is streamed as a pretty-printed array."""
+    content = b"id,city\n1,Z\xc3\xbcrich\n2,\n"
+    files = {"file": ("test.csv", content, "text/csv")}
+    response = await client.post(
+        "/api/convert", files=files, data={"output_format": "json"}
+    )
+
+    assert response.status_code == 200
+    assert "content-length" not in response.headers
+    assert response.text == (
+        '[\n  {\n    "id": 1,\n    "city": "Zürich"\n  },\n'
+        '  {\n    "id": 2,\n    "city": null\n  }\n]'
+    )
+
+
+@pytest.mark.asyncio
+async def test_convert_json_styles(client: AsyncClient):
+    """Test the json_style field selects the layout of JSON output."""
+    files = {"file": ("test.csv", b"id,city\n1,Z\xc3\xbcrich\n2,\n", "text/csv")}
+
+    split = await client.post(
+        "/api/convert",
+        files=files,
+        data={"output_format": "json", "json_style": "split"},
+    )
+    ndjson = await client.post(
+        "/api/convert",
+        files=files,
+        data={"output_format": "json", "json_style": "ndjson"},
+    )
+
+    assert split.status_code == 200
+    assert split.text == '{"columns":["id","city"],"data":[[1,"Zürich"],[2,null]]}'
+    assert split.headers["etag"] != ndjson.headers["etag"]
+    assert ndjson.status_code == 200
+    assert "application/x-ndjson" in ndjson.headers["content-type"]
+    assert "test.ndjson" in ndjson.headers["content-disposition"]
+    assert ndjson.text == '{"id":1,"city":"Zürich"}\n{"id":2,"city":null}\n'
+
+
+@pytest.mark.asyncio
+async def test_convert_invalid_json_style(client: AsyncClient, simple_csv: bytes):
+    """Test an unknown json_style is rejected."""
+    files = {"file": ("test.csv", simple_csv, "text/csv")}
+    response = await client.post(
+        "/api/convert",
+        files=files,
+        data={"output_format": "json", "json_style": "yaml"},
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_convert_streamed_csv_errors_return_400(client: AsyncClient):
+    """Test conversion errors are reported before a streamed response starts."""
+    files = {"file": ("test.xlsx", b"PK\x03\x04 not a workbook", "application/zip")}
+    response = await client.post(
+        "/api/convert", files=files, data={"output_format": "csv"}
+    )
+
+    assert response.status_code == 400
+
+
+# ============== INSPECT ENDPOINT TESTS ==============
+
+
+@pytest.mark.asyncio
+async def test_inspect_complex_json(client: AsyncClient, nested3_json: bytes):
+    """Test inspect returns analysis and all previews for complex JSON."""
+    files = {"file": ("nested3.json", nested3_json, "application/json")}
+    data = {"page_size": "10", "include_tables": "true", "include_single_row": "true"}
+    response = await client.post("/api/inspect", files=files, data=data)
+
+    assert response.status_code == 200
+    result = response.json()
+
+    assert result["detected_type"] == "json"
+    assert result["analysis"]["arrays_found"]
+    assert result["preview"]["detected_type"] == "json"
+    assert result["preview"]["current_page"] == 1
+    assert "main" in result["tables"]
+    assert result["single_row_preview"]["total_rows"] == 3
+
+
+@pytest.mark.asyncio
+async def test_inspect_csv(client: AsyncClient, simple_csv: bytes):
+    """Test inspect returns the first preview page for CSV files."""
+    files = {"file": ("test.csv", simple_csv, "text/csv")}
+    response = await client.post("/api/inspect", files=files, data={"page_size": "2"})
+
+    assert response.status_code == 200
+    result = response.json()
+
+    assert result["detected_type"] == "csv"
+    assert result["analysis"]["is_complex"] is False
+    assert result["preview"]["columns"] == ["name", "age", "city"]
+    assert len(result["preview"]["rows"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_inspect_invalid_json_fails(client: AsyncClient):
+    """Test inspect reports JSON syntax errors with their position."""
+    invalid_json = b'[\n  {"name": "Alice"},\n  {"name": }\n]'
+    files = {"file": ("test.json", invalid_json, "application/json")}
+    response = await client.post("/api/inspect", files=files)
+
+    assert response.status_code == 400
+    assert "line 3" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_convert_large_upload(client: AsyncClient):
+    """Test uploads large enough to be memory-mapped convert correctly."""
+    rows = "".join(f"{i},name{i},{i * 2}\n" for i in range(100_000))
+    content = ("id,name,value\n" + rows).encode("utf-8")
+    assert len(content) > 1024 * 1024
+
+    files = {"file": ("big.csv", content, "text/csv")}
+    response = await client.post(
+        "/api/convert", files=files, data={"output_format": "json"}
+    )
+
+    assert response.status_code == 200
+    result = json.loads(response.content)
+    assert len(result) == 100_000
+    assert result[-1] == {"id": 99999, "name": "name99999", "value": 199998}
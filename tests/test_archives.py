@@ -0,0 +1,48 @@
+"""Tests for reproducible xlsx workbooks and ZIP archives."""
+
+import io
+import zipfile
+
+import pandas as pd
+
+from backend.converters.archives import ZIP_EPOCH, write_xlsx, write_zip
+
+
+class TestWriteXlsx:
+    """Tests for write_xlsx."""
+
+    def test_sheets_round_trip(self):
+        """Test each DataFrame is written to its own sheet, in order."""
+        people = pd.DataFrame({"name": ["Ann", "Bob"], "age": [30, 40]})
+        cities = pd.DataFrame({"city": ["Oslo"]})
+
+        content = write_xlsx([("people", people), ("cities", cities)])
+
+        sheets = pd.read_excel(io.BytesIO(content), sheet_name=None)
+        assert list(sheets) == ["people", "cities"]
+        pd.testing.assert_frame_equal(sheets["people"], people)
+        pd.testing.assert_frame_equal(sheets["cities"], cities)
+
+    def test_timestamps_are_pinned(self):
+        """Test entry times and document dates don't depend on the clock."""
+        content = write_xlsx([("Data", pd.DataFrame({"a": [1]}))])
+
+        with zipfile.ZipFile(io.BytesIO(content)) as workbook:
+            assert {info.date_time for info in workbook.infolist()} == {ZIP_EPOCH}
+            core = workbook.read("docProps/core.xml")
+        assert core.count(b"1980-01-01T00:00:00Z") == 2
+
+
+class TestWriteZip:
+    """Tests for write_zip."""
+
+    def test_files_round_trip(self):
+        """Test the archive holds the files, in order, with pinned times."""
+        files = {"b.csv": b"x\n1\n", "a.csv": b"y\n2\n"}
+
+        content = write_zip(files)
+
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            assert archive.namelist() == ["b.csv", "a.csv"]
+            assert {name: archive.read(name) for name in files} == files
+            assert {info.date_time for info in archive.infolist()} == {ZIP_EPOCH}
@@ -0,0 +1,117 @@
+"""Tests for the in-memory LRU cache."""
+
+import contextvars
+import hashlib
+import sys
+
+import pandas as pd
+
+from backend.converters.json_summary import summarize
+from backend.utils.cache import LRUCache, bind_content, content_hash, estimate_size
+
+
+class TestLRUCache:
+    """Tests for LRUCache."""
+
+    def test_get_or_build_counts_hits_and_misses(self):
+        """Test values are built once and then served from the cache."""
+        cache = LRUCache(max_bytes=1024, sizeof=len)
+        calls = []
+
+        def build():
+            calls.append(1)
+            return b"value"
+
+        assert cache.get_or_build("key", build) == b"value"
+        assert cache.get_or_build("key", build) == b"value"
+
+        assert len(calls) == 1
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+        assert stats["size_bytes"] == 5
+
+    def test_get_or_build_caches_none(self):
+        """Test a None result is cached rather than rebuilt."""
+        cache = LRUCache(max_bytes=1024, sizeof=lambda value: 0)
+        calls = []
+
+        def build():
+            calls.append(1)
+
+        assert cache.get_or_build("key", build) is None
+        assert cache.get_or_build("key", build) is None
+
+        assert len(calls) == 1
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used entry is evicted over budget."""
+        cache = LRUCache(max_bytes=10, sizeof=len)
+        cache.put("a", b"aaaa")
+        cache.put("b", b"bbbb")
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", b"cccc")
+
+        assert cache.get("a") == b"aaaa"
+        assert cache.get("b") is None
+        assert cache.get("c") == b"cccc"
+
+    def test_oversized_values_are_not_stored(self):
+        """Test values larger than the whole budget are skipped."""
+        cache = LRUCache(max_bytes=4, sizeof=len)
+        cache.put("big", b"too large")
+
+        assert cache.get("big") is None
+        assert cache.stats()["size_bytes"] == 0
+
+    def test_estimate_size_of_dataframes(self):
+        """Test size estimation for DataFrames and dicts of DataFrames."""
+        df = pd.DataFrame({"a": range(100)})
+        size = estimate_size(df)
+
+        assert size >= 800
+        assert estimate_size({"main": df, "other": df}) == 2 * size
+
+    def test_estimate_size_of_dataclasses(self):
+        """Test dataclass instances count the values of their fields."""
+        summary = summarize([{f"column_{i}": [i] for i in range(50)}])
+
+        assert estimate_size(summary) > 50 * sys.getsizeof("column_0")
+
+
+class TestContentHash:
+    """Tests for content_hash."""
+
+    def test_bound_digest_is_reused(self):
+        """Test the known digest of the request's content is returned."""
+        content = b"a,b\n1,2\n"
+
+        def run():
+            bind_content(content, "known")
+            return content_hash(content), content_hash(bytes(bytearray(content)))
+
+        bound, other = contextvars.copy_context().run(run)
+
+        assert bound == "known"
+        assert other == hashlib.sha256(content).hexdigest()
+
+    def test_bound_content_is_hashed_once(self, monkeypatch):
+        """Test content bound without a digest is hashed on first use only."""
+        content = b"a,b\n1,2\n"
+        calls = []
+        sha256 = hashlib.sha256
+
+        def counting_sha256(data):
+            calls.append(data)
+            return sha256(data)
+
+        def run():
+            bind_content(content)
+            return [content_hash(content) for _ in range(3)]
+
+        monkeypatch.setattr(hashlib, "sha256", counting_sha256)
+        digests = contextvars.copy_context().run(run)
+
+        assert digests == [sha256(content).hexdigest()] * 3
+        assert len(calls) == 1
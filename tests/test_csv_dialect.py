@@ -0,0 +1,91 @@
+"""Tests for CSV dialect sniffing."""
+
+import pytest
+
+from backend.utils.csv_dialect import CsvDialect, sniff_dialect
+
+
+class TestSniffDialect:
+    """Tests for sniff_dialect."""
+
+    @pytest.mark.parametrize("delimiter", [",", ";", "\t", "|"])
+    def test_detects_delimiter(self, delimiter):
+        """Test each candidate delimiter is detected."""
+        text = delimiter.join(["a", "b", "c"]) + "\n" + delimiter.join("123") + "\n"
+
+        assert sniff_dialect(text) == CsvDialect(delimiter, fields=3, consistent=True)
+
+    def test_quoted_delimiters_are_ignored(self):
+        """Test commas inside a quoted header don't outvote the delimiter."""
+        text = 'name;"notes, comma, separated"\nAlice;"a, b"\nBob;c\n'
+
+        assert sniff_dialect(text).delimiter == ";"
+
+    def test_field_count_consistency_wins(self):
+        """Test a delimiter that splits records evenly beats a frequent one."""
+        text = "a;b\n1,5;2\n3;4,25,5\n"
+
+        assert sniff_dialect(text).delimiter == ";"
+
+    def test_detects_single_quotes(self):
+        """Test single quotes are detected when they quote delimiters."""
+        text = "name,place\n'Smith, J',Leeds\n'Doe, A',York\n"
+
+        assert sniff_dialect(text).quotechar == "'"
+
+    def test_apostrophes_keep_double_quotes(self):
+        """Test apostrophes inside fields don't make them the quote character."""
+        text = "name,place\nO'Brien,Cork\nD'Arcy,Leeds\n"
+
+        assert sniff_dialect(text).quotechar == '"'
+
+    def test_single_column_keeps_double_quotes(self):
+        """Test quoted commas in a one-column file aren't split by '."""
+        text = '"Last, First"\n"Doe, John"\n'
+
+        assert sniff_dialect(text) == CsvDialect(fields=1, consistent=True)
+
+    def test_ragged_rows_keep_double_quotes(self):
+        """Test ' doesn't split a quoted multiline field to even out rows."""
+        text = 'a,b\n1,"x\ny,z"\n2,3,4\n'
+
+        dialect = sniff_dialect(text)
+
+        assert (dialect.delimiter, dialect.quotechar) == (",", '"')
+        assert not dialect.consistent
+
+    def test_less_consistent_delimiter_keeps_default(self):
+        """Test a delimiter splitting fewer rows evenly than none is ignored."""
+        text = "a;b\n1;2;3\n4\n"
+
+        assert sniff_dialect(text) == CsvDialect(fields=1, consistent=True)
+
+    @pytest.mark.parametrize("terminator", ["\n", "\r\n", "\r"])
+    def test_detects_line_terminator(self, terminator):
+        """Test the line break of the first record is detected."""
+        text = terminator.join(['a,"b\nc"', "1,2", "3,4"]) + terminator
+
+        dialect = sniff_dialect(text)
+
+        assert dialect.lineterminator == terminator
+        assert dialect.consistent
+
+    def test_not_csv(self):
+        """Test text without a delimiter or with one record isn't consistent."""
+        assert sniff_dialect("just some text\nmore text\n") is None
+        assert sniff_dialect("") is None
+        assert not sniff_dialect("a,b\n").consistent
+        assert not sniff_dialect("a,b\n1,2,3\n4\n").consistent
+
+    def test_truncated_text_ignores_last_record(self):
+        """Test a record cut off at the end of the sample isn't counted."""
+        text = "a,b,c\n1,2,3\n4,5"
+
+        assert not sniff_dialect(text).consistent
+        assert sniff_dialect(text, truncated=True).consistent
+
+    def test_escaped_quotes_keep_double_quotes(self):
+        """Test doubled quotes inside a quoted field keep the quote character."""
+        text = 'a,b\n"say ""hi""",2\n"x",3\n'
+
+        assert sniff_dialect(text).quotechar == '"'
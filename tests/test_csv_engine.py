@@ -0,0 +1,70 @@
+"""Tests for the CSV parse engines."""
+
+import pandas as pd
+import pytest
+
+from backend.converters.csv_engine import _read_text_columns, read_csv
+from backend.utils.csv_dialect import CsvDialect
+
+_CSVS = [
+    b"a,b\n1,2\n3,4\n",
+    b'name,a,,a\r\n"x, y",NA,"multi\r\nline",""\r\n007,nan,1e400, \r\n',
+    b'\xef\xbb\xbfa;b\n"say ""hi""";true\n\nNone;\xc3\xa9\n',
+    b"a,b\n  \n1,2\n",
+    b"a,b\r1,2\r3,4\r",
+    b"a,b\n",
+]
+
+
+class TestReadCsv:
+    """Tests for read_csv."""
+
+    @pytest.mark.parametrize("content", _CSVS)
+    def test_pyarrow_matches_c_parser(self, content):
+        """Test text columns read with Arrow equal the C parser's."""
+        pytest.importorskip("pyarrow")
+        dialect = CsvDialect(";" if b";" in content else ",")
+        encoding = "utf-8-sig" if content.startswith(b"\xef\xbb\xbf") else "utf-8"
+
+        expected = read_csv(content, dialect, str, encoding, engine="c")
+        result = read_csv(content, dialect, str, encoding, engine="pyarrow")
+
+        pd.testing.assert_frame_equal(result, expected)
+
+    @pytest.mark.parametrize("engine", ["c", "pyarrow"])
+    def test_errors_come_from_c_parser(self, engine):
+        """Test rows Arrow rejects raise the C parser's error."""
+        content = b"a,b\n1,2\n3,4,5\n"
+
+        with pytest.raises(pd.errors.ParserError, match="Expected 2 fields in line 3"):
+            read_csv(content, CsvDialect(), str, "utf-8", engine=engine)
+
+    @pytest.mark.parametrize("engine", ["c", "pyarrow"])
+    def test_missing_cells_are_nan(self, engine):
+        """Test empty and NA cells are NaN, not the text "None" or "nan"."""
+        df = read_csv(b"a,b\n1,\nNA,2\n", CsvDialect(), str, "utf-8", engine=engine)
+
+        assert df["a"].isna().tolist() == [False, True]
+        assert df["b"].isna().tolist() == [True, False]
+        assert df.isin(["None", "nan"]).sum().sum() == 0
+
+    @pytest.mark.parametrize("engine", ["c", "pyarrow"])
+    def test_short_rows_are_padded(self, engine):
+        """Test rows with missing fields are read as the C parser reads them."""
+        df = read_csv(b"a,b\n1\n2,3\n", CsvDialect(), str, "utf-8", engine=engine)
+
+        assert df["a"].tolist() == ["1", "2"]
+        assert pd.isna(df["b"][0])
+        assert df["b"][1] == "3"
+
+    @pytest.mark.parametrize(
+        ("content", "used"),
+        [(_CSVS[0], True), (_CSVS[1], True), (_CSVS[3], False), (_CSVS[4], False)],
+    )
+    def test_lines_split_differently_use_c_parser(self, content, used):
+        """Test Arrow is skipped for blank lines and lone carriage returns."""
+        pytest.importorskip("pyarrow")
+
+        result = _read_text_columns(content, CsvDialect(), "utf-8")
+
+        assert (result is not None) == used
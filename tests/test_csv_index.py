@@ -0,0 +1,126 @@
+"""Tests for the CSV row index."""
+
+import pandas as pd
+import pytest
+
+from backend.converters import csv_index
+from backend.converters.csv_engine import read_csv
+from backend.converters.csv_index import build_row_index, read_rows
+from backend.converters.csv_to_json import CsvToJsonConverter
+from backend.utils.csv_dialect import CsvDialect
+
+_CONTENT = (
+    b'id,note\r\n0,"a, b"\r\n\r\n1,"multi\r\nline"\r\n2,\r\n'
+    b'3,"say ""hi"""\r\n4,NA\r\n\r\n5,x\r\n6\r\n7,last'
+)
+
+
+@pytest.fixture(autouse=True)
+def small_stride(monkeypatch):
+    """Index every third row, so small files have several offsets."""
+    monkeypatch.setattr(csv_index, "ROW_INDEX_STRIDE", 3)
+
+
+class TestBuildRowIndex:
+    """Tests for build_row_index."""
+
+    def test_offsets_of_every_stride_row(self):
+        """Test offsets skip empty lines and line breaks inside quotes."""
+        index = build_row_index(_CONTENT, CsvDialect(), "utf-8")
+
+        assert index.columns == ("id", "note")
+        assert index.total_rows == 8
+        assert [_CONTENT[offset : offset + 2] for offset in index.offsets] == [
+            b"0,",
+            b"3,",
+            b"6\r",
+        ]
+
+    @pytest.mark.parametrize("block_bytes", [1, 2, 5, 7])
+    def test_blocks_give_the_same_index(self, monkeypatch, block_bytes):
+        """Test the scan carries its state across block boundaries."""
+        expected = build_row_index(_CONTENT, CsvDialect(), "utf-8")
+        monkeypatch.setattr(csv_index, "_SCAN_BLOCK_BYTES", block_bytes)
+
+        assert build_row_index(_CONTENT, CsvDialect(), "utf-8") == expected
+
+    def test_blocks_without_quotes_inside_a_quoted_field(self, monkeypatch):
+        """Test line breaks and delimiters of a quote-free block in quotes."""
+        content = b'a,b\n1,"x\nyy,yy\nzz,zz\nw"\n2,3\n4,5\n'
+        expected = build_row_index(content, CsvDialect(), "utf-8")
+        monkeypatch.setattr(csv_index, "_SCAN_BLOCK_BYTES", 4)
+
+        assert expected.total_rows == 3
+        assert build_row_index(content, CsvDialect(), "utf-8") == expected
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            b'a,b\n1,5" screen\n2,3\n',
+            b'a,b\n1,"x"y\n2,3\n',
+            b"a,b\n1,2\n3,4,5\n",
+            b'a,b\n1,"open\n2,3\n',
+            b"a,b\n  \n1,2\n",
+            b"a,b\r1,2\r",
+            b"a,b\n1,2\n\xff,3\n",
+            b"a,b\n",
+        ],
+    )
+    def test_content_the_scan_cant_follow(self, content):
+        """Test stray quotes, wide rows, bad lines or bytes give no index."""
+        assert build_row_index(content, CsvDialect(), "utf-8") is None
+
+
+class TestReadRows:
+    """Tests for read_rows."""
+
+    def test_every_range_matches_full_parse(self):
+        """Test each page parsed from an offset equals the full parse's rows."""
+        dialect = CsvDialect()
+        index = build_row_index(_CONTENT, dialect, "utf-8")
+        full = read_csv(_CONTENT, dialect, str, "utf-8", engine="c")
+
+        for start in range(index.total_rows):
+            for stop in range(start + 1, index.total_rows + 1):
+                rows = read_rows(_CONTENT, index, dialect, "utf-8", start, stop)
+                pd.testing.assert_frame_equal(
+                    rows, full.iloc[start:stop].reset_index(drop=True)
+                )
+
+
+class TestIndexedPreview:
+    """Tests for previews served from the row index."""
+
+    def test_first_page_parses_only_its_rows(self, monkeypatch):
+        """Test the first page reads page_size rows and counts the rest."""
+        content = b"n,sq\n" + b"".join(b"%d,%d\n" % (i, i * i) for i in range(50))
+        converter = CsvToJsonConverter()
+        parse = pd.read_csv
+        nrows = []
+
+        def counting_parse(*args, **kwargs):
+            nrows.append(kwargs.get("nrows"))
+            return parse(*args, **kwargs)
+
+        monkeypatch.setattr(pd, "read_csv", counting_parse)
+        result = converter.preview(content, page=1, page_size=5)
+
+        assert result["rows"] == [[str(i), str(i * i)] for i in range(5)]
+        assert result["total_rows"] == 50
+        assert None not in nrows
+        assert max(nrows) == 5
+
+    def test_late_page_parses_only_its_rows(self, monkeypatch):
+        """Test an indexed preview page doesn't parse the whole file."""
+        content = b"n,sq\n" + b"".join(b"%d,%d\n" % (i, i * i) for i in range(50))
+        converter = CsvToJsonConverter()
+
+        def full_parse(*args, **kwargs):
+            raise AssertionError("parsed the whole file")
+
+        monkeypatch.setattr(converter, "_load_dataframe", full_parse)
+        result = converter.preview(content, page=9, page_size=5)
+
+        assert result["rows"] == [[str(i), str(i * i)] for i in range(40, 45)]
+        assert result["total_rows"] == 50
+        assert result["total_pages"] == 10
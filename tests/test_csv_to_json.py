@@ -1,10 +1,14 @@
 """Tests for CSV to JSON converter."""
 
+import hashlib
 import json
 
 import pytest
 
+from backend.converters import csv_to_json
 from backend.converters.csv_to_json import CsvToJsonConverter
+from backend.utils.cache import PARSE_CACHE
+from backend.utils.csv_dialect import sniff_dialect
 
 
 class TestCsvToJsonConverter:
@@ -45,6 +49,34 @@ class TestCsvToJsonConverter:
         assert result["total_pages"] == 2
         assert result["page_size"] == 2
 
+    def test_preview_pages_reuse_parse_cache(self, simple_csv: bytes):
+        """Test later preview pages are served from the parse cache."""
+        PARSE_CACHE.clear()
+        first = self.converter.preview(simple_csv, page=1, page_size=2)
+        misses = PARSE_CACHE.stats()["misses"]
+        second = self.converter.preview(simple_csv, page=2, page_size=2)
+
+        # The row index and the dialect sniffed to build it
+        assert misses == 2
+        assert PARSE_CACHE.stats()["misses"] == misses
+        assert first["rows"][0][0] == "Alice"
+        assert second["rows"] == [["Charlie", "35", "Chicago"]]
+
+    def test_preview_hashes_content_once(self, simple_csv: bytes, monkeypatch):
+        """Test the dialect and row index lookups share one digest."""
+        self.converter.preview(simple_csv)
+        hashed = []
+        sha256 = hashlib.sha256
+
+        def counting_sha256(data):
+            hashed.append(data)
+            return sha256(data)
+
+        monkeypatch.setattr(hashlib, "sha256", counting_sha256)
+        self.converter.preview(simple_csv, page=2, page_size=2)
+
+        assert len(hashed) == 1
+
     def test_detect_semicolon_delimiter(self):
         """Test auto-detection of semicolon delimiter."""
         semicolon_csv = b"name;age;city\nAlice;30;New York"
@@ -62,6 +94,51 @@ class TestCsvToJsonConverter:
 
         assert data[0]["name"] == "Alice"
 
+    def test_quoted_commas_in_semicolon_header(self):
+        """Test quoted commas in the header don't decide the delimiter."""
+        content = b'name;"city, country"\nAlice;"Paris, France"\n'
+        data = json.loads(self.converter.convert(content))
+
+        assert data == [{"name": "Alice", "city, country": "Paris, France"}]
+
+    def test_single_quoted_fields(self):
+        """Test fields quoted with single quotes are parsed as quoted."""
+        content = b"name,city\n'Doe, Jane',Leeds\n'Roe, Ann',York\n"
+        data = json.loads(self.converter.convert(content))
+
+        assert data[0] == {"name": "Doe, Jane", "city": "Leeds"}
+
+    def test_single_column_quoted_commas(self):
+        """Test a one-column file of quoted commas keeps one column."""
+        content = b'"Last, First"\n"Doe, John"\n'
+
+        result = self.converter.preview(content)
+
+        assert result["columns"] == ["Last, First"]
+        assert result["rows"] == [["Doe, John"]]
+
+    def test_ragged_multiline_field_raises(self):
+        """Test a ragged file with a quoted multiline field isn't re-split."""
+        content = b'a,b\n1,"x\ny,z"\n2,3,4\n'
+
+        with pytest.raises(ValueError, match="Expected 2 fields"):
+            self.converter.convert(content)
+
+    def test_dialect_is_sniffed_once_per_content(self, simple_csv, monkeypatch):
+        """Test every parse of the same content shares one sniffed dialect."""
+        calls = []
+
+        def counting_sniff(text, truncated=False):
+            calls.append(text)
+            return sniff_dialect(text, truncated)
+
+        monkeypatch.setattr(csv_to_json, "sniff_dialect", counting_sniff)
+        PARSE_CACHE.clear()
+        self.converter.convert(simple_csv)
+        self.converter.preview(simple_csv)
+
+        assert len(calls) == 1
+
     def test_convert_empty_csv_raises(self):
         """Test that empty CSV raises ValueError."""
         empty_csv = b""
@@ -77,9 +154,36 @@ class TestCsvToJsonConverter:
         assert data[0]["city"] is None
         assert data[1]["age"] is None
 
+    def test_latin1_csv(self):
+        """Test CSV that isn't UTF-8 is read as latin-1."""
+        content = "name;city\nJosé;Málaga\n".encode("latin-1")
+        data = json.loads(self.converter.convert(content))
+
+        assert data == [{"name": "José", "city": "Málaga"}]
+
+    def test_non_utf8_byte_after_sample(self):
+        """Test a late non-UTF-8 byte makes the whole file read as latin-1."""
+        rows = "".join(f"row{i},café\n" for i in range(8000)).encode()
+        content = b"name,place\n" + rows + "last,Málaga\n".encode("latin-1")
+        assert len(content) > 64 * 1024
+        data = json.loads(self.converter.convert(content))
+
+        assert data[0]["place"] == "cafÃ©"
+        assert data[-1] == {"name": "last", "place": "Málaga"}
+
+    @pytest.mark.parametrize("encoding", ["utf-8-sig", "utf-16"])
+    def test_byte_order_mark(self, encoding):
+        """Test the byte order mark decides the encoding and isn't a header."""
+        content = "name,city\nJosé,Málaga\n".encode(encoding)
+        data = json.loads(self.converter.convert(content))
+
+        assert data == [{"name": "José", "city": "Málaga"}]
+
     def test_preview_preserves_leading_zeros(self):
         """Test that preview preserves leading zeros (e.g., '007' stays '007')."""
-        csv_with_zeros = b"code,name\n007,James Bond\n001,Agent One\n099,Agent Ninety-Nine"
+        csv_with_zeros = (
+            b"code,name\n007,James Bond\n001,Agent One\n099,Agent Ninety-Nine"
+        )
         result = self.converter.preview(csv_with_zeros, page=1, page_size=10)
 
         # The preview should preserve "007" as a string, not convert to 7
@@ -0,0 +1,102 @@
+"""Tests for file type detection."""
+
+import pytest
+
+from backend.utils.file_detection import decode_sample, detect_file_type
+
+
+class TestDetectFileType:
+    """Tests for detect_file_type."""
+
+    def test_detects_json_array(self, simple_json: bytes):
+        """Test JSON arrays are detected by content."""
+        assert detect_file_type(simple_json, "data.txt") == "json"
+
+    def test_detects_json_object(self, nested2_json: bytes):
+        """Test JSON objects are detected by content."""
+        assert detect_file_type(nested2_json, "data.txt") == "json"
+
+    def test_detects_empty_json_containers(self):
+        """Test empty arrays and objects are detected as JSON."""
+        assert detect_file_type(b"[]", "data.txt") == "json"
+        assert detect_file_type(b"  {\n}\n", "data.txt") == "json"
+
+    def test_malformed_json_is_still_json(self):
+        """Test syntax errors are left for the converter to report."""
+        content = b'[\n  {"name": "Alice"},\n  {"name": }\n]'
+        assert detect_file_type(content, "data.txt") == "json"
+
+    def test_bracketed_csv_header_is_not_json(self):
+        """Test CSV whose first field starts with a bracket is not JSON."""
+        content = b"[id],name\n1,Alice\n2,Bob\n"
+        assert detect_file_type(content, "data.txt") == "csv"
+
+    def test_detects_csv(self, simple_csv: bytes):
+        """Test CSV is detected by content."""
+        assert detect_file_type(simple_csv, "data.txt") == "csv"
+
+    def test_detects_xlsx_by_magic_bytes(self, simple_xlsx: bytes):
+        """Test XLSX is detected by its ZIP signature."""
+        assert detect_file_type(simple_xlsx, "data.bin") == "xlsx"
+
+    def test_detects_xls_by_magic_bytes(self):
+        """Test XLS is detected by its OLE signature."""
+        assert detect_file_type(b"\xd0\xcf\x11\xe0" + b"\x00" * 60, "x.bin") == "xls"
+
+    def test_falls_back_to_extension(self):
+        """Test the extension is used when content is inconclusive."""
+        assert detect_file_type(b"hello", "data.csv") == "csv"
+        assert detect_file_type(b"hello", "data.txt") is None
+
+    def test_csv_with_quoted_delimiters(self):
+        """Test delimiters inside quoted fields don't break CSV detection."""
+        content = b'name,notes\nAlice,"likes tea, coffee"\nBob,"line one\nline two"\n'
+        assert detect_file_type(content, "data.txt") == "csv"
+
+    def test_csv_with_utf8_bom(self):
+        """Test a UTF-8 byte order mark doesn't prevent detection."""
+        content = b"\xef\xbb\xbfname;age\nAlice;30\nBob;25\n"
+        assert detect_file_type(content, "data.txt") == "csv"
+
+    def test_large_csv_detected_from_sample(self):
+        """Test detection of files larger than the sniffing window."""
+        rows = "".join(f"row{i},{i},café\n" for i in range(20000))
+        content = ("name,value,place\n" + rows).encode("utf-8")
+        assert len(content) > 64 * 1024
+        assert detect_file_type(content, "data.txt") == "csv"
+
+    def test_large_json_detected_from_sample(self):
+        """Test JSON detection only needs the head and tail of large files."""
+        items = b",".join(b'{"id": %d, "name": "caf\xc3\xa9"}' % i for i in range(5000))
+        content = b"[%s]\n" % items
+        assert len(content) > 64 * 1024
+        assert detect_file_type(content, "data.txt") == "json"
+
+
+class TestDecodeSample:
+    """Tests for decode_sample."""
+
+    def test_utf8(self):
+        """Test UTF-8 content is decoded as UTF-8."""
+        assert decode_sample("name\ncafé\n".encode()) == ("name\ncafé\n", "utf-8")
+
+    def test_not_utf8_is_latin1(self):
+        """Test content that isn't UTF-8 falls back to latin-1."""
+        content = "name\ncafé\n".encode("latin-1")
+        assert decode_sample(content) == ("name\ncafé\n", "latin-1")
+
+    @pytest.mark.parametrize(
+        ("encoding", "detected"),
+        [("utf-8-sig", "utf-8-sig"), ("utf-16", "utf-16"), ("utf-32", "utf-32")],
+    )
+    def test_byte_order_marks(self, encoding, detected):
+        """Test a byte order mark decides the encoding and is dropped."""
+        content = "name\ncafé\n".encode(encoding)
+        assert decode_sample(content) == ("name\ncafé\n", detected)
+
+    def test_character_cut_at_end_of_sample(self):
+        """Test a character split by the sample boundary isn't an error."""
+        content = b"a" * (64 * 1024 - 1) + "é".encode()
+        text, encoding = decode_sample(content)
+        assert encoding == "utf-8"
+        assert len(text) == 64 * 1024 - 1
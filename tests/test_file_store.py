@@ -0,0 +1,74 @@
+"""Tests for the upload file store."""
+
+import hashlib
+
+from backend.utils.file_store import FileStore
+
+
+class TestFileStore:
+    """Tests for FileStore."""
+
+    def test_put_and_get(self):
+        """Test stored files can be fetched by their handle."""
+        store = FileStore(ttl_seconds=60, max_bytes=1024)
+        entry = store.put(b"a,b\n1,2\n", "data.csv", "csv")
+
+        assert entry.digest == hashlib.sha256(b"a,b\n1,2\n").hexdigest()
+        fetched = store.get(entry.file_id)
+        assert fetched is not None
+        assert fetched.content == b"a,b\n1,2\n"
+        assert fetched.filename == "data.csv"
+        assert fetched.file_type == "csv"
+
+    def test_get_unknown_returns_none(self):
+        """Test unknown handles return None."""
+        store = FileStore(ttl_seconds=60, max_bytes=1024)
+        assert store.get("missing") is None
+
+    def test_expired_entries_are_dropped(self):
+        """Test entries are unavailable after their TTL."""
+        store = FileStore(ttl_seconds=0, max_bytes=1024)
+        entry = store.put(b"content", "data.csv", "csv")
+
+        assert store.get(entry.file_id) is None
+
+    def test_same_file_is_stored_once(self):
+        """Test re-uploading the same file reuses its entry."""
+        store = FileStore(ttl_seconds=60, max_bytes=1024)
+        first = store.put(b"content", "a.csv", "csv")
+        second = store.put(bytes(bytearray(b"content")), "a.csv", "csv")
+
+        assert second is first
+        assert store._total_bytes == len(b"content")
+
+    def test_same_content_under_two_names_keeps_each_name(self):
+        """Test uploads of the same bytes keep their own names but one copy."""
+        store = FileStore(ttl_seconds=60, max_bytes=1024)
+        first = store.put(b"content", "a.csv", "csv")
+        second = store.put(bytes(bytearray(b"content")), "b.csv", "csv")
+
+        assert first.file_id != second.file_id
+        assert store.get(first.file_id).filename == "a.csv"
+        assert store.get(second.file_id).filename == "b.csv"
+        assert second.content is first.content
+        assert store._total_bytes == len(b"content")
+
+    def test_shared_content_is_freed_with_its_last_entry(self):
+        """Test shared content counts against the budget until all expire."""
+        store = FileStore(ttl_seconds=60, max_bytes=10)
+        first = store.put(b"aaaaaa", "a.csv", "csv")
+        second = store.put(b"aaaaaa", "b.csv", "csv")
+        store.put(b"bbbbbb", "c.csv", "csv")
+
+        assert store.get(first.file_id) is None
+        assert store.get(second.file_id) is None
+        assert store._total_bytes == len(b"bbbbbb")
+
+    def test_evicts_least_recently_used_over_budget(self):
+        """Test the oldest entries are evicted when over the size budget."""
+        store = FileStore(ttl_seconds=60, max_bytes=10)
+        first = store.put(b"aaaaaa", "a.csv", "csv")
+        second = store.put(b"bbbbbb", "b.csv", "csv")
+
+        assert store.get(first.file_id) is None
+        assert store.get(second.file_id) is not None
@@ -0,0 +1,130 @@
+"""Tests for record flatteners compiled per shape."""
+
+from backend.converters.flatten_plan import (
+    ARRAY,
+    NESTED_OBJECT,
+    SCALAR_FIELDS,
+    PlanCache,
+    compile_flattener,
+    compile_splitter,
+    flatten_record,
+)
+
+
+class TestCompiledFlattener:
+    """Tests for compile_flattener and flatten_record."""
+
+    def test_matches_record_of_same_shape(self):
+        """Test a compiled flattener reproduces the generic row."""
+        sample = {"id": 1, "user": {"name": "a", "geo": {"lat": 1.0}}, "tags": ["x"]}
+        record = {"id": 2, "user": {"name": "b", "geo": {"lat": 2.0}}, "tags": []}
+        flatten = compile_flattener(sample, "root.")
+
+        assert flatten(record) == {
+            "root.id": 2,
+            "root.user.name": "b",
+            "root.user.geo.lat": 2.0,
+            "root.tags": "[]",
+        }
+
+    def test_returns_none_for_other_shape(self):
+        """Test records whose value kinds or nested keys differ are rejected."""
+        flatten = compile_flattener({"id": 1, "user": {"name": "a"}})
+
+        assert flatten({"id": [1], "user": {"name": "a"}}) is None
+        assert flatten({"id": 1, "user": "a"}) is None
+        assert flatten({"id": 1, "user": {"email": "a"}}) is None
+
+    def test_flatten_record_falls_back_to_generic_path(self):
+        """Test a record not matching the first plan of its keys is flattened."""
+        flatten_record({"id": 1, "user": {"name": "a"}})
+
+        assert flatten_record({"id": 2, "user": {"email": "b", "n": {}}}) == {
+            "id": 2,
+            "user.email": "b",
+        }
+
+    def test_keys_are_only_used_as_column_names(self):
+        """Test keys that look like code become plain column names."""
+        key = "x'}; import os; {'"
+        flatten = compile_flattener({key: {"\n)": 1}, "b": [1]})
+
+        assert flatten({key: {"\n)": 2}, "b": []}) == {f"{key}.\n)": 2, "b": "[]"}
+
+    def test_non_string_keys_are_not_compiled(self):
+        """Test records with keys that aren't strings get no plan."""
+        assert compile_flattener({1: "a"}) is None
+
+
+class TestCompiledSplitter:
+    """Tests for compile_splitter."""
+
+    def test_splits_arrays_and_nested_arrays_in_order(self):
+        """Test arrays become operations between scalar fields, in key order."""
+        sample = {"id": 1, "tags": [1], "meta": {"a": 1}, "sub": {"items": []}, "z": 0}
+        split = compile_splitter(sample)
+
+        assert split(sample) == [
+            (SCALAR_FIELDS, {"id": 1}),
+            (ARRAY, [1], "tags", "tags."),
+            (SCALAR_FIELDS, {"meta.a": 1}),
+            (NESTED_OBJECT, {"items": []}, "sub."),
+            (SCALAR_FIELDS, {"z": 0}),
+        ]
+
+    def test_prefixes_columns_and_rejects_other_shapes(self):
+        """Test columns get the prefix and other shapes are rejected."""
+        sample = {"id": 1, "user": {"name": "a"}, "items": [{"x": 1}]}
+
+        assert compile_splitter(sample, "p.")(sample) == [
+            (SCALAR_FIELDS, {"p.id": 1, "p.user.name": "a"}),
+            (ARRAY, [{"x": 1}], "p.items", "p.items."),
+        ]
+        assert compile_splitter(sample)({"id": 1, "user": None, "items": []}) is None
+
+
+class TestPlanCache:
+    """Tests for PlanCache."""
+
+    def test_compiles_once_per_shape(self):
+        """Test a shape is compiled on first use only."""
+        compiled = []
+
+        def compile_plan(obj, prefix):
+            compiled.append(tuple(obj))
+            return lambda record: len(record)
+
+        cache = PlanCache(compile_plan)
+        cache.apply({"a": 1, "b": 2})
+        cache.apply({"a": 3, "b": 4})
+        cache.apply({"b": 1, "a": 2})
+
+        assert compiled == [("a", "b"), ("b", "a")]
+
+    def test_keeps_variants_per_key_sequence(self):
+        """Test records with the same keys but another shape get a new plan."""
+        flatten_record({"id": 1, "user": None})
+
+        assert flatten_record({"id": 2, "user": {"name": "a"}}) == {
+            "id": 2,
+            "user.name": "a",
+        }
+        assert flatten_record({"id": 3, "user": None}) == {"id": 3, "user": None}
+
+    def test_evicts_least_recently_used_shape(self):
+        """Test shapes beyond the limit evict the one used longest ago."""
+        compiled = []
+
+        def compile_plan(obj, prefix):
+            compiled.append(tuple(obj))
+            return lambda record: len(record)
+
+        cache = PlanCache(compile_plan, max_plans=2)
+        cache.apply({"a": 1})
+        cache.apply({"b": 1})
+        cache.apply({"a": 2})
+        cache.apply({"c": 1})
+        cache.apply({"a": 3})
+        cache.apply({"b": 2})
+
+        assert compiled == [("a",), ("b",), ("c",), ("b",)]
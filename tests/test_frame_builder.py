@@ -0,0 +1,60 @@
+"""Tests for column-at-a-time DataFrame construction."""
+
+import pandas as pd
+
+from backend.converters.frame_builder import ColumnBuilder
+
+
+class TestColumnBuilder:
+    """Tests for ColumnBuilder."""
+
+    def _build(self, rows: list[dict]) -> pd.DataFrame:
+        builder = ColumnBuilder()
+        builder.extend(rows)
+        return builder.build()
+
+    def test_matches_frame_from_rows(self):
+        """Test the built frame equals pd.DataFrame on the row dicts."""
+        rows = [
+            {"id": 1, "name": "a", "score": 1.5},
+            {"id": 2, "tags": "x"},
+            {"name": None, "id": 3, "active": True},
+            {"id": 4, "score": None, "tags": "y", "active": False},
+        ]
+
+        pd.testing.assert_frame_equal(self._build(rows), pd.DataFrame(rows))
+
+    def test_backfills_missing_values(self):
+        """Test columns first seen late and missing cells are NaN."""
+        df = self._build([{"a": 1}, {"b": "x"}, {"a": 3}])
+
+        assert df.columns.tolist() == ["a", "b"]
+        assert df["a"].isna().tolist() == [False, True, False]
+        assert df["b"].isna().tolist() == [True, False, True]
+
+    def test_rows_without_columns(self):
+        """Test empty rows are still counted."""
+        builder = ColumnBuilder()
+        builder.extend([{}, {}])
+
+        assert len(builder) == 2
+        assert len(builder.build()) == 2
+
+    def test_append_values_matches_rows(self):
+        """Test batched value rows build the same frame as row dicts."""
+        first = ("id", "name")
+        second = ("id", "score")
+        builder = ColumnBuilder()
+        builder.append_values(first, (1, "a"))
+        builder.append_values(first, (2, "b"))
+        builder.append({"id": 3, "tag": "x"})
+        builder.append_values(second, (4, 0.5))
+
+        rows = [
+            {"id": 1, "name": "a"},
+            {"id": 2, "name": "b"},
+            {"id": 3, "tag": "x"},
+            {"id": 4, "score": 0.5},
+        ]
+        assert len(builder) == 4
+        pd.testing.assert_frame_equal(builder.build(), pd.DataFrame(rows))
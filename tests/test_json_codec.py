@@ -0,0 +1,137 @@
+"""Tests for the JSON codec layer."""
+
+import json
+import mmap
+
+import pytest
+
+from backend.converters import json_codec
+
+
+class _StrictDecodeError(ValueError):
+    """Error raised by the stand-in accelerated decoder."""
+
+
+def _strict_decode(content):
+    """Decode like a strict RFC 8259 parser without error positions."""
+    if isinstance(content, memoryview):
+        content = content.tobytes()
+    try:
+        return json.loads(content, parse_constant=_reject_constant)
+    except ValueError as e:
+        raise _StrictDecodeError("unexpected character") from e
+
+
+def _reject_constant(name):
+    raise ValueError(name)
+
+
+@pytest.fixture
+def strict_backend(monkeypatch):
+    """Install a stand-in accelerated decoder."""
+    monkeypatch.setattr(json_codec, "_fast_decode", _strict_decode)
+    monkeypatch.setattr(json_codec, "_fast_errors", (_StrictDecodeError,))
+
+
+_VALUE = {"name": "é", "n": [1, 2.5, None, float("inf")], 1: True}
+
+
+class TestLoads:
+    """Tests for loads."""
+
+    @pytest.mark.parametrize("backend", ["stdlib", "strict"])
+    def test_matches_json_loads(self, request, backend):
+        """Test documents decode as json.loads decodes them."""
+        if backend == "strict":
+            request.getfixturevalue("strict_backend")
+        text = '{"a": [1, 2.5, "é", null, true], "b": {"c": {}}, "a": 0}'
+
+        assert json_codec.loads(text.encode()) == json.loads(text)
+        assert json_codec.loads(text) == json.loads(text)
+
+    def test_rejected_documents_fall_back_to_stdlib(self, strict_backend):
+        """Test values only the standard library accepts are still decoded."""
+        assert json_codec.loads(b"[Infinity, 1]") == [float("inf"), 1]
+
+    def test_errors_keep_line_and_column(self, strict_backend):
+        """Test invalid documents raise JSONDecodeError with the position."""
+        with pytest.raises(json.JSONDecodeError) as excinfo:
+            json_codec.loads(b'{\n  "a": 1,\n  "b": }')
+
+        assert (excinfo.value.lineno, excinfo.value.colno) == (3, 8)
+
+    def test_invalid_utf8_raises_decode_error(self, strict_backend):
+        """Test bytes that aren't UTF-8 raise UnicodeDecodeError."""
+        with pytest.raises(UnicodeDecodeError):
+            json_codec.loads(b'{"a": "\xff"}')
+
+    def test_decodes_mapped_content(self, strict_backend):
+        """Test mmap content is decoded and the mapping can be closed."""
+        content = mmap.mmap(-1, 8)
+        content.write(b'{"a": 1}')
+
+        assert json_codec.loads(content) == {"a": 1}
+        content.close()
+
+
+_WIDE_INTS = b'{"id": 123456789012345678901234567890, "n": [-9223372036854775809, 0.5]}'
+
+
+@pytest.fixture(params=["installed", "orjson", "msgspec"])
+def real_backend(request, monkeypatch):
+    """Decode with the installed backend or a real accelerated one."""
+    if request.param == "orjson":
+        orjson = pytest.importorskip("orjson")
+        monkeypatch.setattr(json_codec, "_fast_decode", orjson.loads)
+        monkeypatch.setattr(json_codec, "_fast_errors", (orjson.JSONDecodeError,))
+        monkeypatch.setattr(json_codec, "_narrow_ints", True)
+    elif request.param == "msgspec":
+        msgspec = pytest.importorskip("msgspec")
+        monkeypatch.setattr(json_codec, "_fast_decode", msgspec.json.decode)
+        monkeypatch.setattr(json_codec, "_fast_errors", (msgspec.DecodeError,))
+        monkeypatch.setattr(json_codec, "_narrow_ints", False)
+
+
+class TestRealBackends:
+    """Tests for loads with the accelerated decoders themselves."""
+
+    def test_keeps_integers_wider_than_64_bits(self, real_backend):
+        """Test integers outside the 64-bit range aren't decoded as floats."""
+        assert json_codec.loads(_WIDE_INTS) == json.loads(_WIDE_INTS)
+        assert json_codec.loads(_WIDE_INTS.decode()) == json.loads(_WIDE_INTS)
+
+    def test_keeps_integers_wider_than_64_bits_in_mapped_content(self, real_backend):
+        """Test mmap content with wide integers decodes as json.loads does."""
+        content = mmap.mmap(-1, len(_WIDE_INTS))
+        content.write(_WIDE_INTS)
+
+        assert json_codec.loads(content) == json.loads(_WIDE_INTS)
+        content.close()
+
+    @pytest.mark.parametrize(
+        "text",
+        ['[Infinity, 1e400, "\\ud800"]', '{"a": 1, "a": [18446744073709551615]}'],
+    )
+    def test_matches_json_loads(self, real_backend, text):
+        """Test values strict decoders reject or limit decode as json.loads."""
+        assert json_codec.loads(text.encode()) == json.loads(text)
+
+
+class TestDumps:
+    """Tests for the encoders."""
+
+    def test_dumps_matches_json_dumps(self):
+        """Test the compact encoder escapes non-ASCII characters."""
+        assert json_codec.dumps(_VALUE) == json.dumps(_VALUE)
+
+    def test_dumps_unicode_matches_json_dumps(self):
+        """Test the unicode encoder keeps non-ASCII characters."""
+        assert json_codec.dumps_unicode(_VALUE) == json.dumps(
+            _VALUE, ensure_ascii=False
+        )
+
+    def test_dumps_pretty_matches_json_dumps(self):
+        """Test the pretty encoder indents by two spaces."""
+        assert json_codec.dumps_pretty([_VALUE]) == json.dumps(
+            [_VALUE], indent=2, ensure_ascii=False
+        )
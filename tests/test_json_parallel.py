@@ -0,0 +1,127 @@
+"""Tests for parallel processing of root JSON arrays."""
+
+import json
+
+import pandas as pd
+import pytest
+
+from backend.converters import json_parallel
+from backend.converters.json_parallel import map_array_chunks
+from backend.converters.json_to_csv import ExportMode, JsonToCsvConverter
+
+
+def _records(size: int) -> list[dict]:
+    """Build records with nested arrays of objects and separator-like strings."""
+    return [
+        {
+            "id": i,
+            "note": ', {"fake": 1}' if i % 3 else "plain",
+            "items": [{"sku": i}, {"sku": -i}] if i % 2 else [],
+            "meta": {"tags": ["a", "b"][: i % 3]},
+        }
+        for i in range(size)
+    ]
+
+
+class TestMapArrayChunks:
+    """Tests for map_array_chunks."""
+
+    def test_chunks_are_the_objects_in_order(self):
+        """Test concatenated chunks are exactly the root objects."""
+        records = _records(50)
+        content = json.dumps(records, indent=1).encode()
+
+        chunks = map_array_chunks(content, list, workers=3, min_bytes=0)
+
+        assert chunks is not None
+        assert len(chunks) == 3
+        assert [item for chunk in chunks for item in chunk] == records
+
+    def test_object_with_long_nested_array(self):
+        """Test a first object holding many nested objects is split after it."""
+        content = b'[{"a": [' + b",".join([b'{"x": 1}'] * 2000) + b']}, {"b": 1}]'
+
+        chunks = map_array_chunks(content, len, workers=3, min_bytes=0)
+
+        assert chunks == [1, 1]
+
+    def test_small_content_is_left_to_caller(self):
+        """Test content under the size threshold is not processed."""
+        content = json.dumps(_records(5)).encode()
+
+        assert map_array_chunks(content, list, workers=3) is None
+        assert map_array_chunks(content, list, workers=1, min_bytes=0) is None
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            b'{"a": 1}',
+            b"[]",
+            b'[{"a": 1}, 2, {"a": 3}, {"a": 4}]',
+            b'[{"a": 1}, {"a": 2}, {"a": 3}, {"a": 4}',
+            b'[{"a": 1}, {"a": 2}, {"a": 3}, {"a": 4}] x',
+            b'[{"a": "\xff"}, {"a": 2}]',
+        ],
+    )
+    def test_invalid_documents_are_left_to_caller(self, content):
+        """Test anything but a valid array of objects gives no chunks."""
+        assert map_array_chunks(content, list, workers=3, min_bytes=0) is None
+
+
+class TestRootSeparators:
+    """Tests for the scan for root separators."""
+
+    @pytest.mark.parametrize("block_bytes", [1, 2, 3, 7, 1 << 20])
+    def test_commas_in_strings_and_nested_values_are_skipped(
+        self, monkeypatch, block_bytes
+    ):
+        """Test only commas between root objects are found, in any blocks."""
+        content = (
+            rb'[{"a": "x\\", "b": [1, {"c": 2}]},'
+            rb'{"d": "\"},{\\\"[,"},{"e": "\\\\"}]'
+        )
+        monkeypatch.setattr(json_parallel, "_SCAN_BLOCK_BYTES", block_bytes)
+        expected = [
+            content.index(b']},{"d"') + 2,
+            content.index(b'"},{"e"') + 2,
+        ]
+
+        separators = json_parallel._root_separators(content, 1).tolist()
+
+        assert separators == expected
+
+
+class TestParallelConversion:
+    """Tests for the parallel path of JsonToCsvConverter."""
+
+    @pytest.fixture(autouse=True)
+    def parallel(self, monkeypatch):
+        """Process every root array in parallel."""
+        monkeypatch.setattr(json_parallel, "JSON_WORKERS", 3)
+        monkeypatch.setattr(json_parallel, "PARALLEL_JSON_MIN_BYTES", 0)
+
+    @pytest.mark.parametrize("mode", [ExportMode.NORMAL, ExportMode.SINGLE_ROW])
+    def test_matches_serial_path(self, monkeypatch, mode):
+        """Test the frame is identical to the serial path's."""
+        content = json.dumps(_records(60)).encode()
+        converter = JsonToCsvConverter()
+        load = (
+            converter._json_to_dataframe_single_row
+            if mode == ExportMode.SINGLE_ROW
+            else converter._json_to_dataframe
+        )
+
+        assert map_array_chunks(content, list) is not None
+        parallel = load(content)
+        monkeypatch.setattr(json_parallel, "JSON_WORKERS", 1)
+        serial = load(content)
+
+        pd.testing.assert_frame_equal(parallel, serial)
+
+    def test_row_limit_counts_all_chunks(self, monkeypatch):
+        """Test the limit applies to the rows of the whole document."""
+        monkeypatch.setattr("backend.converters.json_to_csv.MAX_EXPANDED_ROWS", 30)
+        content = json.dumps([{"id": i} for i in range(40)]).encode()
+
+        with pytest.raises(ValueError, match="Expansion would create 40 rows"):
+            JsonToCsvConverter()._json_to_dataframe(content)
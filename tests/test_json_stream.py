@@ -0,0 +1,69 @@
+"""Tests for incremental JSON array parsing."""
+
+import json
+
+import pytest
+
+from backend.converters.json_stream import is_root_array, iter_array_items
+
+VALID_DOCUMENTS = [
+    "[]",
+    " [ ] \n",
+    '[{"a": 1}, {"b": [1, 2, {"c": null}]}]',
+    '[{"name": "Zürich €𝄞", "q": "say \\"hi\\""}]',
+    "[12345678901234567890, -0.5e-3, 1E+2, 0, true, false, null]",
+    '\n[ {"k": "v"} , [ [ ] ] ]\n\n',
+]
+
+INVALID_DOCUMENTS = [
+    "[",
+    "[1,]",
+    "[1 2]",
+    "[1]x",
+    "[1]]",
+    '["abc',
+    "[1.5e-]",
+    '[1,\n{"a" 1}]',
+]
+
+
+class TestIterArrayItems:
+    """Tests for iter_array_items."""
+
+    @pytest.mark.parametrize("document", VALID_DOCUMENTS)
+    def test_matches_json_loads(self, document: str):
+        """Test items match a full parse for every chunk boundary."""
+        content = document.encode("utf-8")
+        for chunk_bytes in range(1, 12):
+            items = list(iter_array_items(content, chunk_bytes=chunk_bytes))
+            assert items == json.loads(document)
+
+    def test_non_finite_numbers(self):
+        """Test NaN and Infinity are accepted like json.loads does."""
+        items = list(iter_array_items(b"[NaN, -Infinity]", chunk_bytes=2))
+
+        assert items[0] != items[0]
+        assert items[1] == float("-inf")
+
+    @pytest.mark.parametrize("document", INVALID_DOCUMENTS)
+    def test_rejects_invalid_json(self, document: str):
+        """Test documents json.loads rejects also fail incrementally."""
+        content = document.encode("utf-8")
+        for chunk_bytes in (1, 3, 1024):
+            with pytest.raises(json.JSONDecodeError):
+                list(iter_array_items(content, chunk_bytes=chunk_bytes))
+
+    def test_rejects_invalid_utf8(self):
+        """Test invalid UTF-8 raises UnicodeDecodeError."""
+        with pytest.raises(UnicodeDecodeError):
+            list(iter_array_items(b'["\xff"]', chunk_bytes=2))
+
+
+class TestIsRootArray:
+    """Tests for is_root_array."""
+
+    def test_detects_root_array(self):
+        """Test arrays are detected after leading whitespace."""
+        assert is_root_array(b" \n\t[1]")
+        assert not is_root_array(b'{"a": [1]}')
+        assert not is_root_array(b"\xef\xbb\xbf[1]")
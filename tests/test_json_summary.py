@@ -0,0 +1,89 @@
+"""Tests for the structural summary of JSON documents."""
+
+import json
+
+from backend.converters import json_to_csv
+from backend.converters.json_summary import ArraySummary, DocumentSummary, summarize
+from backend.converters.json_to_csv import JsonToCsvConverter
+from backend.utils.cache import PARSE_CACHE
+
+
+class TestSummarize:
+    """Tests for summarize."""
+
+    def test_array_of_records(self):
+        """Test counts, array paths and depth over every record."""
+        data = [
+            {"id": 1, "user": {"name": "a"}, "tags": ["x", "y"]},
+            {
+                "id": 2,
+                "tags": [],
+                "items": [{"sku": 1, "opts": {"size": [1, 2]}}, {"sku": 2}],
+                "extra": [1, {"a": 1}],
+            },
+        ]
+
+        summary = summarize(data)
+
+        assert summary == DocumentSummary(
+            root="array",
+            record_count=2,
+            objects_only=True,
+            row_count=2 + 2 + 1,
+            arrays=(
+                ArraySummary("tags", 2, "primitives"),
+                ArraySummary("items", 2, "objects"),
+                ArraySummary("items.opts.size", 2, "primitives"),
+                ArraySummary("extra", 2, "mixed"),
+            ),
+            max_depth=3,
+        )
+
+    def test_row_count_matches_expansion(self, nested3_json: bytes):
+        """Test the row count is the number of rows normal mode creates."""
+        converter = JsonToCsvConverter()
+
+        summary = summarize(json.loads(nested3_json))
+
+        assert summary.row_count == len(converter._json_to_dataframe(nested3_json))
+
+    def test_other_roots(self):
+        """Test roots that aren't objects or arrays of objects."""
+        assert summarize([]) == DocumentSummary("array", 0, objects_only=True)
+        assert summarize([{"a": 1}, 2]) == DocumentSummary(
+            "array", 2, objects_only=False
+        )
+        assert summarize("text") == DocumentSummary("str", 0, objects_only=False)
+
+    def test_array_kinds_merge_across_occurrences(self):
+        """Test empty occurrences are skipped and differing kinds are mixed."""
+        data = [{"a": [], "b": [1]}, {"a": [{"x": 1}, {}], "b": [{"x": 1}]}]
+
+        assert summarize(data).arrays == (
+            ArraySummary("a", 2, "objects"),
+            ArraySummary("b", 1, "mixed"),
+        )
+
+
+class TestSummaryReuse:
+    """Tests for sharing one summary across analysis and export modes."""
+
+    def test_inspect_walks_document_once(self, nested2_json: bytes, monkeypatch):
+        """Test analysis and every preview use a single summary."""
+        calls = []
+
+        def counting_summarize(data):
+            calls.append(data)
+            return summarize(data)
+
+        monkeypatch.setattr(json_to_csv, "summarize", counting_summarize)
+        PARSE_CACHE.clear()
+        converter = JsonToCsvConverter()
+        result = converter.inspect(
+            nested2_json, include_tables=True, include_single_row=True
+        )
+        converter.analyze_json_structure(nested2_json)
+
+        assert len(calls) == 1
+        assert result["analysis"]["record_count"] == 1
+        assert result["analysis"]["max_depth"] >= 2
@@ -7,6 +7,7 @@ import json
 import pytest
 
 from backend.converters.json_to_csv import ExportMode, JsonToCsvConverter
+from backend.utils.cache import PARSE_CACHE
 
 
 class TestJsonToCsvConverter:
@@ -156,8 +157,8 @@ class TestJsonToCsvConverter:
             rows_per_product[pid] = rows_per_product.get(pid, 0) + 1
 
         assert rows_per_product["0001"] == 28  # 4 × 7
-        assert rows_per_product["0002"] == 5   # 1 × 5
-        assert rows_per_product["0003"] == 8   # 2 × 4
+        assert rows_per_product["0002"] == 5  # 1 × 5
+        assert rows_per_product["0003"] == 8  # 2 × 4
 
     def test_expansion_limit_exceeded(self):
         """Test that exceeding MAX_EXPANDED_ROWS raises ValueError."""
@@ -180,6 +181,101 @@ class TestJsonToCsvConverter:
         with pytest.raises(ValueError, match=f"limit: {MAX_EXPANDED_ROWS}"):
             self.converter.convert(content)
 
+    def test_expansion_limit_aborts_before_building_product(self):
+        """Test a huge Cartesian product is rejected without materializing it."""
+        # 100^6 = 10^12 combinations
+        data = {f"arr{i}": list(range(100)) for i in range(6)}
+        content = json.dumps(data).encode("utf-8")
+
+        with pytest.raises(
+            ValueError, match="Expansion would create 1000000000000 rows"
+        ):
+            self.converter.convert(content)
+
+    def test_expand_object_is_lazy(self):
+        """Test rows are generated on demand."""
+        data = {"id": 1, "a": list(range(1000)), "b": list(range(1000))}
+        rows = self.converter._expand_object(data)
+
+        assert next(rows) == {"id": 1, "a": 0, "b": 0}
+        assert next(rows) == {"id": 1, "a": 0, "b": 1}
+
+    def test_analyze_counts_heterogeneous_rows_exactly(self):
+        """Test row estimates count every record, not just the first."""
+        data = [
+            {"id": 1, "tags": ["a"]},
+            {"id": 2, "tags": ["a", "b", "c"], "items": [{"x": [1, 2]}, {"x": [3]}]},
+        ]
+        content = json.dumps(data).encode("utf-8")
+
+        result = self.converter.analyze_json_structure(content)
+
+        assert result["estimated_rows"] == 1 + 3 * 3
+        assert result["estimated_rows"] == len(
+            self.converter._json_to_dataframe(content)
+        )
+        assert result["expansion_formula"] == "2 × varying array sizes = 10"
+
+    def test_analyze_lists_arrays_of_every_record(self):
+        """Test arrays are listed with representative counts from the summary."""
+        data = [
+            {"id": 1, "tags": [], "items": [{"x": [1, 2]}, {"x": [3, 4]}]},
+            {"id": 2, "tags": ["a", "b"], "items": [{"x": [5, 6]}, {"x": [7, 8]}]},
+        ]
+        content = json.dumps(data).encode("utf-8")
+
+        result = self.converter.analyze_json_structure(content)
+
+        assert result["arrays_found"] == [
+            {"path": "tags", "count": 2, "type": "primitives"},
+            {"path": "items", "count": 2, "type": "objects"},
+            {"path": "items.x", "count": 2, "type": "primitives"},
+        ]
+        assert result["estimated_rows"] == 4 + 2 * 4
+        assert result["expansion_formula"] == "2 × varying array sizes = 12"
+
+    def test_array_free_records_skip_expansion(self, monkeypatch):
+        """Test objects without arrays are flattened without expanding them."""
+        data = [
+            {"id": 1, "user": {"name": "a", "geo": {"lat": 1.5}}},
+            {"id": 2, "user": {"name": "b", "geo": {"lat": None}}},
+            {"id": 3, "user": {"name": "c"}, "tags": ["x", "y"]},
+        ]
+        content = json.dumps(data).encode("utf-8")
+        expanded = []
+        expand_object = self.converter._expand_object
+
+        def spy(obj, prefix=""):
+            expanded.append(obj["id"])
+            return expand_object(obj, prefix)
+
+        monkeypatch.setattr(self.converter, "_expand_object", spy)
+        df = self.converter._json_to_dataframe(content)
+
+        assert expanded == [3]
+        assert df.columns.tolist() == ["id", "user.name", "user.geo.lat", "tags"]
+        assert df["id"].tolist() == [1, 2, 3, 3]
+        assert df["tags"].tolist()[2:] == ["x", "y"]
+
+    def test_deeply_nested_document(self):
+        """Test a 200-level document converts in every mode without recursing."""
+        obj = {"tags": ["a", "b"], "value": 0}
+        for level in range(1, 200):
+            obj = {"child": obj, "value": level}
+        content = json.dumps([obj]).encode("utf-8")
+        deep_prefix = "child." * 199
+
+        analysis = self.converter.analyze_json_structure(content)
+        df = self.converter._json_to_dataframe(content)
+        single_row = self.converter._json_to_dataframe_single_row(content)
+        tables = self.converter._json_to_tables(content)
+
+        assert analysis["estimated_rows"] == 2
+        assert analysis["arrays_found"][0]["path"] == f"{deep_prefix}tags"
+        assert df[f"{deep_prefix}tags"].tolist() == ["a", "b"]
+        assert single_row[f"{deep_prefix}tags"].tolist() == ['["a", "b"]']
+        assert tables["main"][f"{deep_prefix}value"].tolist() == [0]
+
     def test_preview_nested2_pagination(self):
         """Test pagination works correctly with expanded nested data."""
         with open("tests/sample_files/nested2.json", "rb") as f:
@@ -400,3 +496,105 @@ class TestSingleRowMode:
         # Should be parseable as JSON
         parsed = json.loads(batter_value)
         assert len(parsed) == 4
+
+
+class TestInspect:
+    """Tests for single-parse inspection."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.converter = JsonToCsvConverter()
+
+    def test_inspect_parses_document_once(self, nested3_json: bytes, monkeypatch):
+        """Test analysis and all previews are built from one parse."""
+        PARSE_CACHE.clear()
+        parse_calls = []
+        original_parse = self.converter._parse_json
+
+        def counting_parse(content: bytes):
+            parse_calls.append(content)
+            return original_parse(content)
+
+        monkeypatch.setattr(self.converter, "_parse_json", counting_parse)
+
+        result = self.converter.inspect(
+            nested3_json, page_size=5, include_tables=True, include_single_row=True
+        )
+
+        assert len(parse_calls) == 1
+        assert result["analysis"] == self.converter.analyze_json_structure(nested3_json)
+        assert result["preview"] == self.converter.preview(nested3_json, page_size=5)
+        assert (
+            result["tables"]
+            == self.converter.preview_all_tables(nested3_json)["tables"]
+        )
+        assert result["single_row_preview"] == self.converter.preview(
+            nested3_json, page_size=5, export_mode=ExportMode.SINGLE_ROW
+        )
+
+    def test_inspect_simple_json_skips_extra_previews(self, simple_json: bytes):
+        """Test multi-table and single-row previews default to complex JSON only."""
+        result = self.converter.inspect(simple_json, page_size=2)
+
+        assert result["analysis"]["is_complex"] is False
+        assert result["preview"]["total_rows"] == 3
+        assert len(result["preview"]["rows"]) == 2
+        assert "tables" not in result
+        assert "single_row_preview" not in result
+
+    def test_inspect_reports_expansion_limit_as_preview_error(self):
+        """Test the analysis is still returned when normal expansion fails."""
+        obj = {f"arr{i}": list(range(10)) for i in range(5)}  # 10^5 rows
+        content = json.dumps(obj).encode("utf-8")
+
+        result = self.converter.inspect(content, include_tables=False)
+
+        assert result["analysis"]["estimated_rows"] == 100000
+        assert result["preview"] is None
+        assert "limit" in result["preview_error"]
+        assert result["single_row_preview"]["total_rows"] == 1
+
+
+class TestIncrementalParsing:
+    """Tests for parsing root arrays one object at a time."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.converter = JsonToCsvConverter()
+
+    def test_root_array_not_parsed_whole(self, nested3_json: bytes, monkeypatch):
+        """Test root arrays are converted without a full document parse."""
+
+        def fail_parse(content: bytes):
+            raise AssertionError("full parse used")
+
+        data = json.loads(nested3_json)
+        expected = self.converter._data_to_dataframe(data)
+        expected_single = self.converter._data_to_dataframe_single_row(data)
+        expected_tables = self.converter._data_to_tables(data)
+        monkeypatch.setattr(self.converter, "_parse_json", fail_parse)
+
+        assert self.converter._json_to_dataframe(nested3_json).equals(expected)
+        single = self.converter._json_to_dataframe_single_row(nested3_json)
+        assert single.equals(expected_single)
+        tables = self.converter._json_to_tables(nested3_json)
+        assert tables.keys() == expected_tables.keys()
+        assert all(tables[name].equals(expected_tables[name]) for name in tables)
+
+    def test_syntax_error_reports_document_position(self):
+        """Test syntax errors keep the document line, even after bad items."""
+        content = b'[\n  {"a": 1},\n  "text",\n  {"a": }\n]'
+
+        with pytest.raises(ValueError, match=r"Invalid JSON at line 4, column 9"):
+            self.converter.convert(content)
+
+    def test_non_object_item_raises(self):
+        """Test non-object items raise the structure error."""
+        content = b'[{"a": 1}, 2, {"a": 3}]'
+
+        with pytest.raises(ValueError, match="must contain objects"):
+            self.converter.convert(content)
+        with pytest.raises(ValueError, match="must contain objects"):
+            self.converter.convert(content, export_mode=ExportMode.SINGLE_ROW)
+        with pytest.raises(ValueError, match="array of objects"):
+            self.converter.convert_multi_table(content)
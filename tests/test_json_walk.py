@@ -0,0 +1,58 @@
+"""Tests for explicit-stack JSON traversal."""
+
+from backend.converters.json_walk import iter_leaves, iter_objects, resolve
+
+
+def _deep(levels: int) -> dict:
+    obj = {"leaf": 1}
+    for i in range(levels):
+        obj = {"n": obj, "i": i}
+    return obj
+
+
+class TestIterLeaves:
+    """Tests for iter_leaves."""
+
+    def test_yields_leaves_depth_first_in_key_order(self):
+        """Test nested values come at their key's position."""
+        obj = {"a": 1, "b": {"c": [1], "d": {"e": None}}, "f": "x", "g": {}}
+
+        assert list(iter_leaves(obj, "p.")) == [
+            ("p.a", 1),
+            ("p.b.c", [1]),
+            ("p.b.d.e", None),
+            ("p.f", "x"),
+        ]
+
+    def test_walks_beyond_recursion_limit(self):
+        """Test documents deeper than the recursion limit are walked."""
+        leaves = list(iter_leaves(_deep(5000)))
+
+        assert len(leaves) == 5001
+        assert leaves[0] == ("n." * 5000 + "leaf", 1)
+        assert leaves[-1] == ("i", 4999)
+
+
+class TestIterObjects:
+    """Tests for iter_objects."""
+
+    def test_yields_nested_objects_not_in_arrays(self):
+        """Test every nested object is yielded once."""
+        obj = {"a": {"b": {}}, "c": [{"d": 1}]}
+
+        assert sorted(map(len, iter_objects(obj))) == [0, 1, 2]
+
+
+class TestResolve:
+    """Tests for resolve."""
+
+    def test_sends_child_results_back(self):
+        """Test a recursive computation is evaluated without recursing."""
+
+        def depth(obj):
+            child = obj.get("n")
+            if child is None:
+                return 1
+            return 1 + (yield (child,))
+
+        assert resolve(depth, _deep(5000)) == 5001
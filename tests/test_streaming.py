@@ -0,0 +1,160 @@
+"""Tests for chunked DataFrame serialization."""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from backend.converters.streaming import (
+    JsonStyle,
+    csv_chunks,
+    json_chunks,
+    json_records_chunks,
+)
+
+
+class TestCsvChunks:
+    """Tests for csv_chunks."""
+
+    def test_chunks_join_to_full_csv(self):
+        """Test the joined chunks equal a single to_csv call."""
+        df = pd.DataFrame(
+            {
+                "id": range(25),
+                "name": [f"name, {i}" for i in range(25)],
+                "score": [i / 3 if i % 4 else np.nan for i in range(25)],
+            }
+        )
+        chunks = list(csv_chunks(df, chunk_rows=10))
+
+        assert len(chunks) == 3
+        assert b"".join(chunks) == df.to_csv(index=False).encode("utf-8")
+
+    def test_header_only_in_first_chunk(self):
+        """Test the header row is written once."""
+        df = pd.DataFrame({"a": [1, 2, 3, 4]})
+        chunks = list(csv_chunks(df, chunk_rows=2))
+
+        assert chunks == [b"a\n1\n2\n", b"3\n4\n"]
+
+    def test_empty_dataframe_yields_header(self):
+        """Test a frame without rows still produces its header."""
+        df = pd.DataFrame(columns=["a", "b"])
+
+        assert list(csv_chunks(df)) == [b"a,b\n"]
+
+
+def _records_json(df: pd.DataFrame) -> bytes:
+    """Serialize a DataFrame the way the record-based converters did."""
+    records = df.to_dict(orient="records")
+    for record in records:
+        for key, value in record.items():
+            if pd.isna(value):
+                record[key] = None
+    return json.dumps(records, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+class TestJsonRecordsChunks:
+    """Tests for json_records_chunks."""
+
+    def test_matches_record_serialization(self):
+        """Test output is byte-identical to dumping the list of records."""
+        df = pd.DataFrame(
+            {
+                "id": [1, 2, 3, 4],
+                "score": [1.5, np.nan, np.inf, -0.0],
+                "name": ["Zürich", None, 'say "hi"', "line\nbreak"],
+                "active": [True, False, True, False],
+                "mixed": ["1", 2, 3.5, None],
+            }
+        )
+
+        for chunk_rows in (1, 3, 100):
+            output = b"".join(json_records_chunks(df, chunk_rows=chunk_rows))
+            assert output == _records_json(df)
+
+    def test_non_string_column_labels(self):
+        """Test numeric column labels are written as JSON keys."""
+        df = pd.DataFrame({2024: [1], 2025: ["a"]})
+        output = b"".join(json_records_chunks(df))
+
+        assert output == _records_json(df)
+        assert json.loads(output) == [{"2024": 1, "2025": "a"}]
+
+    def test_empty_dataframe(self):
+        """Test a frame without rows gives an empty array."""
+        df = pd.DataFrame(columns=["a", "b"])
+
+        assert b"".join(json_records_chunks(df)) == b"[]"
+
+
+class TestJsonChunks:
+    """Tests for json_chunks with compact layouts."""
+
+    df = pd.DataFrame(
+        {
+            "id": [1, 2, 3],
+            "score": [1.5, np.nan, np.inf],
+            "name": ["Zürich", None, 'say "hi"'],
+        }
+    )
+
+    def _output(self, df: pd.DataFrame, style: JsonStyle) -> bytes:
+        """Join the chunks of every chunk size, checking they agree."""
+        outputs = {
+            b"".join(json_chunks(df, style, chunk_rows=chunk_rows))
+            for chunk_rows in (1, 2, 100)
+        }
+        assert len(outputs) == 1
+        return outputs.pop()
+
+    def test_pretty_matches_records_chunks(self):
+        """Test the pretty style is the indented array of objects."""
+        output = self._output(self.df, JsonStyle.PRETTY)
+
+        assert output == b"".join(json_records_chunks(self.df))
+
+    def test_compact(self):
+        """Test the compact style is the records without whitespace."""
+        records = json.loads(_records_json(self.df))
+        expected = json.dumps(records, ensure_ascii=False, separators=(",", ":"))
+
+        assert self._output(self.df, JsonStyle.COMPACT) == expected.encode("utf-8")
+
+    def test_ndjson(self):
+        """Test the ndjson style writes one object per line."""
+        lines = self._output(self.df, JsonStyle.NDJSON).decode("utf-8").splitlines()
+
+        assert lines[0] == '{"id":1,"score":1.5,"name":"Zürich"}'
+        assert [json.loads(line) for line in lines[1:]] == [
+            {"id": 2, "score": None, "name": None},
+            {"id": 3, "score": float("inf"), "name": 'say "hi"'},
+        ]
+
+    def test_split(self):
+        """Test the split style writes the columns once and rows as arrays."""
+        output = self._output(self.df, JsonStyle.SPLIT)
+
+        assert output.startswith(b'{"columns":["id","score","name"],"data":[[1,1.5,')
+        assert json.loads(output)["data"][1:] == [
+            [2, None, None],
+            [3, float("inf"), 'say "hi"'],
+        ]
+
+    def test_duplicate_columns(self):
+        """Test duplicate labels collapse in objects but not in split rows."""
+        df = pd.DataFrame([[1, 2]], columns=["a", "a"])
+
+        assert self._output(df, JsonStyle.COMPACT) == b'[{"a":2}]'
+        assert self._output(df, JsonStyle.NDJSON) == b'{"a":2}\n'
+        assert self._output(df, JsonStyle.SPLIT) == (
+            b'{"columns":["a","a"],"data":[[1,2]]}'
+        )
+
+    def test_empty_dataframe(self):
+        """Test a frame without rows gives empty output in every style."""
+        df = pd.DataFrame(columns=["a", "b"])
+
+        assert self._output(df, JsonStyle.COMPACT) == b"[]"
+        assert self._output(df, JsonStyle.NDJSON) == b""
+        assert self._output(df, JsonStyle.SPLIT) == b'{"columns":["a","b"],"data":[]}'
@@ -0,0 +1,107 @@
+"""Tests for upload reading helpers."""
+
+import io
+import json
+import mmap
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import pytest
+from fastapi import UploadFile
+
+from backend.converters.csv_to_json import CsvToJsonConverter
+from backend.converters.excel_to_json import ExcelToJsonConverter
+from backend.utils.uploads import BufferReader, open_buffer, read_upload
+
+
+@contextmanager
+def _spooled_upload(content: bytes, filename: str) -> Iterator[UploadFile]:
+    """Build an UploadFile backed by a spooled temporary file, closed on exit."""
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as spooled:
+        spooled.write(content)
+        spooled.seek(0)
+        yield UploadFile(file=spooled, size=len(content), filename=filename)
+
+
+def _mapped(content: bytes) -> mmap.mmap:
+    """Memory-map content through a temporary file."""
+    with tempfile.TemporaryFile() as f:
+        f.write(content)
+        f.flush()
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class TestReadUpload:
+    """Tests for read_upload."""
+
+    @pytest.mark.asyncio
+    async def test_small_upload_is_read_into_memory(self):
+        """Test uploads under the threshold are returned as bytes."""
+        with _spooled_upload(b"a,b\n1,2\n", "data.csv") as upload:
+            content = await read_upload(upload)
+
+        assert content == b"a,b\n1,2\n"
+        assert isinstance(content, bytes)
+
+    @pytest.mark.asyncio
+    async def test_large_upload_is_memory_mapped(self):
+        """Test uploads over the threshold are memory-mapped from disk."""
+        data = b"a,b\n" + b"1,2\n" * 300_000
+        with _spooled_upload(data, "data.csv") as upload:
+            content = await read_upload(upload)
+
+        assert isinstance(content, mmap.mmap)
+        assert len(content) == len(data)
+        assert content[:4] == b"a,b\n"
+        assert content[-4:] == b"1,2\n"
+
+
+class TestBufferReader:
+    """Tests for BufferReader."""
+
+    def test_read_and_seek(self):
+        """Test reading and seeking like a regular binary file."""
+        reader = open_buffer(b"hello world")
+
+        assert reader.read(5) == b"hello"
+        assert reader.seek(-5, io.SEEK_END) == 6
+        assert reader.read() == b"world"
+        assert reader.read() == b""
+        reader.seek(0)
+        assert reader.read(1) == b"h"
+
+    def test_readers_have_independent_positions(self):
+        """Test concurrent readers of one buffer don't share a position."""
+        content = b"0123456789"
+        first = BufferReader(content)
+        second = BufferReader(content)
+        buffer = bytearray(4)
+
+        first.readinto(buffer)
+        assert bytes(buffer) == b"0123"
+        second.readinto(buffer)
+        assert bytes(buffer) == b"0123"
+
+    def test_seek_before_start_raises_oserror(self):
+        """Test seeking before the start fails like a real file."""
+        with pytest.raises(OSError):
+            open_buffer(b"short").seek(-10, io.SEEK_END)
+
+
+class TestMemoryMappedContent:
+    """Tests for converters reading memory-mapped content."""
+
+    def test_csv_converter_accepts_mmap(self, simple_csv: bytes):
+        """Test CSV conversion of mapped content matches bytes content."""
+        converter = CsvToJsonConverter()
+        expected = json.loads(converter.convert(simple_csv))
+
+        assert json.loads(converter.convert(_mapped(simple_csv))) == expected
+
+    def test_excel_converter_accepts_mmap(self, simple_xlsx: bytes):
+        """Test Excel conversion of mapped content matches bytes content."""
+        converter = ExcelToJsonConverter()
+        expected = json.loads(converter.convert(simple_xlsx))
+
+        assert json.loads(converter.convert(_mapped(simple_xlsx))) == expected